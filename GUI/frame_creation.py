@@ -5,7 +5,9 @@ from PIL import Image, ImageTk, ImageDraw
 import platform
 import numpy as np
 import math, json
-from a_star import AStar
+from a_star import AStar, STRATEGY_NAMES
+from grid import image_to_grid
+from components import ComponentIndex
 
 
 class Creation(tk.Frame):
@@ -26,6 +28,8 @@ class Creation(tk.Frame):
         int height_canvas: Hauteur que doit avoir le canvas
 
         Astar astar: Objet servant à réaliser la recherche de plus court chemin
+        ComponentIndex components: Index des composantes connexes des cases de sol, pour savoir en direct si le départ
+                                   et l'arrivée sont reliés
 
         tk.Toplevel instructions_toplevel: Fenêtre où vont être affiché le mode d'emploi et conseils
 
@@ -58,6 +62,7 @@ class Creation(tk.Frame):
         self.create_widgets()
 
         self.a_star = AStar(self)
+        self.components = None
 
         self.instructions_toplevel = None
 
@@ -226,7 +231,7 @@ class Creation(tk.Frame):
 
         self.side_panel.grid_propagate(False)
 
-        nb_rows = 8
+        nb_rows = 12
         nb_columns = 2
 
         for i in range(nb_rows):
@@ -263,17 +268,42 @@ class Creation(tk.Frame):
         widget.grid(row=4, column=1, sticky='w')
         widget.bind('<Button-1>', self.solve_button_callback)
 
-        self.valid = True
         self.check_show_search = tk.IntVar(value=1)
         widget = tk.Checkbutton(self.side_panel, variable=self.check_show_search,
                                 text="Affichage de la recherche", font=("Bernard MT Condensed", 10))
         widget.grid(row=5, column=0, columnspan=2, sticky="n")
 
+        self.check_detailed_stats = tk.IntVar(value=0)
+        widget = tk.Checkbutton(self.side_panel, variable=self.check_detailed_stats,
+                                text="Statistiques détaillées", font=("Bernard MT Condensed", 10))
+        widget.grid(row=6, column=0, columnspan=2, sticky="n")
+
+        self.check_prune = tk.IntVar(value=0)
+        widget = tk.Checkbutton(self.side_panel, variable=self.check_prune,
+                                text="Combler les culs-de-sac", font=("Bernard MT Condensed", 10))
+        widget.grid(row=7, column=0, columnspan=2, sticky="n")
+
+        self.check_use_process = tk.IntVar(value=0)
+        widget = tk.Checkbutton(self.side_panel, variable=self.check_use_process,
+                                text="Recherche dans un processus", font=("Bernard MT Condensed", 10))
+        widget.grid(row=8, column=0, columnspan=2, sticky="n")
+
+        # Choix de la stratégie de recherche
+        self.text_strategy = tk.StringVar()
+        self.strategy_combobox = ttk.Combobox(self.side_panel, values=list(STRATEGY_NAMES), width=18, state="readonly",
+                                              textvariable=self.text_strategy)
+        self.strategy_combobox.current(0)
+        self.strategy_combobox.grid(row=9, column=0, columnspan=2, sticky="n")
+
+        # Indique en direct si le départ et l'arrivée sont reliés
+        self.connection_label = tk.Label(self.side_panel, font=("Bernard MT Condensed", 12), bg="#92D4F7")
+        self.connection_label.grid(row=10, column=0, columnspan=2)
+
         widget = tk.Label(self.side_panel, image=self.image_label, bg="#92D4F7")
-        widget.grid(row=6, column=0)
+        widget.grid(row=11, column=0)
 
         widget = tk.Button(self.side_panel, text="Enregistrer", font=("Bernard MT Condensed", 14))
-        widget.grid(row=6, column=1, sticky='w')
+        widget.grid(row=11, column=1, sticky='w')
         widget.bind('<Button-1>', self.save_button_callback)
 
         ################################# CANVAS #################################
@@ -359,6 +389,8 @@ class Creation(tk.Frame):
         self.canvas.itemconfigure(self.end_image_canvas, image=self.end_image_tk)
         self.canvas.coords(self.end_image_canvas, self.end_x * self.resize_factor, self.end_y * self.resize_factor)
 
+        self.update_connection_label()
+
     def close_window(self):
         """
         Ferme la fenêtre graphique en arrêtant le thread AStar s'il est lancé
@@ -667,7 +699,10 @@ class Creation(tk.Frame):
             event: Événement tkinter
         """
         if not self.a_star.running:
-            self.a_star.run((self.start_x, self.start_y), (self.end_x, self.end_y), show_search=self.check_show_search.get())
+            self.a_star.run((self.start_x, self.start_y), (self.end_x, self.end_y), show_search=self.check_show_search.get(),
+                            strategy=STRATEGY_NAMES[self.text_strategy.get()],
+                            detailed_stats=self.check_detailed_stats.get(), prune=self.check_prune.get(),
+                            use_process=self.check_use_process.get())
 
     def save_button_callback(self, event):
         """
@@ -679,9 +714,8 @@ class Creation(tk.Frame):
         Renvoi :
             "break": Permet d'éviter que le bouton ne reste bloqué dans son visuel pressé
         """
-        if not self.valid:
-            if tk.messagebox.askokcancel("Erreur", "Veuillez d'abord tester de la validité du labyrinthe"):
-                self.solve_button_callback()
+        if not self.components.connected((self.start_x, self.start_y), (self.end_x, self.end_y)):
+            tk.messagebox.showerror("Erreur", "Le labyrinthe n'est pas solvable, impossible de l'enregistrer")
         else:
             path = tk.filedialog.asksaveasfilename(title="Sauvegarder le labyrinthe", filetypes=[("Image png", ".png")],
                                                    initialdir="data/lab_images")
@@ -877,12 +911,37 @@ class Creation(tk.Frame):
         """
         Mets à jour l'image du labyrinthe affichée
         """
-        self.a_star.running = False
-        self.valid = False
+        self.a_star.cancel()
+        self.a_star.invalidate_grid()
 
         self.lab_image_tk = ImageTk.PhotoImage(self.lab_image.resize((self.width_canvas, self.height_canvas), Image.NEAREST))
         self.canvas.itemconfigure(self.lab_image_canvas, image=self.lab_image_tk)
 
+        # Pendant un trait, l'index n'est mis à jour qu'au relâchement du pinceau
+        if self.x_press is None:
+            self.update_components()
+
+    def update_components(self):
+        """
+        Met à jour l'index des composantes connexes avec l'image actuelle du labyrinthe
+        """
+        grid = image_to_grid(self.lab_image)
+        if self.components is None or self.components.grid.shape != grid.shape:
+            self.components = ComponentIndex(grid)
+        else:
+            self.components.update(grid)
+
+        self.update_connection_label()
+
+    def update_connection_label(self):
+        """
+        Affiche si le départ et l'arrivée sont actuellement reliés
+        """
+        if self.components.connected((self.start_x, self.start_y), (self.end_x, self.end_y)):
+            self.connection_label.configure(text="Départ et arrivée reliés", fg="green")
+        else:
+            self.connection_label.configure(text="Départ et arrivée non reliés", fg="red")
+
     def get_pos_on_lab(self, x, y):
         """
         Calcules les coordonnées du point en haut à gauche du pinceau sur l'image du labyrinthe à partir des
@@ -1011,6 +1070,7 @@ class Creation(tk.Frame):
         self.x_press, self.y_press = None, None
         self.shift_direction = None
 
+        self.update_components()
         self.move_pen(x_lab, y_lab)
 
         if self.pen_type not in {"start", "end"}:
@@ -1043,6 +1103,7 @@ class Creation(tk.Frame):
 
         self.x_press, self.y_press = None, None
 
+        self.update_components()
         self.move_pen(x_lab, y_lab)
 
         while self.i_lab_image != len(self.all_lab_images) - 1:
@@ -1,7 +1,22 @@
+import os
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
-from a_star import AStar
+from threading import Thread
+from time import perf_counter
+from a_star import AStar, STRATEGY_NAMES
+from grid import image_to_grid, LRUCache
+from game_state import GameState, DIRECTIONS, BLOCKED, LASER_HIT, WON
+from solver import DistanceField
+from landmarks import prepare_landmarks
+from metrics import Histogram, dump_histograms
+from GUI.viewport import Viewport, VIEWPORT_CELL_SIZE
+
+
+RENDER_CACHE_SIZE = 4       # Nombre de rendus de niveaux à la taille du canvas conservés en cache
+
+MOVE_PERIOD = 0.075         # Durée (en s) d'un pas de la boucle de jeu : le joueur avance d'une case par pas
+MAX_CATCH_UP = 4            # Nombre maximal de pas en retard rattrapés d'un coup, au-delà le retard est abandonné
 
 
 class Jeu(tk.Frame):
@@ -22,6 +37,19 @@ class Jeu(tk.Frame):
         int height_canvas: Hauteur que doit avoir le canvas
 
         Astar astar: Objet servant à réaliser la recherche de plus court chemin
+        DistanceField distance_field: Distances de chaque case à l'arrivée du niveau (None tant qu'elles sont en calcul)
+        GameState game: Règles du jeu appliquées aux déplacements du joueur sur le niveau chargé
+        ImageTk.PhotoImage lab_image_tk: Image affichée du labyrinthe, unique et réutilisée pour tous les niveaux
+        ImageTk.PhotoImage render_tk: Rendu intact du niveau à la taille du canvas, repris pour effacer l'image affichée
+        LRUCache render_cache: Rendus (ImageTk.PhotoImage) des derniers niveaux chargés, indexés par (chemin de
+                               l'image, date de modification)
+
+        float next_tick: Instant (perf_counter) prévu du prochain pas de la boucle de jeu
+        float press_time: Instant du dernier appui sur une flèche pas encore suivi d'un déplacement (None sinon)
+        Histogram tick_times: Durées de traitement de chaque pas de la boucle de jeu (en ms)
+        Histogram input_latency: Délais entre l'appui sur une flèche et l'affichage du déplacement qui le suit (en ms)
+
+        Viewport viewport: Caméra affichant par fenêtre, autour du joueur, les niveaux plus grands que le canvas
 
         tk.Toplevel instructions_toplevel: Fenêtre où vont être affiché le mode d'emploi et conseils
 
@@ -88,7 +116,7 @@ class Jeu(tk.Frame):
 
         self.side_panel.grid_propagate(False)
 
-        nb_rows = 7
+        nb_rows = 11
         nb_columns = 2
 
         for i in range(nb_rows):
@@ -105,7 +133,7 @@ class Jeu(tk.Frame):
         img = Image.open('GUI/Menu images/homer_bouton.png').resize((int(self.width * 0.04), int(self.width * 0.04)))
         self.image_label = ImageTk.PhotoImage(img)
 
-        nb_buttons = 4
+        nb_buttons = 5
         for i in range(1, 1 + nb_buttons):
             widget = tk.Label(self.side_panel, image=self.image_label, bg="#92D4F7")
             widget.grid(row=i, column=0)
@@ -126,10 +154,37 @@ class Jeu(tk.Frame):
         widget.grid(row=4, column=1, sticky='w')
         widget.bind('<Button-1>', self.solve_button_callback)
 
+        widget = tk.Button(self.side_panel, text="Indice", font=("Bernard MT Condensed", 14))
+        widget.grid(row=5, column=1, sticky='w')
+        widget.bind('<Button-1>', self.hint_button_callback)
+
         self.check_show_search = tk.IntVar(value=0)
         widget = tk.Checkbutton(self.side_panel, variable=self.check_show_search,
                                 text="Affichage de la recherche", font=("Bernard MT Condensed", 10))
-        widget.grid(row=5, column=0, columnspan=2, sticky="n")
+        widget.grid(row=6, column=0, columnspan=2, sticky="n")
+
+        self.check_detailed_stats = tk.IntVar(value=0)
+        widget = tk.Checkbutton(self.side_panel, variable=self.check_detailed_stats,
+                                text="Statistiques détaillées", font=("Bernard MT Condensed", 10))
+        widget.grid(row=7, column=0, columnspan=2, sticky="n")
+
+        self.check_prune = tk.IntVar(value=0)
+        widget = tk.Checkbutton(self.side_panel, variable=self.check_prune,
+                                text="Combler les culs-de-sac", font=("Bernard MT Condensed", 10))
+        widget.grid(row=8, column=0, columnspan=2, sticky="n")
+
+        self.check_use_process = tk.IntVar(value=0)
+        widget = tk.Checkbutton(self.side_panel, variable=self.check_use_process,
+                                text="Recherche dans un processus", font=("Bernard MT Condensed", 10))
+        widget.grid(row=9, column=0, columnspan=2, sticky="n")
+
+        # Choix de la stratégie de recherche
+        self.text_strategy = tk.StringVar()
+        self.strategy_combobox = ttk.Combobox(self.side_panel, values=list(STRATEGY_NAMES), width=18, state="readonly",
+                                              textvariable=self.text_strategy)
+        self.strategy_combobox.current(0)
+        self.strategy_combobox.grid(row=10, column=0, columnspan=2, sticky="n")
+        self.strategy_combobox.bind('<<ComboboxSelected>>', self.strategy_callback)
 
         ################################# CANVAS #################################
 
@@ -139,6 +194,9 @@ class Jeu(tk.Frame):
         self.lab_image = Image.new(mode="RGB", size=(1, 1), color=(255, 255, 255))
         self.lab_image_tk = ImageTk.PhotoImage(self.lab_image.resize((self.width_canvas, self.height_canvas), Image.NEAREST))
         self.lab_image_canvas = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.lab_image_tk)
+        self.render_tk = None
+        self.render_cache = LRUCache(RENDER_CACHE_SIZE)
+        self.viewport = Viewport(self.canvas, self.width_canvas, self.height_canvas)
 
         # Image du départ
         self.start_x, self.start_y = 0, 0
@@ -152,6 +210,9 @@ class Jeu(tk.Frame):
         self.end_image_tk = ImageTk.PhotoImage(self.end_image.resize((self.resize_factor, self.resize_factor)))
         self.end_image_canvas = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.end_image_tk)
 
+        # Indice : contour de la prochaine case à emprunter
+        self.hint_canvas = self.canvas.create_rectangle(0, 0, 0, 0, outline="#00FF00", width=3, state=tk.HIDDEN)
+
         # Image du joueur
         self.player_x, self.player_y = 0, 0
         self.move_x, self.move_y = 0, 0
@@ -161,6 +222,16 @@ class Jeu(tk.Frame):
 
         self.keys_pressed = []
         self.timer = None
+        self.next_tick = 0.
+        self.press_time = None
+
+        # Mesures conservées d'un niveau à l'autre, enregistrées en quittant un niveau si la fenêtre a un metrics_path
+        self.tick_times = Histogram("tick_ms")
+        self.input_latency = Histogram("input_latency_ms")
+
+        self.game = None            # Créé au chargement du niveau
+        self.distance_field = None
+        self.level_number = 0       # Incrémenté à chaque chargement pour ignorer les calculs d'un niveau précédent
 
     def reset(self, dico_niveau):
         """
@@ -172,7 +243,21 @@ class Jeu(tk.Frame):
         self.lab_image = Image.open(dico_niveau["image_path"])
         self.lab_width = dico_niveau["width"]
         self.lab_height = dico_niveau["height"]
-        self.resize_factor = self.height_canvas // self.lab_height
+
+        if Viewport.needed(self.lab_width, self.lab_height, self.width_canvas, self.height_canvas):
+            # Niveau trop grand pour le canvas : seule la fenêtre autour du joueur est affichée, par tuiles
+            self.resize_factor = VIEWPORT_CELL_SIZE
+            self.viewport.enable(self.lab_image, self.resize_factor)
+            self.canvas.itemconfigure(self.lab_image_canvas, state=tk.HIDDEN)
+            self.a_star.painted_box = None
+        else:
+            self.resize_factor = self.height_canvas // self.lab_height
+            self.viewport.disable()
+            self.canvas.itemconfigure(self.lab_image_canvas, state=tk.NORMAL)
+
+            # Le rendu à la taille du canvas n'est fait qu'au premier chargement du niveau, puis recopié par tkinter
+            self.render_tk = self.get_render(dico_niveau["image_path"])
+            self.restore_render()
 
         self.start_image_tk = ImageTk.PhotoImage(self.start_image.resize((self.resize_factor, self.resize_factor)))
         self.canvas.itemconfigure(self.start_image_canvas, image=self.start_image_tk)
@@ -189,6 +274,16 @@ class Jeu(tk.Frame):
         self.end_x, self.end_y = dico_niveau["end"]
         self.canvas.coords(self.end_image_canvas, self.end_x * self.resize_factor, self.end_y * self.resize_factor)
 
+        # Calcule en arrière-plan les distances à l'arrivée, utilisées pour résoudre et donner des indices
+        grid = image_to_grid(self.lab_image)
+        self.game = GameState(grid, (self.start_x, self.start_y), (self.end_x, self.end_y))
+        self.distance_field = None
+        self.level_number += 1
+        Thread(target=self.compute_distance_field, daemon=True,
+               args=(self.level_number, grid, (self.end_x, self.end_y))).start()
+        if STRATEGY_NAMES[self.text_strategy.get()] == "alt":
+            prepare_landmarks(grid, (self.end_x, self.end_y))
+
         self.level_name_label["text"] = f"Niveau : {dico_niveau['name']}"
         self.level_size_label["text"] = f"Taille : {dico_niveau['width']}x{dico_niveau['height']}"
 
@@ -198,7 +293,10 @@ class Jeu(tk.Frame):
             self.parent.bind(action, self.move)
 
         self.keys_pressed = []
+        if self.timer is not None:
+            self.canvas.after_cancel(self.timer)
         self.timer = None
+        self.press_time = None
 
         self.start_again()
 
@@ -206,16 +304,76 @@ class Jeu(tk.Frame):
 
         self.parent.protocol("WM_DELETE_WINDOW", self.close_window)
 
+    def get_render(self, image_path):
+        """
+        Renvoie le rendu intact du niveau chargé à la taille du canvas, en le reprenant du cache si l'image n'a pas
+        changé depuis
+
+        Paramètres :
+            str image_path: Chemin de l'image du niveau
+
+        Renvoi :
+            ImageTk.PhotoImage: Rendu du niveau
+        """
+        key = (image_path, os.path.getmtime(image_path))
+        render = self.render_cache.get(key)
+        if render is None:
+            render = ImageTk.PhotoImage(self.lab_image.resize((self.width_canvas, self.height_canvas), Image.NEAREST))
+            self.render_cache.put(key, render)
+
+        return render
+
+    def restore_render(self, box=None):
+        """
+        Recopie le rendu intact du niveau dans l'image affichée, sur un rectangle de cases ou sur toute l'image
+        La copie est faite par tkinter d'une image à l'autre, sans passer par PIL
+
+        Paramètres :
+            tuple(int, int, int, int) box: (Optionnel) Rectangle (x0, y0, x1, y1) des cases à effacer
+        """
+        if box is None:
+            x0, y0, x1, y1 = 0, 0, self.width_canvas, self.height_canvas
+        else:
+            # Cases converties en pixels du canvas, avec une marge pour les arrondis du redimensionnement
+            x0 = max(box[0] * self.width_canvas // self.lab_width - 1, 0)
+            y0 = max(box[1] * self.height_canvas // self.lab_height - 1, 0)
+            x1 = min(-(-box[2] * self.width_canvas // self.lab_width) + 1, self.width_canvas)
+            y1 = min(-(-box[3] * self.height_canvas // self.lab_height) + 1, self.height_canvas)
+
+        self.canvas.tk.call(str(self.lab_image_tk), "copy", str(self.render_tk),
+                            "-from", x0, y0, x1, y1, "-to", x0, y0)
+        self.a_star.painted_box = None
+
+    def compute_distance_field(self, level_number, grid, end):
+        """
+        Calcule le champ des distances à l'arrivée (appelée dans un Thread lors du chargement d'un niveau)
+
+        Paramètres :
+            int level_number: Numéro du chargement de niveau pour lequel le calcul est lancé
+            np.ndarray grid: Grille des types de case du niveau
+            tuple(int, int) end: Coordonnées de l'arrivée
+        """
+        distance_field = DistanceField(grid, end)
+
+        if level_number == self.level_number:
+            self.distance_field = distance_field
+
     def start_again(self, event=None):
         """
         Recommence le niveau actuel
+        Seules les cases modifiées par la résolution sont effacées, l'image affichée est sinon laissée telle quelle
 
         Paramètres :
             event: Événement tkinter
         """
-        self.lab_image_tk = ImageTk.PhotoImage(self.lab_image.resize((self.width_canvas, self.height_canvas), Image.NEAREST))
-        self.canvas.itemconfigure(self.lab_image_canvas, image=self.lab_image_tk)
-
+        if self.a_star.painted_box is not None:
+            if self.viewport.active:
+                self.viewport.refresh(self.lab_image, self.a_star.painted_box)
+                self.a_star.painted_box = None
+            else:
+                self.restore_render(self.a_star.painted_box)
+
+        self.game.reset()
         self.player_x, self.player_y = self.start_x, self.start_y
         self.move_player()
 
@@ -223,14 +381,28 @@ class Jeu(tk.Frame):
         """
         Ferme la fenêtre graphique en arrêtant le thread AStar s'il est lancé
         """
+        self.dump_metrics()
         self.a_star.quit()
         self.parent.destroy()
 
+    def dump_metrics(self):
+        """
+        Enregistre les histogrammes de la boucle de jeu et des annulations de recherche dans le fichier metrics_path de
+        la fenêtre, s'il est défini
+        """
+        if self.parent.metrics_path is not None:
+            dump_histograms([self.tick_times, self.input_latency, self.a_star.cancel_latency], self.parent.metrics_path)
+
     def move_player(self):
         """
-        Mets à jour la position de l'image du joueur
+        Mets à jour la position de l'image du joueur et cache l'indice
+        Si le niveau est affiché par fenêtre, la fenêtre suit le joueur
         """
         self.canvas.coords(self.player_image_canvas, self.player_x * self.resize_factor, self.player_y * self.resize_factor)
+        self.canvas.itemconfigure(self.hint_canvas, state=tk.HIDDEN)
+
+        if self.viewport.active:
+            self.viewport.follow(self.player_x, self.player_y)
 
     def move(self, event):
         """
@@ -240,9 +412,7 @@ class Jeu(tk.Frame):
         Paramètres :
             event: Événement tkinter
         """
-        directions = {"Left": (-1, 0), "Right": (1, 0), "Up": (0, -1), "Down": (0, 1)}
-
-        if event.keysym in directions:
+        if event.keysym in DIRECTIONS:
                             # Press
             condition1 = event.type == "2" and event.keysym not in self.keys_pressed    # Si l'on appuie sur une nouvelle touche
             condition2 = event.type == "3"      # Si l'on relâche une touche
@@ -252,6 +422,7 @@ class Jeu(tk.Frame):
 
                 if condition1:
                     self.keys_pressed.append(event.keysym)
+                    self.press_time = perf_counter()
 
                 elif condition2:
                     self.keys_pressed.remove(event.keysym)
@@ -259,13 +430,13 @@ class Jeu(tk.Frame):
                 self.move_x, self.move_y = 0, 0
 
                 for key in self.keys_pressed:
-                    dx, dy = directions[key]
+                    dx, dy = DIRECTIONS[key]
                     self.move_x += dx
                     self.move_y += dy
 
                 # Empêche de bouger en diagonale
                 if self.move_x != 0 and self.move_y != 0:
-                    self.move_x, self.move_y = directions[self.keys_pressed[-1]]
+                    self.move_x, self.move_y = DIRECTIONS[self.keys_pressed[-1]]
 
                 if self.move_x == 0 and self.move_y == 0:
                     if self.timer is not None:
@@ -274,42 +445,76 @@ class Jeu(tk.Frame):
 
                 else:
                     if self.timer is None:
-                        self.move_timer()
+                        self.next_tick = perf_counter()     # Le premier pas est fait tout de suite
+                        self.game_loop()
 
-    def move_timer(self):
+    def game_loop(self):
         """
-        Calcule la prochaine position du joueur avec les valeurs de déplacement
-        Vérifie si la case est un sol, un mur, un laser ou l'arrivée
-        Mets à jour la position du joueur en fonction
+        Boucle de jeu à pas fixe : les pas sont planifiés sur une horloge monotone toutes les MOVE_PERIOD s, et non
+        chaînés les uns après les autres, pour que la vitesse du joueur ne dérive pas lorsque l'interface est chargée
+        Les pas manqués (au plus MAX_CATCH_UP) sont rattrapés, et la durée de traitement de chaque pas est mesurée
         """
-        x = self.player_x + self.move_x
-        y = self.player_y + self.move_y
-
         self.timer = None
+        now = perf_counter()
 
-        if 0 <= x < self.lab_width and 0 <= y < self.lab_height:
+        ticks = 0
+        while self.next_tick <= now and ticks < MAX_CATCH_UP:
+            t0 = perf_counter()
+            moving = self.move_timer()
+            self.tick_times.record((perf_counter() - t0) * 1000)
 
-            color = self.lab_image.getpixel((x, y))
+            if not moving:
+                return
 
-            #                   sol         laser
-            if color in {(255, 255, 255), (255, 0, 0)}:
-                self.player_x, self.player_y = x, y
-                self.move_player()
+            self.next_tick += MOVE_PERIOD
+            ticks += 1
 
-                if color == (255, 0, 0):
-                    self.start_again()
+        if self.next_tick <= now:
+            self.next_tick = now + MOVE_PERIOD      # Retard trop important : on repart de l'instant présent
 
-                elif self.player_x == self.end_x and self.player_y == self.end_y:
-                    self.end_level()
+        self.timer = self.canvas.after(max(int((self.next_tick - perf_counter()) * 1000), 0), self.game_loop)
 
-                else:
-                    self.timer = self.canvas.after(75, self.move_timer)
+    def move_timer(self):
+        """
+        Calcule la prochaine position du joueur avec les valeurs de déplacement (un pas de la boucle de jeu)
+        Les règles (mur, laser, arrivée) sont appliquées par le moteur GameState, la frame n'en affiche que le résultat
+
+        Renvoi :
+            bool: True si le joueur a avancé et peut continuer à se déplacer
+        """
+        outcome = self.game.step(self.move_x, self.move_y)
+
+        if outcome == BLOCKED:
+            self.press_time = None      # Appui contre un mur : aucun déplacement à mesurer
+            return False
+
+        if outcome == LASER_HIT:
+            self.start_again()
+        else:
+            self.player_x, self.player_y = self.game.x, self.game.y
+            self.move_player()
+
+        if self.press_time is not None:
+            # Le premier pas est fait dans la fonction qui reçoit l'appui : la mesure va jusqu'à l'affichage du
+            # déplacement, tkinter redessinant le canvas avant d'exécuter les fonctions ajoutées ensuite par after_idle
+            press_time, self.press_time = self.press_time, None
+            self.canvas.after_idle(lambda: self.input_latency.record((perf_counter() - press_time) * 1000))
+
+        if outcome == LASER_HIT:
+            return False
+
+        if outcome == WON:
+            self.end_level()
+            return False
+
+        return True
 
     def end_level(self):
         """
         Affiche un message pour féliciter le joueur d'avoir réussi le niveau
         Puis change la scène pour celle de menu
         """
+        self.dump_metrics()
         tk.messagebox.showinfo(title="WINNER WINNER CHICKEN DINNER", message="Bravo ! Vous avez réussi ce niveau :)")
         self.parent.switch_frame("Menu")
 
@@ -325,6 +530,7 @@ class Jeu(tk.Frame):
         for action in actions:
             self.parent.unbind(action)
 
+        self.dump_metrics()
         self.a_star.quit()
         self.parent.switch_frame("Menu")
 
@@ -380,7 +586,8 @@ class Jeu(tk.Frame):
             self.label_icone44.grid(row=4, column=0)
             widget33 = tk.Label(self.instructions_toplevel,
                                 text="Dans le mode jeu, vous jouez les niveaux déjà cuisinés par les meilleurs chefs, ou goûtez votre propre plat.\n"
-                                     "Le plat est beaucoup trop gras pour vous ? Ne vous inquiétez pas ! Le bouton 'Résoudre' est à votre secours ici aussi.",
+                                     "Le plat est beaucoup trop gras pour vous ? Ne vous inquiétez pas ! Le bouton 'Résoudre' est à votre secours ici aussi.\n"
+                                     "Besoin d'un petit coup de pouce ? Le bouton 'Indice' vous montre la prochaine case à emprunter.",
                                 font=("Rockwell Condensed", 15), bg="#92D4F7")
             widget33.grid(row=5, column=1)
 
@@ -395,10 +602,62 @@ class Jeu(tk.Frame):
 
     def solve_button_callback(self, event):
         """
-        Résout le labyrinthe dessiné
+        Résout le labyrinthe depuis la position du joueur
+        Si le champ des distances à l'arrivée est prêt et que l'on demande un simple A* (sans affichage de la recherche,
+        statistiques détaillées ni comblement des culs-de-sac), le chemin est obtenu directement en descendant ce
+        champ : il est aussi court que celui de A*. Sinon on lance la recherche choisie
 
         Paramètres :
             event: Événement tkinter
         """
         if not self.a_star.running:
-            self.a_star.run((self.player_x, self.player_y), (self.end_x, self.end_y), show_search=self.check_show_search.get())
+            strategy = STRATEGY_NAMES[self.text_strategy.get()]
+            plain_astar = strategy == "astar" and not (self.check_show_search.get() or self.check_detailed_stats.get()
+                                                        or self.check_prune.get())
+
+            if self.distance_field is not None and plain_astar:
+                path = self.distance_field.path_from(self.player_x, self.player_y)
+
+                if path:
+                    self.a_star.show_known_path(path)
+                else:
+                    tk.messagebox.showerror("Erreur", "Le donut n'est pas accessible depuis cette case")
+            else:
+                self.a_star.run((self.player_x, self.player_y), (self.end_x, self.end_y), show_search=self.check_show_search.get(),
+                                strategy=strategy, detailed_stats=self.check_detailed_stats.get(), prune=self.check_prune.get(),
+                                use_process=self.check_use_process.get())
+
+    def strategy_callback(self, event):
+        """
+        Fonction appelée lorsque l'on choisit une stratégie de recherche : rend les flèches au jeu, et si la stratégie
+        est ALT, lance en arrière-plan la construction des tables de repères du niveau (coûteuse, elle n'est faite que
+        si l'on en a besoin)
+
+        Paramètres :
+            event: Événement tkinter
+        """
+        self.focus()
+
+        if STRATEGY_NAMES[self.text_strategy.get()] == "alt":
+            prepare_landmarks(image_to_grid(self.lab_image), (self.end_x, self.end_y))
+
+    def hint_button_callback(self, event):
+        """
+        Entoure la prochaine case à emprunter pour se rapprocher du donut
+
+        Paramètres :
+            event: Événement tkinter
+        """
+        if self.distance_field is None:
+            tk.messagebox.showinfo("Info", "Les indices sont encore en préparation, réessayez dans un instant")
+
+        else:
+            move = self.distance_field.next_move(self.player_x, self.player_y)
+
+            if move is not None:
+                x, y = move
+                self.canvas.coords(self.hint_canvas, x * self.resize_factor, y * self.resize_factor,
+                                   (x + 1) * self.resize_factor, (y + 1) * self.resize_factor)
+                self.canvas.itemconfigure(self.hint_canvas, state=tk.NORMAL)
+            elif self.distance_field.distance(self.player_x, self.player_y) == -1:
+                tk.messagebox.showerror("Erreur", "Le donut n'est pas accessible depuis cette case")
@@ -124,37 +124,36 @@ class SelectionNiveau(tk.Frame):
         i = 0
         j = 0
 
+        # Les niveaux plus grands que le canvas sont joués par fenêtre autour du joueur (voir GUI.viewport)
         for name, params in self.dico_niveaux.items():
 
-            if params["width"] <= self.width_canvas and params["height"] <= self.height_canvas:
+            # Crée une nouvelle frame où placer des boutons
+            if i == 0 and j == 0:
+                frame = tk.Frame(self, bg="#92D4F7")
+                frame.grid(row=1, column=1, rowspan=self.nb_rows - 1, columnspan=self.nb_columns - 2)
 
-                # Crée une nouvelle frame où placer des boutons
-                if i == 0 and j == 0:
-                    frame = tk.Frame(self, bg="#92D4F7")
-                    frame.grid(row=1, column=1, rowspan=self.nb_rows - 1, columnspan=self.nb_columns - 2)
+                for k in range(nb_rows_frame):
+                    frame.grid_rowconfigure(k, weight=1)
+                for k in range(nb_columns_frame):
+                    frame.grid_columnconfigure(k, weight=1)
 
-                    for k in range(nb_rows_frame):
-                        frame.grid_rowconfigure(k, weight=1)
-                    for k in range(nb_columns_frame):
-                        frame.grid_columnconfigure(k, weight=1)
+                self.frames.append(frame)
 
-                    self.frames.append(frame)
-
-                img = Image.open(params["image_path"]).resize((width_img, height_img), Image.NEAREST)
-                self.button_images.append(ImageTk.PhotoImage(img))
-                button = tk.Button(frame, image=self.button_images[-1])
-                button.grid(row=i, column=j, padx=self.width // 50, pady=self.height // 50)
-                button.bind("<Button-1>", lambda event, p=params: self.game_button_callback(p))
+            img = Image.open(params["image_path"]).resize((width_img, height_img), Image.NEAREST)
+            self.button_images.append(ImageTk.PhotoImage(img))
+            button = tk.Button(frame, image=self.button_images[-1])
+            button.grid(row=i, column=j, padx=self.width // 50, pady=self.height // 50)
+            button.bind("<Button-1>", lambda event, p=params: self.game_button_callback(p))
 
-                label = tk.Label(frame, text=name, font=("Bernard MT Condensed", 14))
-                label.grid(row=i + 1, column=j, sticky="n", pady=self.height // 50)
+            label = tk.Label(frame, text=name, font=("Bernard MT Condensed", 14))
+            label.grid(row=i + 1, column=j, sticky="n", pady=self.height // 50)
 
-                j += 1
-                if j >= nb_columns_frame:
-                    j = 0
-                    i += 2
-                if i >= nb_rows_frame:
-                    i = 0
+            j += 1
+            if j >= nb_columns_frame:
+                j = 0
+                i += 2
+            if i >= nb_rows_frame:
+                i = 0
 
         # Rempli les espaces vides sur la dernière frame avec des boutons menant à la scène Creation de niveau
         img = Image.open("GUI/Menu images/construire.png").resize((width_img, height_img))
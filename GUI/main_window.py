@@ -19,13 +19,18 @@ class MainWindow(tk.Tk):
         int height_top_panel: Hauteur que doit avoir le top panel
 
         dict(str: tk.Frame) frames: Dictionnaire contenant les frames correspondant aux différentes scènes.
+        str metrics_path: Fichier json où sont enregistrées les mesures de la boucle de jeu (None pour ne pas les enregistrer)
     """
 
-    def __init__(self):
+    def __init__(self, metrics_path=None):
         """
         Initialise l'application, défini le titre, l'icône, la taille de la fenêtre, etc...
+
+        Paramètres :
+            str metrics_path: (Optionnel) Fichier json où enregistrer les mesures de la boucle de jeu
         """
         super().__init__()
+        self.metrics_path = metrics_path
         self.title("Labybouffe")
         self.wm_iconphoto(True, tk.PhotoImage(file="GUI/Menu images/icon.png"))
 
@@ -0,0 +1,189 @@
+import tkinter as tk
+from PIL import Image, ImageTk
+
+
+VIEWPORT_CELL_SIZE = 8      # Côté (en pixels) d'une case lorsque le labyrinthe est affiché par fenêtre
+VIEWPORT_TILE_SIZE = 32     # Côté (en cases) des tuiles affichées
+
+
+class Viewport:
+    """
+    Caméra affichant sur un canvas une fenêtre d'un labyrinthe trop grand pour être affiché en entier
+    Le canvas défile sur le labyrinthe agrandi (ses éléments gardent leurs coordonnées dans le labyrinthe agrandi), et
+    seules les tuiles visibles sont rendues : une tuile n'est créée que lorsqu'elle entre dans la fenêtre, et supprimée
+    lorsqu'elle en sort. L'image complète agrandie n'est jamais construite
+
+    Attributs principaux :
+        tk.Canvas canvas: Canvas sur lequel est affiché le labyrinthe
+        int width: Longueur du canvas (en pixels)
+        int height: Hauteur du canvas (en pixels)
+
+        bool active: Booléen indiquant si le labyrinthe est affiché par fenêtre
+        Image image: Image du labyrinthe affichée, un pixel par case
+        int cell_size: Côté (en pixels) d'une case
+        tuple(int, int) origin: Coin supérieur gauche (en pixels du labyrinthe agrandi) de la fenêtre affichée
+        dict(tuple(int, int): tuple) tiles: Tuiles affichées : (colonne, ligne) -> (id canvas, PhotoImage)
+        callable on_scroll: Fonction appelée après chaque mise à jour des tuiles visibles, pour que la surcouche de la
+                            recherche suive la fenêtre (None par défaut)
+    """
+
+    def __init__(self, canvas, width, height):
+        """
+        Initialise une caméra inactive
+
+        Paramètres :
+            tk.Canvas canvas: Canvas sur lequel est affiché le labyrinthe
+            int width: Longueur du canvas (en pixels)
+            int height: Hauteur du canvas (en pixels)
+        """
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+
+        self.active = False
+        self.image = None
+        self.cell_size = VIEWPORT_CELL_SIZE
+        self.origin = (0, 0)
+        self.tiles = {}
+        self.on_scroll = None
+
+    @staticmethod
+    def needed(lab_width, lab_height, width, height):
+        """
+        Paramètres :
+            int lab_width: Longueur du labyrinthe (en cases)
+            int lab_height: Hauteur du labyrinthe (en cases)
+            int width: Longueur du canvas (en pixels)
+            int height: Hauteur du canvas (en pixels)
+
+        Renvoi :
+            bool: True si le labyrinthe ne tient pas en entier sur le canvas, à au moins un pixel par case
+        """
+        return lab_width > width or lab_height > height
+
+    def enable(self, image, cell_size=VIEWPORT_CELL_SIZE):
+        """
+        Affiche un labyrinthe par fenêtre
+
+        Paramètres :
+            Image image: Image du labyrinthe, un pixel par case
+            int cell_size: Côté (en pixels) d'une case
+        """
+        self.clear()
+        self.active = True
+        self.image = image
+        self.cell_size = cell_size
+
+        self.canvas.configure(scrollregion=(0, 0, image.width * cell_size, image.height * cell_size))
+        self.origin = None
+
+    def disable(self):
+        """
+        Revient à l'affichage du labyrinthe en entier : les tuiles sont retirées et le canvas ne défile plus
+        """
+        self.clear()
+        self.active = False
+        self.image = None
+
+        self.canvas.configure(scrollregion=(0, 0, self.width, self.height))
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.origin = (0, 0)
+
+    def clear(self):
+        """
+        Supprime toutes les tuiles affichées
+        """
+        for item, _ in self.tiles.values():
+            self.canvas.delete(item)
+        self.tiles = {}
+
+    def follow(self, x, y):
+        """
+        Centre la fenêtre sur une case (sans dépasser les bords du labyrinthe) puis met à jour les tuiles visibles
+
+        Paramètres :
+            int x: Abscisse de la case
+            int y: Ordonnée de la case
+        """
+        world_width = self.image.width * self.cell_size
+        world_height = self.image.height * self.cell_size
+
+        x0 = min(max(x * self.cell_size + self.cell_size // 2 - self.width // 2, 0), max(world_width - self.width, 0))
+        y0 = min(max(y * self.cell_size + self.cell_size // 2 - self.height // 2, 0), max(world_height - self.height, 0))
+
+        if (x0, y0) != self.origin:
+            self.origin = (x0, y0)
+            self.canvas.xview_moveto(x0 / world_width)
+            self.canvas.yview_moveto(y0 / world_height)
+            self.update_tiles()
+
+    def visible_tiles(self):
+        """
+        Renvoi :
+            set(tuple(int, int)): Tuiles (colonne, ligne) au moins en partie visibles dans la fenêtre
+        """
+        tile = VIEWPORT_TILE_SIZE * self.cell_size
+        x0, y0 = self.origin
+        nb_tiles_x = -(-self.image.width // VIEWPORT_TILE_SIZE)
+        nb_tiles_y = -(-self.image.height // VIEWPORT_TILE_SIZE)
+
+        return {(tx, ty) for tx in range(x0 // tile, min((x0 + self.width - 1) // tile + 1, nb_tiles_x))
+                for ty in range(y0 // tile, min((y0 + self.height - 1) // tile + 1, nb_tiles_y))}
+
+    def update_tiles(self):
+        """
+        Crée les tuiles entrées dans la fenêtre et supprime celles qui en sont sorties
+        """
+        visible = self.visible_tiles()
+
+        for key in list(self.tiles):
+            if key not in visible:
+                self.canvas.delete(self.tiles.pop(key)[0])
+
+        for key in visible:
+            if key not in self.tiles:
+                self.paint_tile(key)
+
+        if self.on_scroll is not None:
+            self.on_scroll()
+
+    def paint_tile(self, key):
+        """
+        Rend une tuile depuis l'image du labyrinthe et l'affiche sous les autres éléments du canvas
+
+        Paramètres :
+            tuple(int, int) key: Colonne et ligne de la tuile
+        """
+        tx, ty = key
+        x0, y0 = tx * VIEWPORT_TILE_SIZE, ty * VIEWPORT_TILE_SIZE
+        region = self.image.crop((x0, y0, min(x0 + VIEWPORT_TILE_SIZE, self.image.width),
+                                  min(y0 + VIEWPORT_TILE_SIZE, self.image.height)))
+        region = region.resize((region.width * self.cell_size, region.height * self.cell_size), Image.NEAREST)
+
+        if key in self.tiles:
+            self.tiles[key][1].paste(region)
+        else:
+            photo = ImageTk.PhotoImage(region)
+            item = self.canvas.create_image(x0 * self.cell_size, y0 * self.cell_size, anchor=tk.NW, image=photo)
+            self.canvas.tag_lower(item)
+            self.tiles[key] = (item, photo)
+
+    def refresh(self, image, box=None):
+        """
+        Change l'image affichée (chemin trouvé, image d'origine à la reprise du niveau...) et redessine les tuiles
+        visibles qui recoupent le rectangle de cases modifiées. Les autres tuiles seront rendues en entrant dans la fenêtre
+
+        Paramètres :
+            Image image: Nouvelle image du labyrinthe, de mêmes dimensions
+            tuple(int, int, int, int) box: (Optionnel) Rectangle (x0, y0, x1, y1) des cases modifiées, toutes par défaut
+        """
+        self.image = image
+        if box is None:
+            box = (0, 0, image.width, image.height)
+
+        for key in list(self.tiles):
+            tx, ty = key
+            if tx * VIEWPORT_TILE_SIZE < box[2] and box[0] < (tx + 1) * VIEWPORT_TILE_SIZE and \
+                    ty * VIEWPORT_TILE_SIZE < box[3] and box[1] < (ty + 1) * VIEWPORT_TILE_SIZE:
+                self.paint_tile(key)
@@ -1,43 +1,122 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image
-from queue import PriorityQueue
+from PIL import Image, ImageTk
 from threading import Thread
-from time import time
+import queue
+import numpy as np
+from grid import image_to_grid
+from solver import solve, SearchStats, STRATEGIES, VISITED, FRONTIER, VISITED_BACKWARD, FRONTIER_BACKWARD, PRUNED, \
+    PATH, FORMER_PATH
+from solver_process import ProcessSolver
+from incremental import LPAStar
+from hpa import get_abstraction
+from corridors import get_corridor_graph
+from landmarks import get_landmarks
+from cancellation import CancelToken
+from metrics import Histogram
+
+
+# Couleurs d'affichage des cases lors de la recherche
+SEARCH_COLORS = {VISITED: (255, 182, 193), FRONTIER: (180, 0, 255),
+                 VISITED_BACKWARD: (173, 216, 230), FRONTIER_BACKWARD: (0, 120, 255), PRUNED: (190, 190, 190),
+                 PATH: (255, 165, 0), FORMER_PATH: (255, 255, 255)}   # FORMER_PATH : remplacée par l'image d'origine
+SEARCH_EVENT_CODES = {event: code for code, event in enumerate(SEARCH_COLORS)}
+SEARCH_PALETTE = np.array(list(SEARCH_COLORS.values()), dtype=np.uint8)
+
+EVENT_BATCH_SIZE = 1024     # Nombre d'événements de recherche regroupés avant d'être transmis à l'interface
+OVERLAY_TILE_SIZE = 64      # Côté (en cases) des tuiles sur lesquelles est affichée la recherche
+LAUNCH_RETRY_DELAY = 20     # Délai (en ms) avant de relancer une recherche si la précédente ne s'est pas encore arrêtée
+
+# Noms affichés des stratégies de recherche et clés correspondantes dans solver.STRATEGIES
+# ("incremental" désigne le planificateur LPA* conservé entre deux recherches, "hpa" la recherche hiérarchique
+# "corridors" la recherche sur le graphe des couloirs et "alt" A* guidé par les tables de repères du niveau)
+STRATEGY_NAMES = {"A*": "astar", "A* (file indexée)": "astar_indexed", "A* bidirectionnel": "bidirectional",
+                  "Jump Point Search": "jps", "LPA* incrémental": "incremental", "HPA* hiérarchique": "hpa",
+                  "Graphe des couloirs": "corridors", "ARA* anytime": "anytime", "A* avec repères (ALT)": "alt",
+                  "A* à seaux (Dial)": "bucket", "A* risqué (lasers)": "risky"}
 
 
 class AStar:
     """
     Classe gérant la recherche de plus court chemin à l'aide de l'algorithme de A* (AStar)
+    Fait le lien entre l'interface graphique et le module solver qui réalise la recherche
 
     Attributs principaux :
         tk.Frame parent_frame: Frame parent sur laquelle se situe le labyrinthe à résoudre
 
         tuple(int, int) start: Point de départ de la recherche
         tuple(int, int) end: Point d'arrivée de la recherche
+
+        bool running: Booléen indiquant si une recherche lancée depuis l'interface n'est pas encore terminée
+        CancelToken token: Jeton d'annulation de la dernière recherche lancée
+        Histogram cancel_latency: Délais entre l'annulation d'une recherche lancée dans un Thread et son arrêt (en ms)
+        queue.SimpleQueue completed: File des résultats (jeton, chemin, statistiques) envoyés par le thread de recherche
+        callable on_complete: Fonction appelée depuis la boucle de tkinter avec les statistiques de chaque recherche
+                              terminée (show_result par défaut)
+
+        LPAStar planner: Planificateur incrémental dont l'état est conservé d'une recherche à l'autre
+        ClusterAbstraction abstraction: Abstraction hiérarchique de la grille utilisée par la dernière recherche HPA*
+        bool use_process: Booléen définissant si la recherche en cours, sans affichage, est lancée dans un processus
+                          séparé (choisi à chaque recherche : lancer un processus coûte quelques centaines de ms)
+        ProcessSolver process_solver: Objet lançant les recherches dans un processus séparé
+
+        queue.SimpleQueue events: File des lots d'événements envoyés par la recherche à l'interface
+        np.ndarray pixels: Image du labyrinthe avec les cases de la recherche, une case par pixel (tampon de dessin)
+        dict(int: tuple) tiles: Tuiles de la surcouche affichant la recherche : indice -> (id canvas, PhotoImage)
+        set(int) touched_tiles: Indices des tuiles de la surcouche contenant des cases de la recherche (en mode
+                                fenêtre, seules celles qui sont visibles sont affichées)
+        tuple(int, int, int, int) painted_box: Rectangle (x0, y0, x1, y1) des cases modifiées sur l'image d'affichage
+                                               depuis le dernier effacement (None si elle est intacte)
     """
 
-    def __init__(self, parent_frame):
+    def __init__(self, parent_frame, on_complete=None):
         """
         Initialise l'objet et récupère la frame parent
 
         Paramètres :
             tk.Frame parent_frame: Frame parent sur laquelle se situe le labyrinthe à résoudre
+            callable on_complete: (Optionnel) Fonction appelée avec les statistiques à la fin de chaque recherche non
+                                  annulée, depuis la boucle de tkinter (par défaut, affiche le résultat)
         """
         self.parent_frame = parent_frame
+        self.on_complete = self.show_result if on_complete is None else on_complete
 
         self.reinitialisation()
 
         self.start = (0, 0)
         self.end = (0, 0)
 
-        self.running = False    # Booléen permettant de stopper la recherche en cours
-        self.dist = {}          # Dictionnaire de distances
-        self.parent = {}        # Dictionnaire de parenté entre les points (au niveau de la recherche)
+        self.running = False    # Booléen indiquant si une recherche est en cours
+        self.token = CancelToken()  # Jeton d'annulation de la recherche en cours, remplacé à chaque recherche
+        self.cancel_latency = Histogram("cancel_latency_ms")
+        self.detailed_stats = False     # Booléen définissant si l'on affiche toutes les statistiques de la recherche
+        self.prune = False      # Booléen définissant si l'on comble les culs-de-sac avant la recherche
 
         self.shortest_path = [] # List des points formant le chemin le plus court
 
-        self.thread = Thread(target=self.find_shortest_path)
+        self.grid = None        # Grille des types de case décodée depuis l'image du labyrinthe
+        self.grid_image = None  # Image à partir de laquelle self.grid a été décodée
+
+        self.planner = None     # Créé à la première recherche incrémentale
+        self.abstraction = None # Reprise du cache de hpa ou mise à jour à chaque recherche hiérarchique
+
+        # Sans affichage de la recherche, rien n'oblige la recherche à partager le GIL avec l'interface
+        self.use_process = False
+        self.process_solver = ProcessSolver()
+
+        self.thread = Thread(target=self.find_shortest_path, daemon=True)
+        self.completed = queue.SimpleQueue()    # Résultats envoyés par le thread, lus depuis la boucle de tkinter
+
+        # Affichage de la recherche : le thread envoie des lots d'événements que l'interface dessine sur des tuiles
+        self.show_search = False
+        self.overlay = False        # Surcouche affichée : recherche ou chemins successifs d'une recherche anytime
+        self.events = queue.SimpleQueue()
+        self.batch = []
+        self.pixels = None
+        self.base_pixels = None     # Image du labyrinthe sans la recherche, pour effacer les anciens chemins
+        self.tiles = {}
+        self.touched_tiles = set()
+        self.painted_box = None
 
     def reinitialisation(self):
         """"
@@ -50,8 +129,35 @@ class AStar:
         self.img_gui = self.image.copy()
         self.image_tk = self.parent_frame.lab_image_tk
 
-        self.img_canvas_width = int(self.canvas.cget("width"))
-        self.img_canvas_height = int(self.canvas.cget("height"))
+        # Labyrinthe affiché par fenêtre (voir GUI.viewport) : l'image d'affichage est le labyrinthe agrandi en entier
+        self.viewport = getattr(self.parent_frame, "viewport", None)
+        if self.viewport is not None:
+            self.viewport.on_scroll = self.scroll_overlay
+        if self.viewport is not None and self.viewport.active:
+            self.img_canvas_width = self.image.width * self.viewport.cell_size
+            self.img_canvas_height = self.image.height * self.viewport.cell_size
+        else:
+            self.img_canvas_width = int(self.canvas.cget("width"))
+            self.img_canvas_height = int(self.canvas.cget("height"))
+
+    def get_grid(self):
+        """
+        Renvoie la grille des types de case du labyrinthe, décodée une seule fois tant que l'image ne change pas
+
+        Renvoi :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        """
+        if self.grid is None or self.grid_image is not self.image:
+            self.grid = image_to_grid(self.image)
+            self.grid_image = self.image
+
+        return self.grid
+
+    def invalidate_grid(self):
+        """
+        Signale que l'image du labyrinthe a été modifiée, la grille sera décodée à nouveau à la prochaine recherche
+        """
+        self.grid = None
 
     @staticmethod
     def manhattan_distance(p0, p1):
@@ -67,114 +173,471 @@ class AStar:
         """
         return abs(p0[0] - p1[0]) + abs(p0[1] - p1[1])
 
-    def find_shortest_path(self, show_search=False):
+    def show_cell(self, event, x, y):
+        """
+        Enregistre une case visitée ou ajoutée à la file lors de la recherche (appelée depuis le thread de recherche)
+        Les cases sont transmises à l'interface par lots, pour ne pas la solliciter à chaque case
+
+        Paramètres :
+            str event: Type d'événement de la recherche (solver.VISITED ou solver.FRONTIER)
+            int x: Abscisse de la case
+            int y: Ordonnée de la case
+        """
+        self.batch.append((SEARCH_EVENT_CODES[event], x, y))
+        if len(self.batch) >= EVENT_BATCH_SIZE:
+            self.flush_events()
+
+    def show_path_cell(self, event, x, y):
+        """
+        Enregistre uniquement les cases des chemins successifs d'une recherche anytime, lorsque l'on n'affiche pas
+        la recherche. Chaque case est transmise aussitôt pour que le chemin apparaisse sans attendre
+
+        Paramètres :
+            str event: Type d'événement de la recherche
+            int x: Abscisse de la case
+            int y: Ordonnée de la case
+        """
+        if event == PATH or event == FORMER_PATH:
+            self.batch.append((SEARCH_EVENT_CODES[event], x, y))
+            self.flush_events()
+
+    def flush_events(self):
+        """
+        Transmet à l'interface le lot d'événements en cours
+        """
+        if self.batch:
+            self.events.put(self.batch)
+            self.batch = []
+
+    def paint_events(self):
+        """
+        Dessine les lots d'événements reçus : les cases sont coloriées dans le tampon, puis seules les tuiles contenant
+        des cases modifiées sont redimensionnées et affichées
+        """
+        batches = []
+        try:
+            while True:
+                batches.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+
+        if not batches:
+            return
+
+        codes, xs, ys = np.array([event for batch in batches for event in batch]).T
+
+        # Seul le dernier événement de chaque case compte
+        cells = ys * self.pixels.shape[1] + xs
+        last = cells.size - 1 - np.unique(cells[::-1], return_index=True)[1]
+        self.pixels.reshape(-1, 3)[cells[last]] = SEARCH_PALETTE[codes[last]]
+
+        # Les cases d'un ancien chemin retrouvent leur couleur d'origine
+        former = cells[last][codes[last] == SEARCH_EVENT_CODES[FORMER_PATH]]
+        self.pixels.reshape(-1, 3)[former] = self.base_pixels.reshape(-1, 3)[former]
+
+        # En mode fenêtre, les tuiles hors de la fenêtre ne sont affichées qu'en y entrant (voir scroll_overlay)
+        nb_tiles_x = -(-self.pixels.shape[1] // OVERLAY_TILE_SIZE)
+        visible = self.visible_overlay_tiles()
+        for tile in np.unique(ys[last] // OVERLAY_TILE_SIZE * nb_tiles_x + xs[last] // OVERLAY_TILE_SIZE).tolist():
+            self.touched_tiles.add(tile)
+            if visible is None or tile in visible:
+                self.paint_tile(tile, nb_tiles_x)
+
+    def visible_overlay_tiles(self):
+        """
+        Renvoi :
+            set(int): Indices des tuiles de la surcouche au moins en partie visibles dans la fenêtre du labyrinthe,
+                      None si le labyrinthe est affiché en entier
+        """
+        if self.viewport is None or not self.viewport.active:
+            return None
+        if self.viewport.origin is None:
+            return set()    # Fenêtre pas encore placée
+
+        size = OVERLAY_TILE_SIZE * self.viewport.cell_size
+        x0, y0 = self.viewport.origin
+        nb_tiles_x = -(-self.pixels.shape[1] // OVERLAY_TILE_SIZE)
+        nb_tiles_y = -(-self.pixels.shape[0] // OVERLAY_TILE_SIZE)
+
+        return {ty * nb_tiles_x + tx
+                for tx in range(x0 // size, min((x0 + self.viewport.width - 1) // size + 1, nb_tiles_x))
+                for ty in range(y0 // size, min((y0 + self.viewport.height - 1) // size + 1, nb_tiles_y))}
+
+    def scroll_overlay(self):
+        """
+        Fait suivre la fenêtre du labyrinthe à la surcouche de recherche (appelée par le Viewport après chaque
+        défilement) : les tuiles sorties de la fenêtre sont supprimées, et celles qui y entrent sont rendues depuis
+        le tampon pixels
+        """
+        if not self.overlay:
+            return
+
+        visible = self.visible_overlay_tiles()
+        if visible is None:
+            return
+
+        for tile in list(self.tiles):
+            if tile not in visible:
+                self.canvas.delete(self.tiles.pop(tile)[0])
+
+        nb_tiles_x = -(-self.pixels.shape[1] // OVERLAY_TILE_SIZE)
+        for tile in visible & self.touched_tiles:
+            if tile not in self.tiles:
+                self.paint_tile(tile, nb_tiles_x)
+
+    def paint_tile(self, tile, nb_tiles_x):
+        """
+        Affiche une tuile de la surcouche de recherche, en la créant juste au-dessus de l'image du labyrinthe si besoin
+
+        Paramètres :
+            int tile: Indice de la tuile
+            int nb_tiles_x: Nombre de tuiles par ligne
+        """
+        ty, tx = divmod(tile, nb_tiles_x)
+        x0, y0 = tx * OVERLAY_TILE_SIZE, ty * OVERLAY_TILE_SIZE
+        factor_x = self.img_canvas_width // self.pixels.shape[1]
+        factor_y = self.img_canvas_height // self.pixels.shape[0]
+
+        region = Image.fromarray(self.pixels[y0:y0 + OVERLAY_TILE_SIZE, x0:x0 + OVERLAY_TILE_SIZE])
+        region = region.resize((region.width * factor_x, region.height * factor_y), Image.NEAREST)
+
+        if tile in self.tiles:
+            self.tiles[tile][1].paste(region)
+        else:
+            photo = ImageTk.PhotoImage(region)
+            item = self.canvas.create_image(x0 * factor_x, y0 * factor_y, anchor=tk.NW, image=photo)
+            self.canvas.tag_raise(item, self.id_image_canvas)
+            self.tiles[tile] = (item, photo)
+
+    def clear_overlay(self):
+        """
+        Supprime les tuiles de la surcouche de recherche
+        """
+        for item, _ in self.tiles.values():
+            self.canvas.delete(item)
+        self.tiles = {}
+        self.touched_tiles = set()
+
+    def find_shortest_path(self, token, show_search=False, strategy="astar"):
         """
         Fonction de recherche de plus court chemin entre le départ et l'arrivée sur l'image du labyrinthe
+        La recherche est déléguée au module solver, indépendant de l'interface graphique
+        Le résultat n'est pas affiché ici : il est placé dans la file completed, lue depuis la boucle de tkinter
 
         Paramètres :
+            CancelToken token: Jeton d'annulation de la recherche
             bool show_search: Booléen définissant si l'on réalise l'affichage des points visités lors de la recherche
+            str strategy: Nom de la stratégie de recherche (clé de solver.STRATEGIES)
         """
-        t0 = time()
-        i = 0                       # Permet d'ordonner les points de même valeur de distance au départ + heuristique
-        pq = PriorityQueue()        # File triée des points à visiter
-        pq.put((self.manhattan_distance(self.start, self.end), -i, self.start))
+        if show_search:
+            observer = self.show_cell
+        elif strategy == "anytime":
+            observer = self.show_path_cell    # Les améliorations du chemin sont affichées même sans la recherche
+        else:
+            observer = None
+
+        if strategy == "incremental":
+            # Seules les cases modifiées depuis la recherche précédente sont prises en compte
+            if self.planner is None:
+                self.planner = LPAStar(self.get_grid(), self.start, self.end)
+            path, stats = self.planner.solve(self.get_grid(), self.start, self.end, observer=observer,
+                                             running=token.running, trace_memory=self.detailed_stats)
+        elif strategy == "hpa":
+            # L'abstraction d'un niveau déjà vu est en cache, celle du niveau en cours d'édition est mise à jour
+            # (une mise à jour interrompue la laisse incomplète : elle sera reconstruite à la prochaine recherche)
+            self.abstraction = get_abstraction(self.get_grid(), previous=self.abstraction, running=token.running)
+            if self.abstraction is None:
+                path, stats = [], SearchStats(strategy)
+                stats.cancelled = True
+            else:
+                path, stats = self.abstraction.solve(self.start, self.end, observer=observer, running=token.running,
+                                                     trace_memory=self.detailed_stats)
+        elif strategy == "corridors":
+            # Le graphe de chaque niveau est construit une seule fois puis repris du cache
+            graph = get_corridor_graph(self.get_grid(), running=token.running)
+            if graph is None:
+                path, stats = [], SearchStats(strategy)
+                stats.cancelled = True
+            else:
+                path, stats = graph.solve(self.start, self.end, observer=observer, running=token.running,
+                                          trace_memory=self.detailed_stats)
+        elif strategy == "alt":
+            # Tables construites en arrière-plan au chargement du niveau (on attend la fin de leur construction si besoin)
+            # ou, en mode création, par la recherche elle-même
+            landmarks = get_landmarks(self.get_grid(), self.end, running=token.running)
+            if landmarks is None:
+                path, stats = [], SearchStats(strategy)
+                stats.cancelled = True
+            else:
+                path, stats = landmarks.solve(self.start, self.end, observer=observer, running=token.running,
+                                              trace_memory=self.detailed_stats)
+        else:
+            path, stats = solve(self.get_grid(), self.start, self.end, strategy=strategy, observer=observer,
+                                running=token.running, trace_memory=self.detailed_stats, prune=self.prune)
 
-        self.dist = {self.start: 0}
-        self.parent = {self.start: None}
-        self.shortest_path = []
+        # Seul le thread de recherche enregistre ces délais : une seule recherche tourne à la fois
+        if token.latency is not None:
+            self.cancel_latency.record(token.latency * 1000)
 
-        found = False
+        self.flush_events()
+        self.completed.put((token, path, stats))
 
-        while not pq.empty() and not found and self.running:
-            weight, j, current = pq.get()
+    def complete(self, path, stats):
+        """
+        Termine une recherche depuis la boucle de tkinter : transmet ses statistiques à on_complete, sauf si elle a été
+        annulée, puis la marque comme terminée
 
-            if show_search:
-                self.img_gui.putpixel(current, (255, 182, 193))
+        Paramètres :
+            list(tuple(int, int)) path: Chemin trouvé
+            SearchStats stats: Statistiques de la recherche
+        """
+        self.shortest_path = path
+        if not stats.cancelled:
+            self.on_complete(stats)
 
-            if current == self.end:
-                found = True
+        self.running = False
 
-            elif weight - self.manhattan_distance(current, self.end) == self.dist[current]:
+    def show_result(self, stats):
+        """
+        Affiche le chemin trouvé et un message récapitulant la recherche, puis marque la recherche comme terminée
 
-                if (current[0] + current[1]) % 2 == 0:
-                    moves = [(-1, 0), (0, 1), (0, -1), (1, 0)]
-                else:
-                    moves = [(1, 0), (0, -1), (0, 1), (-1, 0)]
+        Paramètres :
+            SearchStats stats: Statistiques de la recherche
+        """
+        details = self.format_stats(stats) if self.detailed_stats else ""
 
-                for dx, dy in moves:
-                    neighbour = (current[0] + dx, current[1] + dy)
+        if stats.found:
+            self.show_path(self.shortest_path)
 
-                    if 0 <= neighbour[0] < self.image.width and 0 <= neighbour[1] < self.image.height:
+            # Une recherche anytime arrêtée par son budget de temps garde un chemin qui n'est pas forcément optimal
+            if stats.suboptimality is not None and stats.suboptimality > 1:
+                details = f"\nLe chemin est au plus {stats.suboptimality:g} fois plus long que le plus court" + details
 
-                        if self.image.getpixel(neighbour) == (255, 255, 255):
+            tk.messagebox.showinfo("Info", f"Le chemin a été trouvé en {stats.time: .2f} s !\n"
+                                           f"({stats.nodes_expanded} cases développées)" + details)
+        else:
+            tk.messagebox.showerror("Erreur", f"Le labyrinthe n'est pas solvable ({stats.time: .2f} s, "
+                                              f"{stats.nodes_expanded} cases développées)" + details)
 
-                            if neighbour not in self.dist or self.dist[neighbour] > self.dist[current] + 1:
-                                self.dist[neighbour] = self.dist[current] + 1
-                                self.parent[neighbour] = current
+    @staticmethod
+    def format_stats(stats):
+        """
+        Met en forme les statistiques détaillées d'une recherche pour les afficher
 
-                                i += 1
-                                pq.put((self.dist[neighbour] + self.manhattan_distance(neighbour, self.end), -i, neighbour))
+        Paramètres :
+            SearchStats stats: Statistiques de la recherche
+
+        Renvoi :
+            str: Une ligne par statistique
+        """
+        text = f"\n\nStratégie : {stats.strategy}\n" \
+               f"Ajouts à la file : {stats.heap_pushes}\n" \
+               f"Entrées périmées ignorées : {stats.stale_pops}\n" \
+               f"Taille maximale de la file : {stats.peak_open}\n" \
+               f"Longueur du chemin : {stats.path_length}\n" \
+               f"Durée : {stats.time * 1000: .1f} ms"
+        if stats.peak_memory is not None:
+            text += f"\nPic de mémoire : {stats.peak_memory / 1024: .0f} Kio"
+        if stats.prune_time is not None:
+            text += f"\nCases élaguées : {stats.pruned_cells} en {stats.prune_time * 1000: .1f} ms"
+
+        return text
+
+    def poll_process(self, token, delay):
+        """
+        Vérifie si la recherche lancée dans un processus séparé est terminée et affiche alors son résultat
+        Les vérifications s'arrêtent si la recherche a été annulée entre-temps (cancel a déjà prévenu le processus)
 
-                                if show_search:
-                                    self.img_gui.putpixel(neighbour, (180, 0, 255))
+        Paramètres :
+            CancelToken token: Jeton d'annulation de la recherche
+            int delay: Délai (en ms) après lequel on vérifie à nouveau
+        """
+        if token.cancelled:
+            return
 
-        if self.running:
-            if found:
-                current = self.end
-                while current is not None:
-                    self.img_gui.putpixel(current, (0, 255, 0))
+        result = self.process_solver.poll()
+        if result is None:
+            self.canvas.after(delay, lambda: self.poll_process(token, delay))
+        else:
+            self.complete(*result)
 
-                    self.shortest_path.append(current)
-                    current = self.parent[current]
-                self.shortest_path.reverse()
+    def show_path(self, path):
+        """
+        Affiche un chemin en vert sur l'image du labyrinthe
 
-                t1 = time()
+        Paramètres :
+            list(tuple(int, int)) path: Liste des cases du chemin
+        """
+        for point in path:
+            self.img_gui.putpixel(point, (0, 255, 0))
 
-                self.image_tk.paste(self.img_gui.resize((self.img_canvas_width, self.img_canvas_height), Image.NEAREST))
+        if path:
+            xs, ys = zip(*path)
+            self.mark_painted((min(xs), min(ys), max(xs) + 1, max(ys) + 1))
+            self.paint_image((min(xs), min(ys), max(xs) + 1, max(ys) + 1))
 
-                self.parent_frame.valid = True
-                tk.messagebox.showinfo("Info", f"Le chemin a été trouvé en {t1 - t0: .2f} s !")
-            else:
-                t1 = time()
-                tk.messagebox.showerror("Erreur", f"Le labyrinthe n'est pas solvable ({t1 - t0: .2f} s)")
+    def paint_image(self, box=None):
+        """
+        Affiche l'image img_gui : redimensionnée sur l'image d'affichage, ou, si le labyrinthe est affiché par
+        fenêtre, sur les seules tuiles visibles qui recoupent les cases modifiées
 
-            self.running = False
+        Paramètres :
+            tuple(int, int, int, int) box: (Optionnel) Rectangle (x0, y0, x1, y1) des cases modifiées, toutes par défaut
+        """
+        if self.viewport is not None and self.viewport.active:
+            self.viewport.refresh(self.img_gui, box)
+        else:
+            self.image_tk.paste(self.img_gui.resize((self.img_canvas_width, self.img_canvas_height), Image.NEAREST))
 
-    def update(self, delay):
+    def mark_painted(self, box):
         """
-        Mets à jour l'image affichée du labyrinthe
+        Ajoute un rectangle de cases au rectangle des cases modifiées sur l'image d'affichage, que la frame peut
+        effacer sans redessiner toute l'image
 
         Paramètres :
-            int delay: Délai (en ms) après lequel on appelle à nouveau la fonction
+            tuple(int, int, int, int) box: Rectangle (x0, y0, x1, y1) des cases modifiées
         """
-        self.image_tk.paste(self.img_gui.resize((self.img_canvas_width, self.img_canvas_height), Image.NEAREST))
-        if self.thread.is_alive():
-            self.canvas.after(delay, lambda: self.update(delay))
+        if self.painted_box is not None:
+            box = (min(box[0], self.painted_box[0]), min(box[1], self.painted_box[1]),
+                   max(box[2], self.painted_box[2]), max(box[3], self.painted_box[3]))
+        self.painted_box = box
+
+    def show_known_path(self, path):
+        """
+        Affiche un chemin déjà connu (sans lancer de recherche) sur l'image actuelle du labyrinthe
+
+        Paramètres :
+            list(tuple(int, int)) path: Liste des cases du chemin
+        """
+        self.reinitialisation()
+        self.img_gui = self.image.copy()
+        self.shortest_path = path
+        self.show_path(path)
 
-    def run(self, start, end, show_search=False):
+    def update(self, token, delay):
         """
-        Lance la recherche de plus court chemin dans un Thread
+        Dessine les cases reçues du thread de recherche et, une fois la recherche terminée, affiche son résultat
+        Tout l'affichage est fait depuis la boucle de tkinter, jamais depuis le thread de recherche
+        Les mises à jour s'arrêtent si la recherche a été annulée (cancel a déjà retiré la surcouche)
 
         Paramètres :
+            CancelToken token: Jeton d'annulation de la recherche
+            int delay: Délai (en ms) après lequel on appelle à nouveau la fonction
+        """
+        if token.cancelled:
+            return
+
+        # Le résultat est lu avant de vider la file des événements pour ne manquer aucun lot
+        result = None
+        try:
+            while result is None or result[0] is not token:
+                result = self.completed.get_nowait()    # Les résultats de recherches annulées sont ignorés
+        except queue.Empty:
+            result = None
+
+        if self.overlay:
+            self.paint_events()
+
+        if result is None:
+            self.canvas.after(delay, lambda: self.update(token, delay))
+            return
+
+        if self.overlay:
+            # Le tampon devient l'image d'affichage, qui est collée une seule fois avant de retirer les tuiles
+            self.img_gui = Image.fromarray(self.pixels)
+            self.mark_painted((0, 0, self.pixels.shape[1], self.pixels.shape[0]))
+            self.paint_image()
+            self.clear_overlay()
+
+        self.complete(*result[1:])
+
+    def run(self, start, end, show_search=False, strategy="astar", detailed_stats=False, prune=False,
+            use_process=False):
+        """
+        Lance la recherche de plus court chemin dans un processus séparé si on le demande, que l'on n'affiche pas la
+        recherche et qu'elle ne dépend pas d'un état conservé (planificateur incrémental), dans un Thread sinon
+        Une recherche anytime est toujours lancée dans un Thread, pour afficher ses chemins successifs
+        Une recherche déjà en cours est annulée
+
+        Paramètres :
+            tuple(int, int) start: Point de départ de la recherche
+            tuple(int, int) end: Point d'arrivée de la recherche
             bool show_search: Booléen définissant si l'on réalise l'affichage des points visités lors de la recherche
+            str strategy: Nom de la stratégie de recherche (clé de solver.STRATEGIES)
+            bool detailed_stats: Booléen définissant si l'on affiche toutes les statistiques de la recherche (la mesure
+                                 du pic de mémoire ralentit la recherche)
+            bool prune: Booléen définissant si l'on comble les culs-de-sac avant la recherche (stratégies de
+                        solver.STRATEGIES uniquement, les cases retirées sont affichées avec la recherche)
+            bool use_process: Booléen définissant si l'on lance la recherche dans un processus séparé, pour qu'elle ne
+                              partage pas le GIL avec l'interface (utile pour les longues recherches uniquement, le
+                              lancement du processus coûtant quelques centaines de ms)
+        """
+        self.cancel()
+        self.token = CancelToken()
+        self.running = True
+        self.launch(self.token, start, end, show_search, strategy, detailed_stats, prune, use_process)
+
+    def launch(self, token, start, end, show_search, strategy, detailed_stats, prune, use_process):
+        """
+        Lance la recherche demandée par run, dès que le thread de la recherche précédente s'est arrêté : annulée, elle
+        s'arrête à sa prochaine vérification du jeton, et l'on vérifie à nouveau plus tard au lieu de l'attendre
+
+        Paramètres :
+            CancelToken token: Jeton d'annulation de la recherche
+            (voir run pour les autres paramètres)
         """
+        if token.cancelled:
+            return
+        if self.thread.is_alive():
+            self.canvas.after(LAUNCH_RETRY_DELAY, lambda: self.launch(token, start, end, show_search, strategy,
+                                                                      detailed_stats, prune, use_process))
+            return
+
         self.reinitialisation()
         self.start = start
         self.end = end
-        self.running = True
+        self.detailed_stats = detailed_stats
+        self.prune = prune
+        self.use_process = use_process
 
         self.img_gui = self.image.copy()
-        self.thread = Thread(target=self.find_shortest_path, args=(show_search,))
-        self.thread.start()
-        if show_search:
-            self.update(50)
-
-    def quit(self):
+        self.get_grid()
+
+        self.show_search = show_search
+        self.overlay = show_search or strategy == "anytime"
+        if self.overlay:
+            self.clear_overlay()
+            self.pixels = np.array(self.img_gui.convert("RGB"))
+            self.base_pixels = self.pixels.copy()
+            self.events = queue.SimpleQueue()
+            self.batch = []
+
+        if self.use_process and not self.overlay and strategy in STRATEGIES:
+            self.process_solver.start(self.grid, start, end, strategy=strategy, trace_memory=self.detailed_stats,
+                                      prune=prune)
+            self.poll_process(token, 50)
+        else:
+            # Thread démon : une recherche annulée qui finit de construire une structure en cache n'empêche pas de quitter
+            self.thread = Thread(target=self.find_shortest_path, args=(token, show_search, strategy), daemon=True)
+            self.thread.start()
+            self.update(token, 50)
+
+    def cancel(self):
         """
-        Stoppe la recherche et attend que le thread se termine
+        Annule la recherche en cours et retire sa surcouche, sans attendre que le thread ou le processus s'arrête
         """
         self.running = False
+        self.token.cancel()
+        self.process_solver.cancel()
 
-        # Attend que le thread se finisse
-        if self.thread.is_alive():
-            self.thread.join()
+        if self.overlay:
+            self.clear_overlay()
+            self.overlay = False
+
+    def quit(self):
+        """
+        Stoppe la recherche en cours, sans bloquer l'interface (voir cancel), et arrête les processus de recherche
+        annulés qui tournent encore pour libérer leur mémoire partagée
+        """
+        self.cancel()
+        self.process_solver.shutdown()
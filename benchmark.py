@@ -0,0 +1,207 @@
+import argparse
+import json
+from PIL import Image
+from grid import image_to_grid
+from solver import solve, STRATEGIES, start_memory_trace, stop_memory_trace
+from incremental import LPAStar
+from hpa import ClusterAbstraction
+from corridors import CorridorGraph
+from landmarks import LandmarkTable
+
+
+# Colonnes du tableau affiché : (titre, attribut de SearchStats)
+COLUMNS = (("chemin", "path_length"), ("développées", "nodes_expanded"), ("ajouts", "heap_pushes"),
+           ("périmées", "stale_pops"), ("file max", "peak_open"), ("élaguées", "pruned_cells"))
+
+# Ralentissement toléré par rapport à la référence avant de signaler une régression
+TIME_TOLERANCE = 1.5
+TIME_MIN = 0.01     # Durée (en s) en dessous de laquelle les écarts de durée ne sont pas significatifs
+
+
+def run_search(grid, start, end, strategy, trace_memory=False, prune=False):
+    """
+    Lance une recherche avec la stratégie demandée, y compris le planificateur incrémental (partant d'un état vide)
+    et les recherches hiérarchique, sur le graphe des couloirs et ALT (dont le prétraitement est fait hors de la mesure)
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        str strategy: Nom de la stratégie de recherche (clé de solver.STRATEGIES, "incremental", "hpa",
+                        "corridors" ou "alt")
+        bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+        bool prune: Booléen définissant si l'on comble les culs-de-sac avant la recherche (stratégies de
+                    solver.STRATEGIES uniquement)
+
+    Renvoi :
+        SearchStats stats: Statistiques de la recherche
+    """
+    if strategy == "hpa":
+        return ClusterAbstraction(grid).solve(start, end, trace_memory=trace_memory)[1]
+    if strategy == "corridors":
+        return CorridorGraph(grid).solve(start, end, trace_memory=trace_memory)[1]
+    if strategy == "alt":
+        return LandmarkTable(grid, end).solve(start, end, trace_memory=trace_memory)[1]
+    if strategy != "incremental":
+        return solve(grid, start, end, strategy=strategy, trace_memory=trace_memory, prune=prune)[1]
+
+    # La mémoire du planificateur est allouée à sa création, la mesure doit donc l'englober
+    trace = start_memory_trace() if trace_memory else None
+    stats = LPAStar(grid, start, end).solve(grid, start, end)[1]
+    if trace is not None:
+        stop_memory_trace(trace, stats)
+
+    return stats
+
+
+def benchmark(levels_path="data/levels.json", level_names=None, strategies=None, repeat=3, trace_memory=False,
+              prune=False):
+    """
+    Mesure les statistiques de chaque stratégie sur les niveaux enregistrés
+    Les compteurs ne dépendent pas de l'exécution, seule la durée est prise comme la meilleure sur plusieurs essais
+
+    Paramètres :
+        str levels_path: Chemin du fichier json des niveaux
+        list(str) level_names: (Optionnel) Noms des niveaux à mesurer, tous par défaut
+        list(str) strategies: (Optionnel) Stratégies à comparer, toutes par défaut
+        int repeat: Nombre d'essais par niveau et par stratégie
+        bool trace_memory: Booléen définissant si l'on mesure aussi le pic de mémoire (lors d'un essai supplémentaire)
+        bool prune: Booléen définissant si l'on comble les culs-de-sac avant chaque recherche
+
+    Renvoi :
+        dict(str: dict(str: dict)) results: Statistiques (SearchStats.as_dict) par niveau puis par stratégie
+    """
+    with open(levels_path, "r") as file:
+        dico_niveaux = json.load(file)
+
+    if strategies is None:
+        strategies = list(STRATEGIES) + ["incremental", "hpa", "corridors", "alt"]
+
+    results = {}
+    for name, params in dico_niveaux.items():
+        if level_names is not None and name not in level_names:
+            continue
+
+        grid = image_to_grid(Image.open(params["image_path"]))
+        start, end = tuple(params["start"]), tuple(params["end"])
+
+        results[name] = {}
+        for strategy in strategies:
+            stats = min((run_search(grid, start, end, strategy, prune=prune) for _ in range(repeat)), key=lambda s: s.time)
+            if trace_memory:
+                # La mesure de la mémoire fausse la durée : elle est faite à part
+                stats.peak_memory = run_search(grid, start, end, strategy, trace_memory=True, prune=prune).peak_memory
+
+            results[name][strategy] = stats.as_dict()
+
+    return results
+
+
+def compare(results, reference):
+    """
+    Compare des résultats à une référence enregistrée et liste les régressions
+
+    Paramètres :
+        dict results: Résultats renvoyés par benchmark
+        dict reference: Résultats de référence, de même forme
+
+    Renvoi :
+        list(str) regressions: Description de chaque régression trouvée
+    """
+    regressions = []
+    for name, by_strategy in results.items():
+        for strategy, stats in by_strategy.items():
+            if strategy not in reference.get(name, {}):
+                continue
+            ref = reference[name][strategy]
+
+            if stats["path_length"] != ref["path_length"]:
+                regressions.append(f"{name} / {strategy} : chemin de {stats['path_length']} cases au lieu de {ref['path_length']}")
+            if stats["nodes_expanded"] > ref["nodes_expanded"]:
+                regressions.append(f"{name} / {strategy} : {stats['nodes_expanded']} cases développées au lieu de {ref['nodes_expanded']}")
+            if stats["time"] > max(ref["time"] * TIME_TOLERANCE, TIME_MIN):
+                regressions.append(f"{name} / {strategy} : {stats['time'] * 1000:.1f} ms au lieu de {ref['time'] * 1000:.1f} ms")
+
+    return regressions
+
+
+def check_landmarks(results):
+    """
+    Vérifie que l'heuristique ALT guide mieux la recherche que la distance de manhattan : sur chaque niveau où A*
+    développe des cases hors du chemin, ALT doit en développer moins. Sinon les repères ne minorent rien, par exemple
+    s'ils ont été choisis dans une autre composante que le départ et l'arrivée
+
+    Paramètres :
+        dict results: Résultats renvoyés par benchmark
+
+    Renvoi :
+        list(str) anomalies: Description de chaque niveau où ALT ne fait pas mieux que A*
+    """
+    anomalies = []
+    for name, by_strategy in results.items():
+        if "astar" not in by_strategy or "alt" not in by_strategy:
+            continue
+        astar, alt = by_strategy["astar"], by_strategy["alt"]
+
+        if astar["found"] and astar["nodes_expanded"] >= astar["path_length"] and \
+                alt["nodes_expanded"] >= astar["nodes_expanded"]:
+            anomalies.append(f"{name} : ALT développe {alt['nodes_expanded']} cases, A* {astar['nodes_expanded']}")
+
+    return anomalies
+
+
+def print_table(results):
+    """
+    Affiche les résultats sous forme de tableau, une ligne par niveau et par stratégie
+
+    Paramètres :
+        dict results: Résultats renvoyés par benchmark
+    """
+    header = f"{'niveau':<24}{'stratégie':<15}" + "".join(f"{title:>13}" for title, _ in COLUMNS) + f"{'durée (ms)':>13}{'mémoire (Kio)':>15}"
+    print(header)
+    print("-" * len(header))
+
+    for name, by_strategy in results.items():
+        for strategy, stats in by_strategy.items():
+            memory = "-" if stats["peak_memory"] is None else f"{stats['peak_memory'] / 1024:.0f}"
+            print(f"{name:<24}{strategy:<15}" + "".join(f"{stats[key]:>13}" for _, key in COLUMNS) +
+                  f"{stats['time'] * 1000:>13.1f}{memory:>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare les stratégies de recherche sur les niveaux enregistrés")
+    parser.add_argument("--levels", nargs="*", help="Noms des niveaux à mesurer (tous par défaut)")
+    parser.add_argument("--strategies", nargs="*", help="Stratégies à comparer (toutes par défaut)")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'essais par mesure")
+    parser.add_argument("--memory", action="store_true", help="Mesure aussi le pic de mémoire (lent)")
+    parser.add_argument("--prune", action="store_true", help="Comble les culs-de-sac avant chaque recherche")
+    parser.add_argument("--save", help="Enregistre les résultats dans ce fichier json")
+    parser.add_argument("--compare", help="Fichier json de référence auquel comparer les résultats")
+    args = parser.parse_args()
+
+    results = benchmark(level_names=args.levels, strategies=args.strategies, repeat=args.repeat, trace_memory=args.memory,
+                        prune=args.prune)
+    print_table(results)
+
+    anomalies = check_landmarks(results)
+    for anomaly in anomalies:
+        print("Repères inefficaces :", anomaly)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            file.write(json.dumps(results, indent=4))
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = compare(results, json.load(file))
+
+        print()
+        for regression in regressions:
+            print("Régression :", regression)
+        if not regressions:
+            print("Aucune régression")
+        else:
+            raise SystemExit(1)
+
+    if anomalies:
+        raise SystemExit(1)
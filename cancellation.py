@@ -0,0 +1,52 @@
+from time import perf_counter
+
+
+CHECK_DELAY = 0.05      # Délai maximal (en s) entre deux vérifications du jeton pendant une attente
+
+
+class CancelToken:
+    """
+    Jeton d'annulation d'une recherche, partagé entre l'interface qui l'annule et la recherche qui le consulte
+    Annuler ne fait que lever un drapeau : l'interface n'attend jamais la fin de la recherche, qui s'arrête d'elle-même
+    à sa prochaine vérification. Les recherches vérifient le jeton à chaque case sortie de leur file, les attentes
+    (construction des tables de repères lancée par un autre Thread) au moins toutes les CHECK_DELAY s, et les
+    constructions qui précèdent la recherche (tables de repères, abstraction HPA*, graphe des couloirs, mise à jour
+    de LPA*) à chaque pas de leurs parcours en largeur ou entre leurs étapes vectorisées
+    Un nouveau jeton est créé pour chaque recherche : le résultat d'une recherche annulée est reconnu et ignoré
+
+    Attributs principaux :
+        bool cancelled: Booléen indiquant si la recherche a été annulée
+        float cancel_time: Instant de l'annulation (perf_counter), None si la recherche n'a pas été annulée
+        float latency: Délai (en s) entre l'annulation et la première vérification qui l'a constatée, None sinon
+                       (enregistré dans l'histogramme AStar.cancel_latency, voir --metrics de main.py)
+    """
+
+    def __init__(self):
+        """
+        Initialise un jeton non annulé
+        """
+        self.cancelled = False
+        self.cancel_time = None
+        self.latency = None
+
+    def cancel(self):
+        """
+        Annule la recherche, sans attendre qu'elle s'arrête (peut être appelée depuis n'importe quel Thread)
+        """
+        if not self.cancelled:
+            self.cancel_time = perf_counter()
+            self.cancelled = True
+
+    def running(self):
+        """
+        Fonction de vérification passée aux recherches (paramètre running de solver.solve et des autres stratégies)
+
+        Renvoi :
+            bool: False lorsque la recherche doit être interrompue
+        """
+        if self.cancelled:
+            if self.latency is None:
+                self.latency = perf_counter() - self.cancel_time
+            return False
+
+        return True
@@ -0,0 +1,138 @@
+import numpy as np
+from grid import FLOOR
+
+
+def label_components(mask, first_label=1):
+    """
+    Étiquette les composantes 4-connexes d'un masque sans boucle Python par case :
+    les cases sont regroupées en segments horizontaux, puis les segments qui se touchent verticalement sont
+    fusionnés par une union-find vectorisée (rattachement des racines puis compression des chemins)
+
+    Paramètres :
+        np.ndarray mask: Tableau de bool de dimensions (hauteur, longueur), True pour les cases à étiqueter
+        int first_label: Plus petite étiquette à attribuer
+
+    Renvoi :
+        np.ndarray labels: Tableau int32 de dimensions (hauteur, longueur), 0 hors du masque
+        int next_label: Première étiquette non utilisée
+    """
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    if not mask.any():
+        return labels, first_label
+
+    # Numéro de segment horizontal de chaque case (un segment commence là où la case de gauche n'est pas du masque)
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    runs = np.cumsum(starts.ravel(), dtype=np.int32).reshape(mask.shape)
+    nb_runs = int(runs[-1, -1])
+
+    # Paires de segments adjacents verticalement, sans les répétitions consécutives d'une même paire
+    vertical = mask[1:] & mask[:-1]
+    a, b = runs[1:][vertical], runs[:-1][vertical]
+    new_pair = np.ones(a.size, dtype=bool)
+    new_pair[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+    a, b = a[new_pair], b[new_pair]
+
+    parent = np.arange(nb_runs + 1, dtype=np.int32)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        if (root_a == root_b).all():
+            break
+
+        low = np.minimum(root_a, root_b)
+        np.minimum.at(parent, root_a, low)
+        np.minimum.at(parent, root_b, low)
+
+        # Compression : chaque segment pointe directement vers sa racine
+        while True:
+            grand_parent = parent[parent]
+            if (grand_parent == parent).all():
+                break
+            parent = grand_parent
+
+    # Renumérote les racines de manière compacte à partir de first_label
+    roots = parent == np.arange(nb_runs + 1)
+    roots[0] = False
+    compact = np.cumsum(roots, dtype=np.int32) + (first_label - 1)
+    labels[mask] = compact[parent[runs[mask]]]
+
+    return labels, int(compact[-1]) + 1
+
+
+class ComponentIndex:
+    """
+    Index des composantes connexes des cases de sol d'un labyrinthe, mis à jour au fil des modifications :
+    seules les composantes touchées par une modification sont réétiquetées
+
+    Attributs principaux :
+        np.ndarray grid: Grille des types de case actuellement indexée
+        np.ndarray labels: Tableau int32 de dimensions (hauteur, longueur) de l'étiquette de composante de chaque case
+                           (0 pour les cases qui ne sont pas du sol)
+        int next_label: Première étiquette non utilisée
+    """
+
+    def __init__(self, grid):
+        """
+        Étiquette toutes les composantes de la grille
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        """
+        self.grid = grid
+        self.labels, self.next_label = label_components(grid == FLOOR)
+
+    def update(self, grid):
+        """
+        Met à jour l'index après une modification de la grille
+        Les composantes qui ont perdu des cases peuvent s'être coupées, et celles qui touchent des nouvelles cases de
+        sol peuvent avoir fusionné : seule la zone formée par ces composantes est réétiquetée
+
+        Paramètres :
+            np.ndarray grid: Nouvelle grille des types de case, de mêmes dimensions que la précédente
+        """
+        old_floor = self.grid == FLOOR
+        new_floor = grid == FLOOR
+        self.grid = grid
+
+        removed = old_floor & ~new_floor
+        added = new_floor & ~old_floor
+
+        if not removed.any() and not added.any():
+            return
+
+        touched = set(np.unique(self.labels[removed]).tolist())
+        self.labels[removed] = 0
+
+        # Étiquettes des voisins des nouvelles cases de sol
+        if added.any():
+            touched.update(np.unique(self.labels[1:][added[:-1]]).tolist())
+            touched.update(np.unique(self.labels[:-1][added[1:]]).tolist())
+            touched.update(np.unique(self.labels[:, 1:][added[:, :-1]]).tolist())
+            touched.update(np.unique(self.labels[:, :-1][added[:, 1:]]).tolist())
+        touched.discard(0)
+
+        region = added | np.isin(self.labels, list(touched))
+        if not region.any():
+            return
+
+        # Réétiquette uniquement le rectangle englobant la zone touchée
+        rows = np.flatnonzero(region.any(axis=1))
+        columns = np.flatnonzero(region.any(axis=0))
+        window = (slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1))
+
+        labels, self.next_label = label_components(region[window], self.next_label)
+        self.labels[window][region[window]] = labels[region[window]]
+
+    def connected(self, p0, p1):
+        """
+        Indique si deux cases sont de sol et reliées par un chemin
+
+        Paramètres :
+            tuple(int, int) p0: Coordonnées de la première case
+            tuple(int, int) p1: Coordonnées de la deuxième case
+
+        Renvoi :
+            bool: True si les deux cases sont dans la même composante
+        """
+        label = self.labels[p0[1], p0[0]]
+        return bool(label != 0 and label == self.labels[p1[1], p1[0]])
@@ -0,0 +1,302 @@
+import numpy as np
+from grid import FLOOR, grid_digest, LRUCache
+from components import label_components
+from solver import SearchStats, graph_astar, timed_search
+
+
+CORRIDOR_CACHE_SIZE = 8     # Nombre de graphes de niveaux conservés en cache
+
+# Graphes déjà construits, indexés par l'empreinte de leur grille
+corridor_cache = LRUCache(CORRIDOR_CACHE_SIZE)
+
+
+class CorridorGraph:
+    """
+    Graphe des couloirs d'une grille : les cases de sol ayant exactement deux voisins de sol (cases de couloir) sont
+    contractées, et seules les autres cases de sol (carrefours, culs-de-sac, salles) restent des sommets
+    Deux sommets sont reliés par une arête dont le poids est la longueur du couloir qui les sépare
+    Les plus courts chemins sont les mêmes que sur la grille : une case de couloir ne peut qu'être traversée
+
+    Attributs principaux :
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        bytes cells: Types de case à plat, indexés par y * width + x
+        bytes corridor: Cases de couloir à plat (1 pour une case de couloir)
+        memoryview labels: Numéro du couloir de chaque case à plat (0 pour les cases qui ne sont pas de couloir)
+        int nb_nodes: Nombre de sommets du graphe
+        bool cancelled: Booléen indiquant si la construction a été interrompue (le graphe est alors incomplet)
+
+        memoryview offsets: Les arêtes partant de la case u sont aux positions offsets[u] à offsets[u + 1] - 1
+        memoryview targets: Case d'arrivée de chaque arête
+        memoryview weights: Longueur de chaque arête
+        memoryview chains: Couloir emprunté par chaque arête (0 pour deux sommets voisins)
+    """
+
+    def __init__(self, grid, running=None):
+        """
+        Construit le graphe des couloirs d'une grille sans boucle Python par case : les couloirs sont étiquetés comme
+        des composantes connexes, et chacun touche exactement deux sommets à ses extrémités
+        Chaque étape étant vectorisée, l'interruption n'est vérifiée qu'entre les étapes
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            callable running: (Optionnel) Fonction renvoyant False lorsque la construction doit être interrompue
+        """
+        self.height, self.width = grid.shape
+        self.cells = grid.tobytes()
+        self.cancelled = False
+
+        floor = grid == FLOOR
+        padded = np.pad(floor, 1)
+        degree = padded[:-2, 1:-1].astype(np.uint8) + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+
+        corridor = floor & (degree == 2)
+        node = floor & ~corridor
+        self.nb_nodes = int(np.count_nonzero(node))
+        self.corridor = corridor.tobytes()
+
+        labels, _ = label_components(corridor)
+        self.labels = memoryview(labels.ravel())
+        if running is not None and not running():
+            self.cancelled = True
+            return
+        sizes = np.bincount(labels.ravel())
+
+        flat = np.arange(grid.size).reshape(grid.shape)
+        sources, targets, weights, chains = [], [], [], []
+
+        # Sommets voisins : arête de longueur 1 dans les deux sens
+        for a, b in ((flat[:, :-1], flat[:, 1:]), (flat[:-1], flat[1:])):
+            both = node.ravel()[a] & node.ravel()[b]
+            sources += [a[both], b[both]]
+            targets += [b[both], a[both]]
+
+        nb_direct = sum(s.size for s in sources)
+        weights.append(np.ones(nb_direct, dtype=np.int32))
+        chains.append(np.zeros(nb_direct, dtype=np.int32))
+
+        if running is not None and not running():
+            self.cancelled = True
+            return
+
+        # Sommets aux extrémités de chaque couloir (un couloir qui forme une boucle fermée n'en a aucun)
+        ends, end_chains = [], []
+        for a, b in ((flat[:, :-1], flat[:, 1:]), (flat[:-1], flat[1:])):
+            for u, v in ((a, b), (b, a)):
+                touching = node.ravel()[u] & corridor.ravel()[v]
+                ends.append(u[touching])
+                end_chains.append(labels.ravel()[v[touching]])
+
+        ends, end_chains = np.concatenate(ends), np.concatenate(end_chains)
+        order = np.argsort(end_chains, kind="stable")
+        pairs = ends[order].reshape(-1, 2)
+        pair_chains = end_chains[order][::2]
+
+        # Un couloir qui revient à son point de départ n'est jamais utile à un plus court chemin
+        distinct = pairs[:, 0] != pairs[:, 1]
+        pairs, pair_chains = pairs[distinct], pair_chains[distinct]
+
+        sources += [pairs[:, 0], pairs[:, 1]]
+        targets += [pairs[:, 1], pairs[:, 0]]
+        weights += [sizes[pair_chains] + 1] * 2
+        chains += [pair_chains] * 2
+
+        if running is not None and not running():
+            self.cancelled = True
+            return
+
+        # Arêtes regroupées par case de départ (représentation compacte par lignes)
+        sources = np.concatenate(sources)
+        order = np.argsort(sources, kind="stable")
+        self.offsets = memoryview(np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=grid.size)))).astype(np.int32))
+        self.targets = memoryview(np.concatenate(targets)[order].astype(np.int32))
+        self.weights = memoryview(np.concatenate(weights)[order].astype(np.int32))
+        self.chains = memoryview(np.concatenate(chains)[order].astype(np.int32))
+
+    def floor_neighbours(self, cell):
+        """
+        Renvoie les cases de sol voisines d'une case
+
+        Paramètres :
+            int cell: Indice à plat de la case
+
+        Renvoi :
+            list(int): Indices à plat des cases voisines praticables
+        """
+        w, cells = self.width, self.cells
+        y, x = divmod(cell, w)
+
+        neighbours = []
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < w and 0 <= ny < self.height and cells[ny * w + nx] == FLOOR:
+                neighbours.append(ny * w + nx)
+
+        return neighbours
+
+    def walk(self, previous, current, stop=-1):
+        """
+        Suit un couloir depuis une case jusqu'au premier sommet rencontré
+
+        Paramètres :
+            int previous: Indice à plat de la case d'où l'on vient
+            int current: Indice à plat de la première case du parcours
+            int stop: (Optionnel) Indice à plat d'une case de couloir à laquelle s'arrêter
+
+        Renvoi :
+            list(int) cells: Cases parcourues, de current au sommet atteint, None si le couloir est une boucle fermée
+        """
+        origin = previous
+        cells = [current]
+
+        while self.corridor[current] and current != stop:
+            following = [n for n in self.floor_neighbours(current) if n != previous][0]
+            if following == origin:
+                return None
+
+            previous, current = current, following
+            cells.append(current)
+
+        return cells
+
+    def expand(self, source, chain, target):
+        """
+        Renvoie les cases d'une arête du graphe
+
+        Paramètres :
+            int source: Indice à plat du sommet de départ
+            int chain: Couloir emprunté (0 pour deux sommets voisins)
+            int target: Indice à plat du sommet d'arrivée
+
+        Renvoi :
+            list(int): Cases de l'arête, sans source et avec target
+        """
+        if chain == 0:
+            return [target]
+
+        first = [n for n in self.floor_neighbours(source) if self.labels[n] == chain][0]
+        return self.walk(source, first)
+
+    def connect(self, cell, other):
+        """
+        Relie une case de couloir (départ ou arrivée d'une recherche) aux deux sommets aux extrémités de son couloir
+
+        Paramètres :
+            int cell: Indice à plat de la case de couloir
+            int other: Indice à plat de l'autre extrémité de la recherche, à laquelle le parcours peut s'arrêter
+
+        Renvoi :
+            list(list(int)): Cases parcourues vers chaque extrémité, de la voisine de cell au sommet atteint
+        """
+        walks = []
+        for neighbour in self.floor_neighbours(cell):
+            cells = self.walk(cell, neighbour, stop=other)
+            if cells is not None:
+                walks.append(cells)
+
+        return walks
+
+    def solve(self, start, end, observer=None, running=None, trace_memory=False, heuristic=True):
+        """
+        Recherche un plus court chemin sur le graphe des couloirs, puis le détaille case par case
+        Le départ et l'arrivée sont ajoutés temporairement au graphe s'ils sont dans un couloir
+
+        Paramètres :
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque sommet visité ou ajouté
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+            bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+            bool heuristic: Booléen définissant si l'on guide la recherche par la distance de manhattan (A*),
+                            sinon la recherche est un algorithme de Dijkstra
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+            SearchStats stats: Statistiques de la recherche
+        """
+        stats = SearchStats("corridors")
+
+        return timed_search(stats, lambda: self.graph_search(start, end, stats, observer=observer, running=running,
+                                                             heuristic=heuristic), trace_memory)
+
+    def graph_search(self, start, end, stats, observer=None, running=None, heuristic=True):
+        """
+        A* (ou Dijkstra) sur le graphe des couloirs complété par le départ et l'arrivée (voir solve)
+
+        Paramètres :
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            SearchStats stats: Statistiques à compléter
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque sommet visité ou ajouté
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+            bool heuristic: Booléen définissant si l'on guide la recherche par la distance de manhattan
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        """
+        w = self.width
+        ex, ey = end
+        s = start[1] * w + start[0]
+        e = ey * w + ex
+
+        if self.cells[s] != FLOOR or self.cells[e] != FLOOR:
+            return []
+        if s == e:
+            return [tuple(start)]
+
+        # Arêtes temporaires : (case d'arrivée, longueur, cases parcourues)
+        extra = {}
+        if self.corridor[s]:
+            for cells in self.connect(s, e):
+                extra.setdefault(s, []).append((cells[-1], len(cells), cells))
+        if self.corridor[e]:
+            for cells in self.connect(e, s):
+                node = cells[-1]
+                extra.setdefault(node, []).append((e, len(cells), cells[-2::-1] + [e]))
+
+        offsets, targets, weights, chains = self.offsets, self.targets, self.weights, self.chains
+
+        def edges(current):
+            neighbours = [(targets[k], weights[k], chains[k]) for k in range(offsets[current], offsets[current + 1])]
+            return neighbours + extra.get(current, [])
+
+        # Étiquette des arêtes : couloir emprunté ou liste des cases parcourues
+        parent = graph_astar(edges, w, s, e, stats, observer=observer, running=running, heuristic=heuristic)
+        if parent is None:
+            return []
+
+        # Détaille les arêtes du chemin, de l'arrivée vers le départ
+        segments = []
+        current = e
+        while parent[current] is not None:
+            previous, chain = parent[current]
+            segments.append(chain if isinstance(chain, list) else self.expand(previous, chain, current))
+            current = previous
+
+        path = [tuple(start)]
+        for segment in reversed(segments):
+            path.extend((cell % w, cell // w) for cell in segment)
+
+        return path
+
+
+def get_corridor_graph(grid, running=None):
+    """
+    Renvoie le graphe des couloirs d'une grille, en le reprenant du cache si ce niveau a déjà été vu
+    Un graphe dont la construction a été interrompue n'est pas mis en cache
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        callable running: (Optionnel) Fonction renvoyant False lorsque la construction doit être interrompue
+
+    Renvoi :
+        CorridorGraph: Graphe des couloirs de la grille, None si la construction a été interrompue
+    """
+    digest = grid_digest(grid)
+    graph = corridor_cache.get(digest)
+    if graph is None:
+        graph = CorridorGraph(grid, running)
+        if graph.cancelled:
+            return None
+        corridor_cache.put(digest, graph)
+
+    return graph
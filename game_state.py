@@ -0,0 +1,163 @@
+from PIL import Image
+from grid import image_to_grid, movement_table, CELL_TYPE, LASER, END_CELL, OPEN_MASKS
+
+
+# Résultats d'un pas de jeu
+MOVED = "moved"         # Le joueur a avancé d'une case
+BLOCKED = "blocked"     # Un mur ou le bord du labyrinthe empêche le déplacement
+LASER_HIT = "laser"     # Le joueur est entré sur un laser et recommence au départ
+WON = "won"             # Le joueur a atteint le donut
+
+# Déplacements par direction (noms des flèches du clavier)
+DIRECTIONS = {"Left": (-1, 0), "Right": (1, 0), "Up": (0, -1), "Down": (0, 1)}
+
+
+class GameState:
+    """
+    Moteur des règles du jeu, sans interface graphique : les murs bloquent le joueur, un laser le renvoie au départ
+    et atteindre l'arrivée (le donut) termine la partie
+    Les déplacements ne demandent que deux lectures dans la table de déplacement du niveau (grid.movement_table), ce
+    qui permet de simuler des parties entières pour tester les niveaux automatiquement
+
+    Attributs principaux :
+        int width: Longueur du labyrinthe
+        int height: Hauteur du labyrinthe
+        bytes movement: Table de déplacement à plat, indexée par y * width + x
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+
+        int x: Abscisse du joueur
+        int y: Ordonnée du joueur
+        int steps: Nombre de déplacements effectués (les déplacements bloqués ne comptent pas)
+        int laser_hits: Nombre de retours au départ causés par un laser
+        bool won: Booléen indiquant si le joueur a atteint l'arrivée
+    """
+
+    def __init__(self, grid, start, end):
+        """
+        Initialise une partie sur une grille, le joueur étant au départ
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+        """
+        self.height, self.width = grid.shape
+        self.start = tuple(start)
+        self.end = tuple(end)
+        self.movement = movement_table(grid, self.end).tobytes()
+
+        self.reset()
+
+    @staticmethod
+    def from_level(params):
+        """
+        Crée une partie sur un niveau enregistré
+
+        Paramètres :
+            dict params: Paramètres du niveau dans levels.json (chemin de l'image, départ, arrivée...)
+
+        Renvoi :
+            GameState: Partie au départ du niveau
+        """
+        return GameState(image_to_grid(Image.open(params["image_path"])), params["start"], params["end"])
+
+    def reset(self):
+        """
+        Replace le joueur au départ et remet les compteurs à zéro
+        """
+        self.x, self.y = self.start
+        self.steps = 0
+        self.laser_hits = 0
+        self.won = False
+
+    def step(self, dx, dy):
+        """
+        Applique un déplacement d'une case
+
+        Paramètres :
+            int dx: Déplacement en abscisse (-1, 0 ou 1)
+            int dy: Déplacement en ordonnée (-1, 0 ou 1), l'un des deux étant nul
+
+        Renvoi :
+            str: Résultat du déplacement (MOVED, BLOCKED, LASER_HIT ou WON)
+        """
+        if self.won or not self.movement[self.y * self.width + self.x] & OPEN_MASKS[(dx, dy)]:
+            return BLOCKED
+
+        self.x += dx
+        self.y += dy
+        self.steps += 1
+
+        cell = self.movement[self.y * self.width + self.x]
+        if cell & CELL_TYPE == LASER:
+            self.laser_hits += 1
+            self.x, self.y = self.start
+            return LASER_HIT
+
+        if cell & END_CELL:
+            self.won = True
+            return WON
+
+        return MOVED
+
+    def play(self, moves):
+        """
+        Applique une suite de déplacements, jusqu'à la fin de la suite ou jusqu'à l'arrivée
+
+        Paramètres :
+            iterable(tuple(int, int)) moves: Déplacements (dx, dy) successifs
+
+        Renvoi :
+            dict(str: ...): Résultat de la partie (voir result)
+        """
+        # Boucle de step déroulée : c'est le cœur des simulations de parties
+        movement, width = self.movement, self.width
+        sx, sy = self.start
+        x, y = self.x, self.y
+        steps = self.steps
+        laser_hits = self.laser_hits
+
+        if not self.won:
+            for move in moves:
+                if not movement[y * width + x] & OPEN_MASKS[move]:
+                    continue
+
+                x += move[0]
+                y += move[1]
+                steps += 1
+
+                cell = movement[y * width + x]
+                if cell & CELL_TYPE == LASER:
+                    laser_hits += 1
+                    x, y = sx, sy
+                elif cell & END_CELL:
+                    self.won = True
+                    break
+
+        self.x, self.y = x, y
+        self.steps = steps
+        self.laser_hits = laser_hits
+
+        return self.result()
+
+    def result(self):
+        """
+        Renvoi :
+            dict(str: ...): Résultat de la partie : arrivée atteinte, nombre de déplacements, de lasers touchés et
+                            position du joueur
+        """
+        return {"won": self.won, "steps": self.steps, "laser_hits": self.laser_hits, "position": (self.x, self.y)}
+
+
+def path_to_moves(path):
+    """
+    Convertit un chemin (par exemple trouvé par solver.solve) en suite de déplacements
+
+    Paramètres :
+        list(tuple(int, int)) path: Cases successives du chemin
+
+    Renvoi :
+        list(tuple(int, int)) moves: Déplacements (dx, dy) entre deux cases successives
+    """
+    return [(x1 - x0, y1 - y0) for (x0, y0), (x1, y1) in zip(path, path[1:])]
@@ -0,0 +1,155 @@
+import hashlib
+import numpy as np
+
+
+# Types de case de la grille
+FLOOR = 0
+WALL = 1
+LASER = 2
+
+# Couleurs des cases sur l'image du labyrinthe
+FLOOR_COLOR = (255, 255, 255)
+WALL_COLOR = (0, 0, 0)
+LASER_COLOR = (255, 0, 0)
+
+# Table de déplacement : type de case sur les 2 bits de poids faible, drapeau d'arrivée, et sur les 4 bits de poids
+# fort, les voisins dans lesquels on peut entrer (sol ou laser)
+CELL_TYPE = 0x03
+END_CELL = 0x04
+OPEN_LEFT = 0x10
+OPEN_RIGHT = 0x20
+OPEN_UP = 0x40
+OPEN_DOWN = 0x80
+OPEN_MASKS = {(-1, 0): OPEN_LEFT, (1, 0): OPEN_RIGHT, (0, -1): OPEN_UP, (0, 1): OPEN_DOWN}
+
+
+def image_to_grid(image):
+    """
+    Décode l'image d'un labyrinthe en une grille compacte de types de case (un octet par case)
+    Les pixels blancs sont des sols, les rouges des lasers et tous les autres des murs
+
+    Paramètres :
+        Image image: Image du labyrinthe, un pixel correspondant à une case
+
+    Renvoi :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) contenant FLOOR, WALL ou LASER pour chaque case
+    """
+    if image.mode != "RGB":
+        image = image.convert(mode="RGB")
+
+    rgb = np.asarray(image, dtype=np.uint32)
+    packed = (rgb[:, :, 0] << 16) | (rgb[:, :, 1] << 8) | rgb[:, :, 2]
+
+    grid = np.full(packed.shape, WALL, dtype=np.uint8)
+    grid[packed == 0xFFFFFF] = FLOOR
+    grid[packed == 0xFF0000] = LASER
+
+    return grid
+
+
+def movement_table(grid, end=None):
+    """
+    Construit la table de déplacement d'une grille : un octet par case contenant son type, le drapeau END_CELL pour
+    l'arrivée et le masque des voisins ouverts. Un déplacement ne demande alors que deux lectures dans la table, sans
+    test de bord (les côtés du bord ne sont jamais ouverts)
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) end: (Optionnel) Coordonnées de l'arrivée
+
+    Renvoi :
+        np.ndarray table: Tableau uint8 de dimensions (hauteur, longueur) de la table de déplacement
+    """
+    passable = grid != WALL
+    table = grid & CELL_TYPE
+
+    table[:, 1:] |= np.where(passable[:, :-1], OPEN_LEFT, 0).astype(np.uint8)
+    table[:, :-1] |= np.where(passable[:, 1:], OPEN_RIGHT, 0).astype(np.uint8)
+    table[1:, :] |= np.where(passable[:-1, :], OPEN_UP, 0).astype(np.uint8)
+    table[:-1, :] |= np.where(passable[1:, :], OPEN_DOWN, 0).astype(np.uint8)
+
+    if end is not None:
+        table[end[1], end[0]] |= END_CELL
+
+    return table
+
+
+def grid_digest(grid):
+    """
+    Calcule une empreinte du contenu d'une grille, pour retrouver en cache les données précalculées sur un niveau
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+
+    Renvoi :
+        str: Empreinte hexadécimale, identique pour deux grilles de mêmes dimensions et de même contenu
+    """
+    digest = hashlib.blake2b(grid.tobytes(), digest_size=16)
+    digest.update(str(grid.shape).encode())
+
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Cache de taille bornée : lorsqu'il est plein, l'entrée utilisée le moins récemment est retirée
+    Sert à conserver les données précalculées sur les derniers niveaux vus (indexées par grid_digest) ou leurs rendus
+
+    Attributs principaux :
+        int size: Nombre maximal d'entrées
+        dict entries: Entrées du cache, de la moins récemment utilisée à la plus récente
+    """
+
+    def __init__(self, size):
+        """
+        Initialise un cache vide
+
+        Paramètres :
+            int size: Nombre maximal d'entrées
+        """
+        self.size = size
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Renvoie une entrée du cache, qui devient la plus récente
+
+        Paramètres :
+            key: Clé de l'entrée
+
+        Renvoi :
+            Valeur de l'entrée, None si elle n'est pas en cache
+        """
+        if key not in self.entries:
+            return None
+
+        value = self.entries[key] = self.entries.pop(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Ajoute (ou remplace) une entrée, qui devient la plus récente, et retire les plus anciennes au-delà de size
+
+        Paramètres :
+            key: Clé de l'entrée
+            value: Valeur de l'entrée
+        """
+        self.entries.pop(key, None)
+        self.entries[key] = value
+
+        while len(self.entries) > self.size:
+            del self.entries[next(iter(self.entries))]
+
+    def discard(self, value):
+        """
+        Retire les entrées dont la valeur est l'objet donné (par exemple un objet modifié sur place, qui ne correspond
+        plus à sa clé)
+
+        Paramètres :
+            value: Valeur des entrées à retirer
+        """
+        for key in [key for key, entry in self.entries.items() if entry is value]:
+            del self.entries[key]
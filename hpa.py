@@ -0,0 +1,431 @@
+from collections import deque
+import numpy as np
+from grid import FLOOR, grid_digest, LRUCache
+from solver import SearchStats, graph_astar, timed_search
+
+
+CLUSTER_SIZE = 16           # Côté (en cases) des blocs de la grille
+ABSTRACTION_CACHE_SIZE = 8  # Nombre d'abstractions de niveaux conservées en cache
+
+# Abstractions déjà construites, indexées par l'empreinte de leur grille
+abstraction_cache = LRUCache(ABSTRACTION_CACHE_SIZE)
+
+
+class ClusterAbstraction:
+    """
+    Abstraction hiérarchique d'une grille pour la recherche HPA* (Hierarchical Pathfinding A*)
+    La grille est découpée en blocs carrés. Sur chaque frontière entre deux blocs voisins, chaque passage (suite de
+    cases praticables des deux côtés) donne une paire de cases d'entrée reliées par un pas. Dans chaque bloc, les
+    distances entre ses cases d'entrée sont précalculées. La recherche se fait sur ce graphe réduit, puis seul le
+    chemin abstrait retenu est détaillé case par case
+
+    Attributs principaux :
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        int cluster_size: Côté des blocs
+        np.ndarray grid: Grille des types de case sur laquelle porte l'abstraction
+        np.ndarray cluster_map: Tableau int32 de dimensions (hauteur, longueur) du numéro de bloc de chaque case
+
+        dict(int: list(int)) cluster_nodes: Cases d'entrée (indices à plat) de chaque bloc
+        dict(int: list(int)) transitions: Cases d'entrée du bloc voisin reliées à chaque case d'entrée
+        dict(int: list(tuple(int, int))) edges: Cases d'entrée du même bloc accessibles depuis chaque case d'entrée,
+                                                avec leur distance
+        bool cancelled: Booléen indiquant si la dernière construction a été interrompue (l'abstraction est alors
+                        incomplète et ne doit plus servir)
+    """
+
+    def __init__(self, grid, cluster_size=CLUSTER_SIZE, running=None):
+        """
+        Construit l'abstraction d'une grille
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            int cluster_size: Côté des blocs
+            callable running: (Optionnel) Fonction renvoyant False lorsque la construction doit être interrompue
+        """
+        self.height, self.width = grid.shape
+        self.cluster_size = cluster_size
+        self.nb_clusters_x = -(-self.width // cluster_size)
+
+        ys, xs = np.indices(grid.shape, dtype=np.int32)
+        self.cluster_map = ys // cluster_size * self.nb_clusters_x + xs // cluster_size
+
+        self.edges = {}
+        self.cluster_nodes = {}
+        self.load_grid(grid)
+        self.compute_entrances()
+        self.compute_intra_edges(np.arange(int(self.cluster_map.max()) + 1), running)
+
+    def load_grid(self, grid):
+        """
+        Enregistre la grille et les tableaux qui en dépendent
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        """
+        self.grid = grid.copy()
+        self.cells = grid.tobytes()
+        self.floor = grid == FLOOR
+
+        # Numéro de bloc des cases praticables, à plat et avec une bordure (-1 pour les cases bloquées)
+        w = self.width + 2
+        padded = np.full((self.height + 2, w), -1, dtype=np.int32)
+        padded[1:-1, 1:-1] = np.where(self.floor, self.cluster_map, -1)
+        self.padded_clusters = padded.ravel()
+        self.offsets = np.array([-1, 1, -w, w])
+
+    def cluster_of(self, cell):
+        """
+        Renvoie le numéro du bloc contenant une case
+
+        Paramètres :
+            int cell: Indice à plat de la case
+
+        Renvoi :
+            int: Numéro du bloc
+        """
+        y, x = divmod(cell, self.width)
+        return y // self.cluster_size * self.nb_clusters_x + x // self.cluster_size
+
+    def compute_entrances(self):
+        """
+        Calcule les paires de cases d'entrée de toutes les frontières entre blocs : une paire au milieu de chaque
+        passage, c'est-à-dire de chaque suite de cases praticables des deux côtés de la frontière
+        """
+        c, w = self.cluster_size, self.width
+        floor = self.floor
+        pairs = []
+
+        # Frontières verticales : passages le long de l'axe y, coupés aux limites des blocs
+        both = floor[:, c - 1:w - 1:c] & floor[:, c:w:c]
+        border = np.arange(self.height) % c == 0
+        if both.size:
+            for y, column in self.passage_middles(both, border):
+                left = y * w + (column + 1) * c - 1
+                pairs.append((left, left + 1))
+
+        # Frontières horizontales : passages le long de l'axe x
+        both = floor[c - 1:self.height - 1:c, :] & floor[c:self.height:c, :]
+        border = np.arange(w) % c == 0
+        if both.size:
+            for x, row in self.passage_middles(both.T, border):
+                top = ((row + 1) * c - 1) * w + x
+                pairs.append((top, top + w))
+
+        self.transitions = {}
+        cluster_nodes = {}
+        for a, b in pairs:
+            self.transitions.setdefault(a, []).append(b)
+            self.transitions.setdefault(b, []).append(a)
+
+        for node in self.transitions:
+            cluster_nodes.setdefault(self.cluster_of(node), []).append(node)
+
+        self.cluster_nodes = cluster_nodes
+
+    @staticmethod
+    def passage_middles(both, border):
+        """
+        Trouve le milieu de chaque passage le long de l'axe 0 d'un masque de frontières
+
+        Paramètres :
+            np.ndarray both: Masque (longueur de la frontière, nombre de frontières), True si les deux côtés sont praticables
+            np.ndarray border: Masque des positions où commence un nouveau bloc (un passage y est coupé)
+
+        Renvoi :
+            list(tuple(int, int)): Position du milieu et numéro de frontière de chaque passage
+        """
+        previous = np.zeros_like(both)
+        previous[1:] = both[:-1]
+        previous[border] = False
+
+        following = np.zeros_like(both)
+        following[:-1] = both[1:]
+        following[np.roll(border, -1)] = False
+
+        # Les débuts et fins de passage sont triés par frontière puis par position : ils se correspondent un à un
+        starts_frontier, starts = np.nonzero((both & ~previous).T)
+        _, ends = np.nonzero((both & ~following).T)
+
+        return list(zip(((starts + ends) // 2).tolist(), starts_frontier.tolist()))
+
+    def compute_intra_edges(self, clusters, running=None):
+        """
+        Calcule les distances entre les cases d'entrée de chacun des blocs demandés, sans sortir du bloc
+        Les blocs sont traités ensemble : à la passe r, un parcours en largeur vectorisé part de la r-ième case
+        d'entrée de chaque bloc, les fronts ne pouvant pas passer d'un bloc à l'autre
+
+        Paramètres :
+            np.ndarray clusters: Numéros des blocs à recalculer
+            callable running: (Optionnel) Fonction renvoyant False lorsque le calcul doit être interrompu
+        """
+        self.cancelled = False
+
+        for cluster in clusters.tolist():
+            for node in self.cluster_nodes.get(cluster, ()):
+                self.edges.pop(node, None)
+
+        nodes = [node for cluster in clusters.tolist() for node in self.cluster_nodes.get(cluster, ())]
+        if not nodes:
+            return
+
+        nodes = np.array(nodes)
+        node_clusters = self.cluster_map.ravel()[nodes]
+        order = np.argsort(node_clusters, kind="stable")
+        nodes, node_clusters = nodes[order], node_clusters[order]
+
+        # Rang de chaque case d'entrée dans son bloc
+        first = np.searchsorted(node_clusters, node_clusters)
+        ranks = np.arange(nodes.size) - first
+
+        w = self.width + 2
+        padded_nodes = (nodes // self.width + 1) * w + nodes % self.width + 1
+        selected = np.zeros(int(self.cluster_map.max()) + 1, dtype=bool)
+        selected[clusters] = True
+        allowed = (self.padded_clusters >= 0) & selected[np.maximum(self.padded_clusters, 0)]
+
+        source_of_cluster = np.full(selected.size, -1, dtype=np.int64)
+        for r in range(int(ranks.max()) + 1):
+            sources = ranks == r
+            dist = np.full(allowed.size, -1, dtype=np.int32)
+            unreached = allowed.copy()
+
+            front = padded_nodes[sources]
+            unreached[front] = False
+            dist[front] = 0
+
+            d = 0
+            while front.size:
+                if running is not None and not running():
+                    self.cancelled = True
+                    return
+
+                d += 1
+                neighbours = (front[:, np.newaxis] + self.offsets).ravel()
+                same_cluster = self.padded_clusters[neighbours] == np.repeat(self.padded_clusters[front], 4)
+                front = np.unique(neighbours[unreached[neighbours] & same_cluster])
+
+                unreached[front] = False
+                dist[front] = d
+
+            source_of_cluster[node_clusters[sources]] = nodes[sources]
+            distances = dist[padded_nodes]
+            linked = distances > 0
+            for source, node, distance in zip(source_of_cluster[node_clusters[linked]].tolist(), nodes[linked].tolist(),
+                                              distances[linked].tolist()):
+                self.edges.setdefault(source, []).append((node, distance))
+
+    def update(self, grid, running=None):
+        """
+        Met à jour l'abstraction après une modification de la grille : seuls les blocs contenant des cases modifiées
+        et ceux dont les cases d'entrée ont changé sont recalculés
+
+        Paramètres :
+            np.ndarray grid: Nouvelle grille des types de case, de mêmes dimensions que la précédente
+            callable running: (Optionnel) Fonction renvoyant False lorsque la mise à jour doit être interrompue
+
+        Renvoi :
+            int: Nombre de blocs recalculés
+        """
+        changed = np.flatnonzero(grid != self.grid)
+        if changed.size == 0:
+            return 0
+
+        old_nodes = self.cluster_nodes
+        self.load_grid(grid)
+        self.compute_entrances()
+
+        touched = set(self.cluster_map.ravel()[changed].tolist())
+        for cluster in old_nodes.keys() | self.cluster_nodes.keys():
+            if sorted(old_nodes.get(cluster, ())) != sorted(self.cluster_nodes.get(cluster, ())):
+                touched.add(cluster)
+
+        # Les cases d'entrée supprimées ne doivent plus apparaître dans le graphe
+        for cluster in touched:
+            for node in old_nodes.get(cluster, ()):
+                self.edges.pop(node, None)
+
+        self.compute_intra_edges(np.array(sorted(touched)), running)
+
+        return len(touched)
+
+    def cluster_bfs(self, source, target=None):
+        """
+        Parcours en largeur depuis une case sans sortir de son bloc
+
+        Paramètres :
+            int source: Indice à plat de la case de départ
+            int target: (Optionnel) Indice à plat d'une case à laquelle on peut s'arrêter
+
+        Renvoi :
+            dict(int: int) dist: Distance à la source de chaque case atteinte
+            dict(int: int) parent: Case précédente de chaque case atteinte
+        """
+        c, w, cells = self.cluster_size, self.width, self.cells
+        y, x = divmod(source, w)
+        x0, y0 = x // c * c, y // c * c
+        x1, y1 = min(x0 + c, w), min(y0 + c, self.height)
+
+        dist = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                break
+
+            y, x = divmod(current, w)
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if x0 <= nx < x1 and y0 <= ny < y1:
+                    neighbour = ny * w + nx
+                    if cells[neighbour] == FLOOR and neighbour not in dist:
+                        dist[neighbour] = dist[current] + 1
+                        parent[neighbour] = current
+                        queue.append(neighbour)
+
+        return dist, parent
+
+    def refine(self, abstract_path):
+        """
+        Détaille un chemin abstrait en chemin case par case
+        Deux cases consécutives sont soit de part et d'autre d'une frontière, soit dans le même bloc : elles sont
+        alors reliées par un parcours en largeur limité au bloc
+
+        Paramètres :
+            list(int) abstract_path: Indices à plat des cases du chemin abstrait
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin détaillé
+        """
+        w = self.width
+        path = [(abstract_path[0] % w, abstract_path[0] // w)]
+
+        for u, v in zip(abstract_path, abstract_path[1:]):
+            if self.cluster_of(u) != self.cluster_of(v):
+                path.append((v % w, v // w))
+                continue
+
+            _, parent = self.cluster_bfs(u, target=v)
+            segment = []
+            current = v
+            while current != u:
+                segment.append((current % w, current // w))
+                current = parent[current]
+            path.extend(reversed(segment))
+
+        return path
+
+    def solve(self, start, end, observer=None, running=None, trace_memory=False):
+        """
+        Recherche un chemin par HPA* : le départ et l'arrivée sont reliés aux cases d'entrée de leur bloc, puis A* est
+        lancé sur le graphe abstrait et le chemin retenu est détaillé
+        Le chemin est presque optimal : il passe forcément par le milieu des passages entre blocs
+
+        Paramètres :
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case du graphe abstrait
+                               visitée ou ajoutée
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+            bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+            SearchStats stats: Statistiques de la recherche
+        """
+        stats = SearchStats("hpa")
+
+        return timed_search(stats, lambda: self.abstract_search(start, end, stats, observer=observer, running=running),
+                            trace_memory)
+
+    def abstract_search(self, start, end, stats, observer=None, running=None):
+        """
+        A* sur le graphe abstrait complété par le départ et l'arrivée (voir solve)
+
+        Paramètres :
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            SearchStats stats: Statistiques à compléter
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        """
+        w = self.width
+        ex, ey = end
+        s = start[1] * w + start[0]
+        e = ey * w + ex
+
+        # Le départ doit être praticable pour être relié aux cases d'entrée de son bloc
+        if self.cells[s] != FLOOR or self.cells[e] != FLOOR:
+            return []
+        if s == e:
+            return [tuple(start)]
+
+        # Arêtes temporaires reliant le départ et l'arrivée aux cases d'entrée de leur bloc
+        extra = {}
+        dist_start, _ = self.cluster_bfs(s)
+        for node in self.cluster_nodes.get(self.cluster_of(s), ()):
+            if node in dist_start:
+                extra.setdefault(s, []).append((node, dist_start[node], None))
+        if e in dist_start:
+            extra.setdefault(s, []).append((e, dist_start[e], None))
+
+        dist_end, _ = self.cluster_bfs(e)
+        for node in self.cluster_nodes.get(self.cluster_of(e), ()):
+            if node in dist_end:
+                extra.setdefault(node, []).append((e, dist_end[node], None))
+
+        def edges(current):
+            neighbours = [(node, cost, None) for node, cost in self.edges.get(current, ())]
+            neighbours += [(node, 1, None) for node in self.transitions.get(current, ())]
+            return neighbours + extra.get(current, [])
+
+        parent = graph_astar(edges, w, s, e, stats, observer=observer, running=running)
+        if parent is None:
+            return []
+
+        abstract_path = [e]
+        while parent[abstract_path[-1]] is not None:
+            abstract_path.append(parent[abstract_path[-1]][0])
+        abstract_path.reverse()
+
+        return self.refine(abstract_path)
+
+
+def get_abstraction(grid, previous=None, running=None):
+    """
+    Renvoie l'abstraction d'une grille, en la reprenant du cache si ce niveau a déjà été vu
+    Sinon, si l'abstraction précédente porte sur une grille de mêmes dimensions (le même niveau en cours d'édition),
+    seuls les blocs modifiés sont recalculés, et sinon l'abstraction est construite entièrement
+    Une construction interrompue n'est pas mise en cache, et l'abstraction précédente ne doit plus servir
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        ClusterAbstraction previous: (Optionnel) Abstraction utilisée pour la recherche précédente
+        callable running: (Optionnel) Fonction renvoyant False lorsque la construction doit être interrompue
+
+    Renvoi :
+        ClusterAbstraction: Abstraction de la grille, None si la construction a été interrompue
+    """
+    digest = grid_digest(grid)
+    abstraction = abstraction_cache.get(digest)
+    if abstraction is not None:
+        return abstraction
+
+    # Au-delà d'un quart de cases modifiées (un autre niveau de même taille), on reconstruit entièrement
+    if previous is not None and previous.grid.shape == grid.shape and \
+            np.count_nonzero(grid != previous.grid) <= grid.size // 4:
+        # L'abstraction est modifiée sur place : elle ne correspond plus à son ancienne empreinte
+        abstraction_cache.discard(previous)
+        previous.update(grid, running)
+        abstraction = previous
+    else:
+        abstraction = ClusterAbstraction(grid, running=running)
+
+    if abstraction.cancelled:
+        return None
+    abstraction_cache.put(digest, abstraction)
+
+    return abstraction
@@ -0,0 +1,275 @@
+import heapq
+from array import array
+import numpy as np
+from grid import FLOOR
+from solver import SearchStats, VISITED, FRONTIER, timed_search
+
+
+INFINITY = 2 ** 31 - 1      # Distance des cases non atteintes
+
+
+class LPAStar:
+    """
+    Planificateur incrémental par l'algorithme LPA* (Lifelong Planning A*) sur une grille 4-connexe de coût uniforme
+    Les distances au départ et la file de priorité sont conservées entre deux recherches : après une modification de
+    quelques cases, seules les cases dont la distance au départ change sont recalculées
+
+    Attributs principaux :
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        np.ndarray grid: Grille des types de case sur laquelle porte l'état actuel de la recherche
+
+        bytearray passable: Cases praticables à plat, entourées d'une bordure de cases bloquées
+        array g: Distance au départ de chaque case lors de sa dernière expansion
+        array rhs: Distance au départ de chaque case calculée à partir de ses voisins
+        list heap: File de priorité des cases dont g et rhs diffèrent (peut contenir des entrées périmées)
+    """
+
+    def __init__(self, grid, start, end):
+        """
+        Initialise le planificateur sur une grille
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+        """
+        self.reset(grid, start, end)
+
+    def reset(self, grid, start, end):
+        """
+        Oublie l'état de la recherche et repart d'une nouvelle grille
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+        """
+        self.height, self.width = grid.shape
+        self.start = tuple(start)
+        self.end = tuple(end)
+        self.grid = grid.copy()
+
+        w = self.width + 2
+        passable = np.zeros((self.height + 2, w), dtype=np.uint8)
+        passable[1:-1, 1:-1] = grid == FLOOR
+        self.passable = bytearray(passable.tobytes())
+
+        self.g = array("i", [INFINITY]) * len(self.passable)
+        self.rhs = array("i", [INFINITY]) * len(self.passable)
+
+        self.s = (self.start[1] + 1) * w + self.start[0] + 1
+        self.e = (self.end[1] + 1) * w + self.end[0] + 1
+
+        self.rhs[self.s] = 0
+        self.heap = [(self.heuristic(self.s), 0, self.s)]
+        self.heap_pushes = 1    # Nombre d'entrées ajoutées à la file depuis la dernière recherche
+
+    def heuristic(self, u):
+        """
+        Distance de manhattan entre une case et l'arrivée
+
+        Paramètres :
+            int u: Indice à plat (avec bordure) de la case
+
+        Renvoi :
+            int: Distance de manhattan jusqu'à l'arrivée
+        """
+        y, x = divmod(u, self.width + 2)
+        return abs(x - self.end[0] - 1) + abs(y - self.end[1] - 1)
+
+    def update_vertex(self, u, observer=None):
+        """
+        Recalcule rhs d'une case à partir de ses voisins et la place dans la file si elle est incohérente
+
+        Paramètres :
+            int u: Indice à plat (avec bordure) de la case
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case ajoutée à la file
+        """
+        g = self.g
+        passable = self.passable
+
+        if u != self.s:
+            if passable[u]:
+                w = self.width + 2
+                best = INFINITY
+                for neighbour in (u - 1, u + 1, u - w, u + w):
+                    if passable[neighbour] and g[neighbour] < best:
+                        best = g[neighbour]
+                self.rhs[u] = best if best == INFINITY else best + 1
+            else:
+                self.rhs[u] = INFINITY
+
+        m = min(g[u], self.rhs[u])
+        if g[u] != self.rhs[u]:
+            heapq.heappush(self.heap, (m + self.heuristic(u), m, u))
+            self.heap_pushes += 1
+
+            if observer is not None:
+                y, x = divmod(u, self.width + 2)
+                observer(FRONTIER, x - 1, y - 1)
+
+    def update_grid(self, grid, running=None):
+        """
+        Prend en compte les cases modifiées depuis la dernière recherche
+        Si la prise en compte est interrompue, l'état est réinitialisé sur la nouvelle grille (sans boucle Python par
+        case) pour rester cohérent : la recherche suivante repartira de zéro
+
+        Paramètres :
+            np.ndarray grid: Nouvelle grille des types de case, de mêmes dimensions que la précédente
+            callable running: (Optionnel) Fonction renvoyant False lorsque la prise en compte doit être interrompue
+
+        Renvoi :
+            int: Nombre de cases modifiées, None si la prise en compte a été interrompue
+        """
+        changed = np.flatnonzero(grid != self.grid)
+        if changed.size == 0:
+            return 0
+
+        # Au-delà d'un quart de cases modifiées, il est plus rapide de tout recommencer
+        if changed.size > grid.size // 4:
+            self.reset(grid, self.start, self.end)
+            return changed.size
+
+        self.grid = grid.copy()
+
+        w = self.width + 2
+        ys, xs = np.divmod(changed, self.width)
+        cells = ((ys + 1) * w + xs + 1).tolist()
+        for u, cell in zip(cells, grid.flat[changed].tolist()):
+            self.passable[u] = cell == FLOOR
+
+        # Une case modifiée change son propre rhs et celui de ses voisins
+        to_update = set(cells)
+        for u in cells:
+            to_update.update((u - 1, u + 1, u - w, u + w))
+        for u in to_update:
+            if running is not None and not running():
+                self.reset(grid, self.start, self.end)
+                return None
+            self.update_vertex(u)
+
+        return changed.size
+
+    def compute_shortest_path(self, stats, observer=None, running=None):
+        """
+        Développe les cases incohérentes jusqu'à ce que la distance de l'arrivée soit connue
+        Si la recherche est interrompue, l'état reste valide et la recherche suivante reprend là où elle s'est arrêtée
+
+        Paramètres :
+            SearchStats stats: Statistiques à compléter
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+        """
+        g, rhs, heap, e = self.g, self.rhs, self.heap, self.e
+        w = self.width + 2
+        update_vertex = self.update_vertex
+
+        while heap:
+            if running is not None and not running():
+                stats.cancelled = True
+                return
+
+            if len(heap) > stats.peak_open:
+                stats.peak_open = len(heap)
+
+            m = min(g[e], rhs[e])
+            if heap[0][:2] >= (m, m) and rhs[e] == g[e]:     # h(arrivée) = 0
+                break
+
+            _, k, u = heapq.heappop(heap)
+            if g[u] == rhs[u] or k != min(g[u], rhs[u]):
+                stats.stale_pops += 1
+                continue    # Entrée périmée : la case est cohérente ou a été ajoutée depuis avec une autre priorité
+
+            stats.nodes_expanded += 1
+            if observer is not None:
+                y, x = divmod(u, w)
+                observer(VISITED, x - 1, y - 1)
+
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INFINITY
+                update_vertex(u, observer)
+
+            for neighbour in (u - 1, u + 1, u - w, u + w):
+                update_vertex(neighbour, observer)
+
+    def path(self):
+        """
+        Reconstruit le plus court chemin en descendant les distances au départ depuis l'arrivée
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        """
+        g, passable = self.g, self.passable
+        w = self.width + 2
+
+        if g[self.e] == INFINITY:
+            return []
+
+        current = self.e
+        path = [self.end]
+        while current != self.s:
+            current = min((u for u in (current - 1, current + 1, current - w, current + w) if passable[u] or u == self.s),
+                          key=lambda u: g[u])
+            y, x = divmod(current, w)
+            path.append((x - 1, y - 1))
+        path.reverse()
+
+        return path
+
+    def solve(self, grid, start, end, observer=None, running=None, trace_memory=False):
+        """
+        Recherche un plus court chemin en réutilisant l'état de la recherche précédente
+        L'état est réinitialisé si les dimensions de la grille, le départ ou l'arrivée changent
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+            bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+            SearchStats stats: Statistiques de la recherche
+        """
+        stats = SearchStats("incremental")
+
+        return timed_search(stats, lambda: self.replan(grid, start, end, stats, observer=observer, running=running),
+                            trace_memory)
+
+    def replan(self, grid, start, end, stats, observer=None, running=None):
+        """
+        Prend en compte la nouvelle grille (ou un nouveau départ, une nouvelle arrivée), puis termine la recherche
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            SearchStats stats: Statistiques à compléter
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        """
+        if grid.shape != self.grid.shape or tuple(start) != self.start or tuple(end) != self.end:
+            self.reset(grid, start, end)
+        elif self.update_grid(grid, running) is None:
+            stats.cancelled = True
+            return []
+
+        self.compute_shortest_path(stats, observer=observer, running=running)
+        path = [] if stats.cancelled else self.path()
+
+        # Les entrées ajoutées lors de la prise en compte des modifications comptent aussi pour cette recherche
+        stats.heap_pushes = self.heap_pushes
+        self.heap_pushes = 0
+
+        return path
@@ -0,0 +1,126 @@
+from array import array
+
+
+class IndexedHeap:
+    """
+    File de priorité binaire indexée par numéro de case : chaque case y apparaît au plus une fois, et la priorité
+    d'une case déjà présente peut être diminuée sur place (decrease-key) au lieu d'ajouter une nouvelle entrée
+    Les priorités sont des entiers : plus petite priorité sortie en premier
+
+    Attributs principaux :
+        list(int) cells: Tas binaire des cases présentes dans la file
+        array position: Position de chaque case dans le tas (-1 si la case n'est pas dans la file)
+        array keys: Priorité de chaque case présente dans la file
+    """
+
+    def __init__(self, size):
+        """
+        Initialise une file vide
+
+        Paramètres :
+            int size: Nombre de cases pouvant être placées dans la file (indices de 0 à size - 1)
+        """
+        self.cells = []
+        self.position = array("i", [-1]) * size
+        self.keys = array("q", [0]) * size
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.position[cell] != -1
+
+    def push(self, cell, key):
+        """
+        Ajoute une case à la file, ou diminue sa priorité si elle y est déjà avec une priorité plus grande
+
+        Paramètres :
+            int cell: Numéro de la case
+            int key: Priorité de la case
+        """
+        index = self.position[cell]
+        if index == -1:
+            index = len(self.cells)
+            self.cells.append(cell)
+        elif key >= self.keys[cell]:
+            return
+
+        self.keys[cell] = key
+        self.sift_up(cell, index)
+
+    def pop(self):
+        """
+        Retire de la file la case de plus petite priorité
+
+        Renvoi :
+            int: Numéro de la case
+        """
+        cells = self.cells
+        first = cells[0]
+        last = cells.pop()
+        self.position[first] = -1
+
+        if cells:
+            self.sift_down(last, 0)
+
+        return first
+
+    def sift_up(self, cell, index):
+        """
+        Place une case à la position index puis la remonte tant que son parent a une priorité plus grande
+
+        Paramètres :
+            int cell: Numéro de la case
+            int index: Position de départ de la case dans le tas
+        """
+        cells, position, keys = self.cells, self.position, self.keys
+        key = keys[cell]
+
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = cells[parent_index]
+            if keys[parent] <= key:
+                break
+
+            cells[index] = parent
+            position[parent] = index
+            index = parent_index
+
+        cells[index] = cell
+        position[cell] = index
+
+    def sift_down(self, cell, index):
+        """
+        Place une case à la position index puis la descend tant qu'un de ses enfants a une priorité plus petite
+
+        Paramètres :
+            int cell: Numéro de la case
+            int index: Position de départ de la case dans le tas
+        """
+        cells, position, keys = self.cells, self.position, self.keys
+        key = keys[cell]
+        size = len(cells)
+
+        child_index = 2 * index + 1
+        while child_index < size:
+            child = cells[child_index]
+            child_key = keys[child]
+
+            # On descend du côté de l'enfant de plus petite priorité
+            if child_index + 1 < size:
+                other = cells[child_index + 1]
+                if keys[other] < child_key:
+                    child_index += 1
+                    child = other
+                    child_key = keys[other]
+
+            if child_key >= key:
+                break
+
+            cells[index] = child
+            position[child] = index
+            index = child_index
+            child_index = 2 * index + 1
+
+        cells[index] = cell
+        position[cell] = index
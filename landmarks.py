@@ -0,0 +1,209 @@
+import threading
+import numpy as np
+from grid import FLOOR, grid_digest, LRUCache
+from wavefront import distance_field
+from cancellation import CHECK_DELAY
+from solver import SearchStats, astar, timed_search
+
+
+LANDMARK_COUNT = 8          # Nombre de points de repère par niveau
+UNREACHABLE = 0xFFFF        # Distance enregistrée pour les cases qu'un point de repère ne peut pas atteindre
+LANDMARK_CACHE_SIZE = 4     # Nombre de tables de niveaux conservées en cache
+
+# Tables déjà construites, indexées par l'empreinte de leur grille et la case d'origine des repères
+landmark_cache = LRUCache(LANDMARK_CACHE_SIZE)
+# Constructions en cours, indexées de la même façon : attendre l'événement évite de construire deux fois
+landmark_builds = {}
+landmark_lock = threading.Lock()
+
+
+class LandmarkTable:
+    """
+    Tables des distances (parcours en largeur) de quelques cases repères à toutes les cases d'un niveau, pour
+    l'heuristique ALT (A*, Landmarks, Triangle inequality) : pour tout repère L, |d(L, u) - d(L, arrivée)| est un
+    minorant de la distance de u à l'arrivée. Contrairement à la distance de manhattan, ce minorant tient compte des
+    murs, et la recherche se dirige beaucoup mieux dans les labyrinthes tortueux
+
+    Attributs principaux :
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        bytes cells: Types de case à plat, indexés par y * width + x
+        tuple(int, int) origin: Case à partir de laquelle les repères ont été choisis, tous dans sa composante
+        list(tuple(int, int)) landmarks: Coordonnées des repères
+        bool cancelled: Booléen indiquant si la construction a été interrompue (la table est alors incomplète)
+        np.ndarray distances: Tableau uint16 de dimensions (nombre de repères, hauteur * longueur) des distances de
+                              chaque repère à chaque case (UNREACHABLE si la case n'est pas accessible)
+
+        tuple(int, int) end: Arrivée pour laquelle l'heuristique a été calculée en dernier
+        memoryview heuristic: Heuristique à plat de chaque case vers cette arrivée
+    """
+
+    def __init__(self, grid, origin, count=LANDMARK_COUNT, running=None):
+        """
+        Choisit les repères et calcule leurs tables de distances
+        Chaque repère est la case la plus éloignée des repères déjà choisis, en partant de la case la plus éloignée
+        de l'origine : les repères sont ainsi répartis aux extrémités de la partie du labyrinthe accessible depuis
+        l'origine. Un repère hors de cette composante ne minorerait aucune distance de la recherche (toutes ses
+        distances y seraient inaccessibles), l'origine doit donc être l'arrivée (ou le départ) du niveau
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) origin: Case de la composante dans laquelle choisir les repères (l'arrivée du niveau)
+            int count: Nombre de repères
+            callable running: (Optionnel) Fonction renvoyant False lorsque la construction doit être interrompue
+        """
+        self.height, self.width = grid.shape
+        self.cells = grid.tobytes()
+        self.origin = tuple(origin)
+        self.cancelled = False
+
+        self.landmarks = []
+        tables = []
+
+        x, y = self.origin
+        if 0 <= x < self.width and 0 <= y < self.height and grid[y, x] == FLOOR:
+            closest = distance_field(grid, (x, y), running)     # -1 pour les cases inaccessibles, jamais choisies
+
+            for _ in range(count):
+                if closest is None:
+                    self.cancelled = True
+                    break
+                closest = closest.ravel()
+
+                farthest = int(np.argmax(closest))
+                if closest[farthest] <= 0 and self.landmarks:
+                    break   # Toutes les cases accessibles sont déjà des repères
+
+                y, x = divmod(farthest, self.width)
+                table = distance_field(grid, (x, y), running)
+                if table is None:
+                    self.cancelled = True
+                    break
+                table = table.ravel()
+                self.landmarks.append((x, y))
+                tables.append(np.where(table == -1, UNREACHABLE, np.minimum(table, UNREACHABLE - 1)).astype(np.uint16))
+
+                if len(self.landmarks) == 1:
+                    closest = table
+                else:
+                    closest = np.where(table == -1, closest, np.minimum(closest, table))
+
+        self.distances = np.array(tables, dtype=np.uint16).reshape(len(tables), grid.size)
+
+        self.end = None
+        self.heuristic = None
+
+    def heuristic_to(self, end):
+        """
+        Calcule (ou reprend) l'heuristique de chaque case vers une arrivée : le plus grand des minorants donnés par
+        les repères et par la distance de manhattan
+        Les tables sont réduites au même minorant pour toutes les cases à la fois, sans boucle Python par case
+
+        Paramètres :
+            tuple(int, int) end: Coordonnées de l'arrivée
+
+        Renvoi :
+            memoryview: Heuristique à plat de chaque case
+        """
+        end = tuple(end)
+        if end == self.end:
+            return self.heuristic
+
+        ex, ey = end
+        ys, xs = np.divmod(np.arange(self.width * self.height, dtype=np.int32), self.width)
+        heuristic = np.abs(xs - ex) + np.abs(ys - ey)
+
+        e = ey * self.width + ex
+        for table in self.distances:
+            if table[e] == UNREACHABLE:
+                continue
+            bound = np.abs(table.astype(np.int32) - int(table[e]))
+            bound[table == UNREACHABLE] = 0
+            np.maximum(heuristic, bound, out=heuristic)
+
+        self.end = end
+        self.heuristic = memoryview(heuristic)
+
+        return self.heuristic
+
+    def solve(self, start, end, observer=None, running=None, trace_memory=False):
+        """
+        Recherche un plus court chemin par A* guidé par l'heuristique ALT
+        Le chemin est optimal : l'heuristique est cohérente, comme maximum d'heuristiques cohérentes
+
+        Paramètres :
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+            callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+            bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+            SearchStats stats: Statistiques de la recherche
+        """
+        start, end = tuple(start), tuple(end)
+        stats = SearchStats("alt")
+
+        # solver.astar, guidé par l'heuristique ALT au lieu de la distance de manhattan
+        return timed_search(stats, lambda: astar(self.cells, self.width, self.height, start, end, stats,
+                                                 observer=observer, running=running,
+                                                 heuristic=self.heuristic_to(end)), trace_memory)
+
+
+def get_landmarks(grid, origin, running=None):
+    """
+    Renvoie la table des repères d'une grille, en la reprenant du cache si ce niveau (et cette origine) a déjà été vu
+    Si la table est en cours de construction dans un autre Thread, on attend la fin de cette construction, en
+    vérifiant toutes les CHECK_DELAY s que la recherche qui l'attend n'a pas été annulée. Une construction
+    interrompue n'est pas mise en cache : la prochaine demande la recommence
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) origin: Case de la composante dans laquelle choisir les repères (l'arrivée du niveau)
+        callable running: (Optionnel) Fonction renvoyant False lorsque l'attente ou la construction doit être interrompue
+
+    Renvoi :
+        LandmarkTable: Table des repères de la grille, None si l'attente ou la construction a été interrompue
+    """
+    key = (grid_digest(grid), tuple(origin))
+    with landmark_lock:
+        table = landmark_cache.get(key)
+        if table is not None:
+            return table
+
+        build = landmark_builds.get(key)
+        if build is None:
+            landmark_builds[key] = threading.Event()
+
+    if build is not None:
+        while not build.wait(CHECK_DELAY):
+            if running is not None and not running():
+                return None
+        return get_landmarks(grid, origin, running)
+
+    try:
+        table = LandmarkTable(grid, origin, running=running)
+        if table.cancelled:
+            return None
+        with landmark_lock:
+            landmark_cache.put(key, table)
+    finally:
+        # Les Threads en attente reprennent la table du cache, ou recommencent une construction interrompue
+        with landmark_lock:
+            landmark_builds.pop(key).set()
+
+    return table
+
+
+def prepare_landmarks(grid, origin):
+    """
+    Lance en arrière-plan la construction de la table des repères d'une grille (lorsque la stratégie ALT est choisie
+    en mode jeu), pour qu'elle soit prête à la première recherche. Une table en cache ou déjà en construction n'est
+    pas reconstruite
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) origin: Case de la composante dans laquelle choisir les repères (l'arrivée du niveau)
+    """
+    threading.Thread(target=get_landmarks, args=(grid.copy(), tuple(origin)), daemon=True).start()
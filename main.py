@@ -1,5 +1,15 @@
+import argparse
+import multiprocessing
 from GUI.main_window import MainWindow
 
 if __name__ == "__main__":
-    window = MainWindow()
+    # Dans l'exécutable, les processus de recherche relancent ce fichier : ils ne doivent pas ouvrir l'interface
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Labybouffe")
+    parser.add_argument("--metrics", help="Enregistre dans ce fichier json les mesures de la boucle de jeu "
+                                          "(durée des pas, délai entre l'appui sur une flèche et le déplacement)")
+    args = parser.parse_args()
+
+    window = MainWindow(metrics_path=args.metrics)
     window.mainloop()
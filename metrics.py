@@ -0,0 +1,126 @@
+import json
+from bisect import bisect_left
+
+
+class Histogram:
+    """
+    Histogramme de mesures (des durées en ms par exemple) à seaux de largeur croissante : les bornes des seaux suivent
+    une progression géométrique, l'enregistrement d'une mesure est en temps constant et la mémoire reste bornée quel
+    que soit le nombre de mesures. Les quantiles sont donnés à la précision d'un seau près
+
+    Attributs principaux :
+        str name: Nom de la mesure
+        list(float) bounds: Bornes supérieures des seaux (le dernier seau reçoit toutes les mesures plus grandes)
+        list(int) counts: Nombre de mesures de chaque seau
+        int count: Nombre total de mesures
+        float total: Somme des mesures
+        float minimum: Plus petite mesure (None s'il n'y en a aucune)
+        float maximum: Plus grande mesure (None s'il n'y en a aucune)
+    """
+
+    def __init__(self, name, lowest=0.01, highest=10000., buckets_per_decade=10):
+        """
+        Initialise un histogramme vide
+
+        Paramètres :
+            str name: Nom de la mesure
+            float lowest: Borne supérieure du premier seau
+            float highest: Borne à partir de laquelle les mesures tombent toutes dans le dernier seau
+            int buckets_per_decade: Nombre de seaux entre une valeur et dix fois cette valeur
+        """
+        self.name = name
+
+        self.bounds = []
+        bound = lowest
+        ratio = 10 ** (1 / buckets_per_decade)
+        while bound < highest:
+            self.bounds.append(bound)
+            bound *= ratio
+        self.bounds.append(highest)
+
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, value):
+        """
+        Enregistre une mesure
+
+        Paramètres :
+            float value: Valeur mesurée
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def quantile(self, q):
+        """
+        Renvoie une valeur approchée du quantile demandé : la borne supérieure du seau qui le contient
+
+        Paramètres :
+            float q: Proportion des mesures, entre 0 et 1 (0.5 pour la médiane)
+
+        Renvoi :
+            float: Quantile approché, None s'il n'y a aucune mesure
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # Le quantile ne dépasse jamais la plus grande mesure
+                return min(self.bounds[i], self.maximum) if i < len(self.bounds) else self.maximum
+
+        return self.maximum
+
+    def mean(self):
+        """
+        Renvoi :
+            float: Moyenne des mesures, None s'il n'y a aucune mesure
+        """
+        return self.total / self.count if self.count else None
+
+    def as_dict(self):
+        """
+        Renvoie le résumé de l'histogramme et ses seaux non vides, par exemple pour l'enregistrer en json
+
+        Renvoi :
+            dict(str: ...): Nombre de mesures, moyenne, extrema, quantiles et seaux (borne supérieure, nombre)
+        """
+        return {"name": self.name, "count": self.count, "mean": self.mean(), "min": self.minimum,
+                "max": self.maximum, "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99),
+                "buckets": [[self.bounds[i] if i < len(self.bounds) else None, count]
+                            for i, count in enumerate(self.counts) if count]}
+
+    def summary(self):
+        """
+        Renvoi :
+            str: Résumé de l'histogramme sur une ligne
+        """
+        if self.count == 0:
+            return f"{self.name} : aucune mesure"
+
+        return f"{self.name} : {self.count} mesures, moyenne {self.mean():.2f}, médiane {self.quantile(0.5):.2f}, " \
+               f"p90 {self.quantile(0.9):.2f}, p99 {self.quantile(0.99):.2f}, max {self.maximum:.2f}"
+
+
+def dump_histograms(histograms, path):
+    """
+    Enregistre des histogrammes dans un fichier json
+
+    Paramètres :
+        list(Histogram) histograms: Histogrammes à enregistrer
+        str path: Chemin du fichier json
+    """
+    with open(path, "w") as file:
+        file.write(json.dumps({histogram.name: histogram.as_dict() for histogram in histograms}, indent=4))
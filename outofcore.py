@@ -0,0 +1,455 @@
+import argparse
+import heapq
+import mmap
+import struct
+import tempfile
+import numpy as np
+from PIL import Image
+from grid import FLOOR, WALL, image_to_grid
+from solver import SearchStats, EVEN_MOVES, ODD_MOVES, timed_search
+
+try:
+    import resource     # Mesure de la mémoire résidente, indisponible sous Windows
+except ImportError:
+    resource = None
+
+
+MAGIC = b"LABY"
+HEADER = struct.Struct("<4sBxxxII")     # Signature, bits par case, longueur, hauteur (16 octets)
+
+STRIP_ROWS = 1024               # Nombre de lignes écrites à la fois lors de la conversion ou de la génération
+RELEASE_INTERVAL = 1 << 10      # Nombre de cases développées entre deux libérations des pages projetées en mémoire
+
+# Pas possibles, numérotés à partir de 1 dans la table des parents (0 : case non atteinte)
+STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+EVEN_CODED_MOVES = tuple((dx, dy, STEPS.index((dx, dy)) + 1) for dx, dy in EVEN_MOVES)
+ODD_CODED_MOVES = tuple((dx, dy, STEPS.index((dx, dy)) + 1) for dx, dy in ODD_MOVES)
+
+
+def release(memory_map):
+    """
+    Retire de la mémoire résidente du processus les pages d'une projection de fichier : leur contenu reste dans le
+    fichier (et le cache du système), et sera relu à la demande
+
+    Paramètres :
+        mmap memory_map: Projection en mémoire d'un fichier
+    """
+    if hasattr(mmap, "MADV_DONTNEED"):
+        memory_map.madvise(mmap.MADV_DONTNEED)
+
+
+class MazeFile:
+    """
+    Grille de labyrinthe stockée dans un fichier et projetée en mémoire (mmap), pour les labyrinthes trop grands pour
+    être chargés : seules les pages lues pendant la recherche sont chargées, et le système peut les libérer
+    Après un en-tête de 16 octets, les cases sont rangées ligne par ligne, soit sur un octet par case (types de case
+    de grid), soit sur un bit par case (1 pour le sol, 0 sinon : les lasers sont alors des murs)
+
+    Attributs principaux :
+        str path: Chemin du fichier
+        int bits: Nombre de bits par case (1 ou 8)
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        int row_bytes: Nombre d'octets d'une ligne de la grille
+        memoryview cells: Cases à plat, sans l'en-tête
+    """
+
+    def __init__(self, path, writable=False):
+        """
+        Ouvre et projette en mémoire un fichier de grille existant
+
+        Paramètres :
+            str path: Chemin du fichier
+            bool writable: Booléen définissant si la grille peut être modifiée
+        """
+        self.path = path
+        self.file = open(path, "r+b" if writable else "rb")
+
+        magic, self.bits, self.width, self.height = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or self.bits not in (1, 8):
+            self.file.close()
+            raise ValueError(f"{path} n'est pas un fichier de grille")
+
+        self.row_bytes = self.width if self.bits == 8 else (self.width + 7) // 8
+
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self.cells = memoryview(self.map)[HEADER.size:HEADER.size + self.row_bytes * self.height]
+
+    @staticmethod
+    def create(path, width, height, bits=8):
+        """
+        Crée un fichier de grille dont toutes les cases sont des murs, sans l'écrire case par case
+
+        Paramètres :
+            str path: Chemin du fichier
+            int width: Longueur de la grille
+            int height: Hauteur de la grille
+            int bits: Nombre de bits par case (1 ou 8)
+
+        Renvoi :
+            MazeFile: Grille ouverte en écriture
+        """
+        row_bytes = width if bits == 8 else (width + 7) // 8
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, bits, width, height))
+            file.truncate(HEADER.size + row_bytes * height)     # Fichier creux : des 0, donc des sols...
+
+        maze = MazeFile(path, writable=True)
+        if bits == 8:
+            # ... que l'on remplit de murs bande par bande
+            for y in range(0, height, STRIP_ROWS):
+                rows = min(STRIP_ROWS, height - y)
+                maze.cells[y * row_bytes:(y + rows) * row_bytes] = bytes([WALL]) * (rows * row_bytes)
+
+        return maze
+
+    def write_rows(self, y, grid):
+        """
+        Écrit des lignes consécutives de la grille
+
+        Paramètres :
+            int y: Ordonnée de la première ligne
+            np.ndarray grid: Tableau uint8 de dimensions (nombre de lignes, longueur) des types de case
+        """
+        if self.bits == 1:
+            grid = np.packbits(grid == FLOOR, axis=1)
+        self.cells[y * self.row_bytes:(y + grid.shape[0]) * self.row_bytes] = np.ascontiguousarray(grid, dtype=np.uint8).tobytes()
+
+    def read_rows(self, y, count):
+        """
+        Lit des lignes consécutives de la grille
+
+        Paramètres :
+            int y: Ordonnée de la première ligne
+            int count: Nombre de lignes
+
+        Renvoi :
+            np.ndarray grid: Tableau uint8 de dimensions (nombre de lignes, longueur) des types de case
+        """
+        rows = np.frombuffer(self.cells[y * self.row_bytes:(y + count) * self.row_bytes], dtype=np.uint8)
+        rows = rows.reshape(count, self.row_bytes)
+        if self.bits == 8:
+            return rows.copy()
+
+        floor = np.unpackbits(rows, axis=1, count=self.width).astype(bool)
+        return np.where(floor, FLOOR, WALL).astype(np.uint8)
+
+    def close(self):
+        """
+        Ferme la projection et le fichier
+        """
+        self.cells.release()
+        self.map.close()
+        self.file.close()
+
+
+class SearchState:
+    """
+    État d'une recherche stocké dans des fichiers temporaires projetés en mémoire, plutôt que dans des tableaux en
+    mémoire vive : ses pages peuvent être libérées au fil de la recherche (voir release)
+
+    Attributs principaux :
+        memoryview dist: Distance au départ + 1 de chaque case (0 si la case n'a pas été atteinte)
+        memoryview parent: Numéro du pas (dans STEPS) par lequel chaque case a été atteinte (0 si non atteinte)
+    """
+
+    def __init__(self, size, directory=None):
+        """
+        Crée un état vide : les fichiers sont creux, seules les pages des cases atteintes occupent de la place
+
+        Paramètres :
+            int size: Nombre de cases de la grille
+            str directory: (Optionnel) Dossier des fichiers temporaires, celui du système par défaut
+        """
+        self.files = []
+        self.maps = []
+        self.views = []
+
+        self.dist = self.mapped(size * 4, directory).cast("i")
+        self.parent = self.mapped(size, directory)
+        self.views.append(self.dist)
+
+    def mapped(self, size, directory):
+        """
+        Crée un fichier temporaire de la taille demandée et le projette en mémoire
+
+        Paramètres :
+            int size: Taille du fichier (en octets)
+            str directory: Dossier du fichier temporaire, None pour celui du système
+
+        Renvoi :
+            memoryview: Contenu du fichier, initialement nul
+        """
+        file = tempfile.TemporaryFile(dir=directory)
+        file.truncate(max(size, 1))
+        memory_map = mmap.mmap(file.fileno(), max(size, 1))
+
+        self.files.append(file)
+        self.maps.append(memory_map)
+        view = memoryview(memory_map)
+        self.views.append(view)
+
+        return view
+
+    def release(self):
+        """
+        Libère les pages de l'état de la mémoire résidente
+        """
+        for memory_map in self.maps:
+            release(memory_map)
+
+    def close(self):
+        """
+        Ferme les projections et supprime les fichiers temporaires
+        """
+        for view in reversed(self.views):
+            view.release()
+        for memory_map in self.maps:
+            memory_map.close()
+        for file in self.files:
+            file.close()
+
+
+def astar(maze, start, end, stats, state_dir=None, running=None):
+    """
+    Recherche de plus court chemin par A* sur une grille projetée en mémoire, dans le même ordre que solver.astar
+    Les distances et les parents sont dans des fichiers temporaires projetés (SearchState), libérés de la mémoire
+    résidente toutes les RELEASE_INTERVAL cases développées : seule la file de priorité reste en mémoire vive. Elle
+    n'est pas bornée : sa taille suit la frontière de la recherche (une centaine d'octets par entrée)
+
+    Paramètres :
+        MazeFile maze: Grille du labyrinthe
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        str state_dir: (Optionnel) Dossier des fichiers temporaires de l'état de la recherche
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    width, height, row_bytes, cells = maze.width, maze.height, maze.row_bytes, maze.cells
+    packed = maze.bits == 1
+    ex, ey = end
+    s = start[1] * width + start[0]
+    e = ey * width + ex
+
+    state = SearchState(width * height, state_dir)
+    dist, parent = state.dist, state.parent
+
+    try:
+        dist[s] = 1
+        i = 0
+        heap = [(abs(start[0] - ex) + abs(start[1] - ey), 0, s)]
+
+        while heap:
+            if running is not None and not running():
+                stats.cancelled = True
+                break
+
+            if len(heap) > stats.peak_open:
+                stats.peak_open = len(heap)
+
+            weight, _, current = heapq.heappop(heap)
+            y, x = divmod(current, width)
+
+            if current == e:
+                stats.heap_pushes = i + 1
+                return build_path(parent, start, end, width)
+
+            d = dist[current]
+            if weight - abs(x - ex) - abs(y - ey) != d - 1:
+                stats.stale_pops += 1
+                continue
+
+            stats.nodes_expanded += 1
+            if stats.nodes_expanded % RELEASE_INTERVAL == 0:
+                state.release()
+                release(maze.map)
+            d += 1
+
+            for dx, dy, code in (EVEN_CODED_MOVES if (x + y) % 2 == 0 else ODD_CODED_MOVES):
+                nx = x + dx
+                ny = y + dy
+
+                if 0 <= nx < width and 0 <= ny < height:
+                    if packed:
+                        if not (cells[ny * row_bytes + (nx >> 3)] >> (7 - (nx & 7))) & 1:
+                            continue
+                    elif cells[ny * row_bytes + nx] != FLOOR:
+                        continue
+
+                    neighbour = ny * width + nx
+                    if dist[neighbour] == 0 or dist[neighbour] > d:
+                        dist[neighbour] = d
+                        parent[neighbour] = code
+
+                        i += 1
+                        heapq.heappush(heap, (d - 1 + abs(nx - ex) + abs(ny - ey), -i, neighbour))
+
+        stats.heap_pushes = i + 1
+        return []
+
+    finally:
+        state.close()
+
+
+def build_path(parent, start, end, width):
+    """
+    Reconstruit le chemin en remontant les pas enregistrés depuis l'arrivée
+
+    Paramètres :
+        memoryview parent: Numéro du pas par lequel chaque case a été atteinte
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        int width: Longueur de la grille
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée
+    """
+    x, y = end
+    path = [(x, y)]
+    while (x, y) != start:
+        dx, dy = STEPS[parent[y * width + x] - 1]
+        x -= dx
+        y -= dy
+        path.append((x, y))
+
+    path.reverse()
+    return path
+
+
+def solve_file(path, start=None, end=None, state_dir=None, running=None):
+    """
+    Recherche un plus court chemin sur une grille stockée dans un fichier, sans la charger en mémoire
+
+    Paramètres :
+        str path: Chemin du fichier de grille
+        tuple(int, int) start: (Optionnel) Coordonnées du départ, (1, 1) par défaut
+        tuple(int, int) end: (Optionnel) Coordonnées de l'arrivée, l'avant-dernière case des deux axes par défaut
+        str state_dir: (Optionnel) Dossier des fichiers temporaires de l'état de la recherche
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        SearchStats stats: Statistiques de la recherche
+    """
+    maze = MazeFile(path)
+    try:
+        start = (1, 1) if start is None else tuple(start)
+        end = (maze.width - 2, maze.height - 2) if end is None else tuple(end)
+
+        stats = SearchStats("outofcore")
+
+        return timed_search(stats, lambda: astar(maze, start, end, stats, state_dir=state_dir, running=running))
+    finally:
+        maze.close()
+
+
+def convert(image_path, path, bits=8):
+    """
+    Convertit l'image d'un labyrinthe en fichier de grille, bande par bande
+
+    Paramètres :
+        str image_path: Chemin de l'image du labyrinthe
+        str path: Chemin du fichier de grille à créer
+        int bits: Nombre de bits par case (1 ou 8)
+    """
+    image = Image.open(image_path)
+    width, height = image.size
+
+    maze = MazeFile.create(path, width, height, bits)
+    try:
+        for y in range(0, height, STRIP_ROWS):
+            rows = min(STRIP_ROWS, height - y)
+            maze.write_rows(y, image_to_grid(image.crop((0, y, width, y + rows))))
+    finally:
+        maze.close()
+
+
+def generate(path, width, height, bits=8, seed=None):
+    """
+    Génère un labyrinthe parfait en arbre binaire (chaque case ouvre vers le haut ou vers la droite), bande par
+    bande avec numpy : la taille du labyrinthe n'est limitée que par la place sur le disque
+    Les cases d'abscisse et d'ordonnée impaires sont des sols, les dimensions sont donc arrondies à l'impair
+
+    Paramètres :
+        str path: Chemin du fichier de grille à créer
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        int bits: Nombre de bits par case (1 ou 8)
+        int seed: (Optionnel) Graine du générateur aléatoire
+    """
+    if width < 3 or height < 3:
+        raise ValueError(f"Un labyrinthe doit mesurer au moins 3x3 cases ({width}x{height} demandé)")
+
+    width -= 1 - width % 2
+    height -= 1 - height % 2
+    rng = np.random.default_rng(seed)
+
+    maze = MazeFile.create(path, width, height, bits)
+    try:
+        xs = np.arange(1, width - 1, 2)
+        for y0 in range(0, height, STRIP_ROWS):
+            rows = min(STRIP_ROWS, height - y0)
+            strip = np.full((rows, width), WALL, dtype=np.uint8)
+
+            for y in range(y0 + 1 - y0 % 2, y0 + rows, 2):
+                strip[y - y0, xs] = FLOOR
+
+                # Ouverture vers la droite, forcée sur la première ligne et impossible sur la dernière colonne
+                east = rng.random(xs.size) < 0.5 if y > 1 else np.ones(xs.size, dtype=bool)
+                east[-1] = False
+                strip[y - y0, xs[east] + 1] = FLOOR
+
+                # Ouverture vers le haut pour les autres cases (la ligne du dessus peut être dans la bande précédente)
+                north = xs[~east] if y > 1 else xs[:0]
+                if y - 1 >= y0:
+                    strip[y - 1 - y0, north] = FLOOR
+                else:
+                    above = maze.read_rows(y - 1, 1)
+                    above[0, north] = FLOOR
+                    maze.write_rows(y - 1, above)
+
+            maze.write_rows(y0, strip)
+    finally:
+        maze.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Labyrinthes trop grands pour la mémoire, stockés dans un fichier de grille")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_convert = commands.add_parser("convert", help="Convertit l'image d'un labyrinthe en fichier de grille")
+    parser_convert.add_argument("image", help="Chemin de l'image")
+    parser_convert.add_argument("grid", help="Chemin du fichier de grille à créer")
+    parser_convert.add_argument("--bits", type=int, choices=(1, 8), default=8, help="Nombre de bits par case")
+
+    parser_generate = commands.add_parser("generate", help="Génère un labyrinthe parfait dans un fichier de grille")
+    parser_generate.add_argument("grid", help="Chemin du fichier de grille à créer")
+    parser_generate.add_argument("width", type=int, help="Longueur du labyrinthe")
+    parser_generate.add_argument("height", type=int, help="Hauteur du labyrinthe")
+    parser_generate.add_argument("--bits", type=int, choices=(1, 8), default=8, help="Nombre de bits par case")
+    parser_generate.add_argument("--seed", type=int, help="Graine du générateur aléatoire")
+
+    parser_solve = commands.add_parser("solve", help="Recherche un plus court chemin dans un fichier de grille")
+    parser_solve.add_argument("grid", help="Chemin du fichier de grille")
+    parser_solve.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="Départ, (1, 1) par défaut")
+    parser_solve.add_argument("--end", type=int, nargs=2, metavar=("X", "Y"), help="Arrivée, coin opposé par défaut")
+    parser_solve.add_argument("--state-dir", help="Dossier des fichiers temporaires de la recherche")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert(args.image, args.grid, args.bits)
+    elif args.command == "generate":
+        try:
+            generate(args.grid, args.width, args.height, args.bits, args.seed)
+        except ValueError as error:
+            parser_generate.error(str(error))
+    else:
+        path, stats = solve_file(args.grid, args.start, args.end, args.state_dir)
+        print(f"Chemin : {stats.path_length} cases" if stats.found else "Aucun chemin")
+        print(f"Cases développées : {stats.nodes_expanded}, file max : {stats.peak_open}, durée : {stats.time:.1f} s")
+        if resource is not None:
+            # ru_maxrss est en Kio sous Linux
+            print(f"Mémoire résidente max : {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mio")
@@ -0,0 +1,120 @@
+import argparse
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from PIL import Image
+from grid import image_to_grid
+from solver import solve
+from game_state import GameState, DIRECTIONS, path_to_moves
+
+
+MODES = ("solver", "random")
+
+
+def playtest_level(name, params, mode, runs=100, max_steps=10000, seed=0):
+    """
+    Joue automatiquement un niveau : rejoue le chemin trouvé par le solveur, ou lance des marches aléatoires
+    Exécutée dans un processus du pool : ne dépend que de ses paramètres
+
+    Paramètres :
+        str name: Nom du niveau
+        dict params: Paramètres du niveau dans levels.json
+        str mode: "solver" pour rejouer le plus court chemin, "random" pour des marches aléatoires
+        int runs: Nombre de marches aléatoires
+        int max_steps: Nombre maximal de déplacements demandés par marche aléatoire
+        int seed: Graine du générateur aléatoire
+
+    Renvoi :
+        dict(str: ...): Résultats du niveau (parties gagnées, déplacements, lasers touchés, vitesse de simulation)
+    """
+    grid = image_to_grid(Image.open(params["image_path"]))
+    game = GameState(grid, params["start"], params["end"])
+
+    if mode == "solver":
+        path, _ = solve(grid, game.start, game.end)
+        games = [path_to_moves(path)] if path else []
+    else:
+        rng = random.Random(f"{seed}-{name}")
+        directions = list(DIRECTIONS.values())
+        games = [rng.choices(directions, k=max_steps) for _ in range(runs)]
+
+    won = steps = laser_hits = 0
+    t0 = perf_counter()
+    for moves in games:
+        game.reset()
+        result = game.play(moves)
+
+        won += result["won"]
+        steps += result["steps"]
+        laser_hits += result["laser_hits"]
+    duration = perf_counter() - t0
+
+    return {"level": name, "mode": mode, "games": len(games), "won": won, "steps": steps, "laser_hits": laser_hits,
+            "moves_per_second": steps / duration if duration > 0 else None}
+
+
+def playtest(levels_path="data/levels.json", level_names=None, modes=MODES, runs=100, max_steps=10000, seed=0,
+             workers=None):
+    """
+    Joue automatiquement tous les niveaux enregistrés, un niveau et un mode par tâche d'un pool de processus
+
+    Paramètres :
+        str levels_path: Chemin du fichier json des niveaux
+        list(str) level_names: (Optionnel) Noms des niveaux à jouer, tous par défaut
+        tuple(str) modes: Modes de jeu (voir playtest_level)
+        int runs: Nombre de marches aléatoires par niveau
+        int max_steps: Nombre maximal de déplacements demandés par marche aléatoire
+        int seed: Graine du générateur aléatoire
+        int workers: (Optionnel) Nombre de processus, le nombre de cœurs par défaut
+
+    Renvoi :
+        list(dict): Résultats de chaque niveau et de chaque mode (voir playtest_level)
+    """
+    with open(levels_path, "r") as file:
+        dico_niveaux = json.load(file)
+
+    tasks = [(name, params, mode) for name, params in dico_niveaux.items()
+             if level_names is None or name in level_names for mode in modes]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(playtest_level, name, params, mode, runs, max_steps, seed)
+                   for name, params, mode in tasks]
+        return [future.result() for future in futures]
+
+
+def print_table(results):
+    """
+    Affiche les résultats sous forme de tableau, une ligne par niveau et par mode
+
+    Paramètres :
+        list(dict) results: Résultats renvoyés par playtest
+    """
+    header = f"{'niveau':<24}{'mode':<8}{'parties':>9}{'gagnées':>9}{'déplacements':>14}{'lasers':>9}{'pas/s':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        speed = "-" if result["moves_per_second"] is None else f"{result['moves_per_second']:.0f}"
+        print(f"{result['level']:<24}{result['mode']:<8}{result['games']:>9}{result['won']:>9}{result['steps']:>14}"
+              f"{result['laser_hits']:>9}{speed:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Joue automatiquement les niveaux enregistrés, sans interface graphique")
+    parser.add_argument("--levels", nargs="*", help="Noms des niveaux à jouer (tous par défaut)")
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=list(MODES), help="Modes de jeu")
+    parser.add_argument("--runs", type=int, default=100, help="Nombre de marches aléatoires par niveau")
+    parser.add_argument("--max-steps", type=int, default=10000, help="Déplacements par marche aléatoire")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur aléatoire")
+    parser.add_argument("--workers", type=int, help="Nombre de processus (nombre de cœurs par défaut)")
+    parser.add_argument("--save", help="Enregistre les résultats dans ce fichier json")
+    args = parser.parse_args()
+
+    results = playtest(level_names=args.levels, modes=args.modes, runs=args.runs, max_steps=args.max_steps,
+                       seed=args.seed, workers=args.workers)
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            file.write(json.dumps(results, indent=4))
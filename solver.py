@@ -0,0 +1,1063 @@
+import heapq
+import tracemalloc
+from array import array
+from time import perf_counter
+import numpy as np
+from grid import FLOOR, WALL, LASER
+from indexed_heap import IndexedHeap
+import wavefront
+
+
+# Événements transmis à l'observateur d'une recherche
+VISITED = "visited"                     # Case sortie de la file de priorité
+FRONTIER = "frontier"                   # Case ajoutée à la file de priorité
+VISITED_BACKWARD = "visited_backward"   # Case sortie de la file de la recherche partant de l'arrivée
+FRONTIER_BACKWARD = "frontier_backward" # Case ajoutée à la file de la recherche partant de l'arrivée
+PRUNED = "pruned"                       # Case retirée avant la recherche par le comblement des culs-de-sac
+PATH = "path"                           # Case du meilleur chemin trouvé jusqu'ici (recherche anytime)
+FORMER_PATH = "former_path"             # Case d'un chemin précédent qui n'est plus sur le meilleur chemin
+
+# Facteurs successifs d'inflation de l'heuristique de la recherche anytime, jusqu'au chemin optimal
+ANYTIME_INFLATIONS = (2.0, 1.5, 1.2, 1.0)
+ANYTIME_BUDGET = 2.0        # Durée (en s) au-delà de laquelle la recherche anytime garde son meilleur chemin
+ANYTIME_CHECK_INTERVAL = 1024   # Nombre de cases développées entre deux vérifications du temps écoulé
+
+LASER_COST = 10             # Coût de l'entrée sur une case laser en mode risqué (un pas sur le sol coûte 1)
+
+# Ordres de parcours des voisins selon la parité de x + y
+EVEN_MOVES = ((-1, 0), (0, 1), (0, -1), (1, 0))
+ODD_MOVES = ((1, 0), (0, -1), (0, 1), (-1, 0))
+
+
+class SearchStats:
+    """
+    Statistiques d'une recherche de plus court chemin
+
+    Attributs principaux :
+        str strategy: Nom de la stratégie de recherche utilisée
+        bool found: Booléen indiquant si un chemin a été trouvé
+        bool cancelled: Booléen indiquant si la recherche a été interrompue avant la fin
+        int nodes_expanded: Nombre de cases développées (dont on a parcouru les voisins)
+        int heap_pushes: Nombre d'entrées ajoutées à la file de priorité
+        int stale_pops: Nombre d'entrées périmées sorties de la file et ignorées
+        int peak_open: Taille maximale de la file de priorité
+        int path_length: Nombre de cases du chemin trouvé (0 si aucun chemin)
+        float time: Durée réelle de la recherche (en s)
+        int peak_memory: Pic de mémoire allouée pendant la recherche (en octets), None s'il n'a pas été mesuré
+        int pruned_cells: Nombre de cases retirées par le comblement des culs-de-sac
+        float prune_time: Durée du comblement des culs-de-sac (en s, non comprise dans time), None s'il n'a pas été fait
+        float suboptimality: Facteur garanti entre la longueur du chemin et l'optimum (recherche anytime), None sinon
+    """
+
+    def __init__(self, strategy):
+        """
+        Initialise des statistiques vides
+
+        Paramètres :
+            str strategy: Nom de la stratégie de recherche utilisée
+        """
+        self.strategy = strategy
+        self.found = False
+        self.cancelled = False
+        self.nodes_expanded = 0
+        self.heap_pushes = 0
+        self.stale_pops = 0
+        self.peak_open = 0
+        self.path_length = 0
+        self.time = 0.
+        self.peak_memory = None
+        self.pruned_cells = 0
+        self.prune_time = None
+        self.suboptimality = None
+
+    def as_dict(self):
+        """
+        Renvoie les statistiques sous forme de dictionnaire, par exemple pour les enregistrer en json
+
+        Renvoi :
+            dict(str: ...): Statistiques indexées par le nom de l'attribut
+        """
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"SearchStats(strategy={self.strategy!r}, found={self.found}, cancelled={self.cancelled}, " \
+               f"nodes_expanded={self.nodes_expanded}, heap_pushes={self.heap_pushes}, stale_pops={self.stale_pops}, " \
+               f"peak_open={self.peak_open}, path_length={self.path_length}, time={self.time:.4f}, " \
+               f"peak_memory={self.peak_memory}, pruned_cells={self.pruned_cells}, prune_time={self.prune_time}, " \
+               f"suboptimality={self.suboptimality})"
+
+
+def start_memory_trace():
+    """
+    Commence la mesure du pic de mémoire allouée (tracemalloc ralentit nettement la recherche, la mesure est donc
+    optionnelle)
+
+    Renvoi :
+        tuple(bool, int): Booléen indiquant si la mesure a été démarrée ici, et mémoire déjà allouée au départ
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    return started, tracemalloc.get_traced_memory()[0]
+
+
+def stop_memory_trace(trace, stats):
+    """
+    Termine la mesure du pic de mémoire et l'enregistre dans les statistiques
+
+    Paramètres :
+        tuple(bool, int) trace: Valeur renvoyée par start_memory_trace
+        SearchStats stats: Statistiques à compléter
+    """
+    started, baseline = trace
+    stats.peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+    if started:
+        tracemalloc.stop()
+
+
+def timed_search(stats, search, trace_memory=False):
+    """
+    Lance une recherche en mesurant sa durée (et en option le pic de mémoire allouée), puis complète ses statistiques
+    avec le chemin trouvé. Partagée par toutes les fonctions solve (solver, hpa, couloirs, repères, LPA*...)
+
+    Paramètres :
+        SearchStats stats: Statistiques de la recherche, complétées par search pendant la recherche
+        callable search: Fonction sans paramètre réalisant la recherche et renvoyant le chemin trouvé
+        bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        SearchStats stats: Statistiques de la recherche
+    """
+    trace = start_memory_trace() if trace_memory else None
+    t0 = perf_counter()
+
+    path = search()
+
+    stats.time = perf_counter() - t0
+    if trace is not None:
+        stop_memory_trace(trace, stats)
+    stats.found = len(path) != 0
+    stats.path_length = len(path)
+
+    return path, stats
+
+
+def build_path(parent, end, width):
+    """
+    Reconstruit le chemin en remontant le tableau de parenté depuis l'arrivée
+
+    Paramètres :
+        array parent: Tableau à plat des parents de chaque case (-1 s'il n'y en a pas)
+        int end: Indice à plat de la case d'arrivée
+        int width: Longueur de la grille
+
+    Renvoi :
+        list(tuple(int, int)) path: Liste des coordonnées des cases du chemin, du départ à l'arrivée
+    """
+    path = []
+    current = end
+    while current != -1:
+        path.append((current % width, current // width))
+        current = parent[current]
+    path.reverse()
+
+    return path
+
+
+def astar(cells, width, height, start, end, stats, observer=None, running=None, heuristic=None):
+    """
+    Recherche de plus court chemin par l'algorithme A* sur une grille à plat, 4-connexe et de coût uniforme
+    L'heuristique est la distance de manhattan, sauf si une heuristique précalculée est fournie (tables de repères)
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+        heuristic: (Optionnel) Heuristique cohérente de chaque case vers l'arrivée, à plat (indexée par y * width + x)
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    ex, ey = end
+    s = start[1] * width + start[0]
+    e = ey * width + ex
+
+    dist = array("i", [-1]) * (width * height)      # Distance au départ de chaque case (-1 si non atteinte)
+    parent = array("i", [-1]) * (width * height)    # Case précédente de chaque case sur le meilleur chemin connu
+    dist[s] = 0
+
+    i = 0               # Permet d'ordonner les cases de même valeur de distance au départ + heuristique
+    heap = [(abs(start[0] - ex) + abs(start[1] - ey) if heuristic is None else heuristic[s], 0, s)]
+
+    while heap:
+        if running is not None and not running():
+            stats.cancelled = True
+            stats.heap_pushes = i + 1
+            return []
+
+        if len(heap) > stats.peak_open:
+            stats.peak_open = len(heap)
+
+        weight, _, current = heapq.heappop(heap)
+        y, x = divmod(current, width)
+
+        if observer is not None:
+            observer(VISITED, x, y)
+
+        if current == e:
+            stats.heap_pushes = i + 1
+            return build_path(parent, e, width)
+
+        d = dist[current]
+        if weight - (abs(x - ex) + abs(y - ey) if heuristic is None else heuristic[current]) != d:
+            stats.stale_pops += 1
+            continue    # Entrée périmée : la case a été ajoutée depuis avec une meilleure distance
+
+        stats.nodes_expanded += 1
+        d += 1
+
+        for dx, dy in (EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES):
+            nx = x + dx
+            ny = y + dy
+
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbour = ny * width + nx
+
+                if cells[neighbour] == FLOOR and (dist[neighbour] == -1 or dist[neighbour] > d):
+                    dist[neighbour] = d
+                    parent[neighbour] = current
+
+                    i += 1
+                    heapq.heappush(heap, (d + (abs(nx - ex) + abs(ny - ey) if heuristic is None else
+                                               heuristic[neighbour]), -i, neighbour))
+
+                    if observer is not None:
+                        observer(FRONTIER, nx, ny)
+
+    stats.heap_pushes = i + 1     # i compte les ajouts à la file en plus de celui du départ
+    return []
+
+
+def graph_astar(edges, width, s, e, stats, observer=None, running=None, heuristic=True):
+    """
+    Recherche de plus court chemin par A* sur un graphe pondéré dont les sommets sont des cases de la grille (graphe
+    abstrait de HPA*, graphe des couloirs...). L'heuristique est la distance de manhattan entre les cases, qui minore
+    le coût des arêtes tant qu'une arête ne coûte pas moins que le nombre de pas entre ses extrémités
+
+    Paramètres :
+        callable edges: Fonction renvoyant les arêtes d'un sommet : liste de (voisin, coût, étiquette de l'arête)
+        int width: Longueur de la grille
+        int s: Indice à plat du départ
+        int e: Indice à plat de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque sommet visité ou ajouté
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+        bool heuristic: Booléen définissant si l'on guide la recherche par la distance de manhattan (A*), sinon la
+                        recherche est un algorithme de Dijkstra
+
+    Renvoi :
+        dict(int: tuple(int, ...)) parent: Sommet précédent et étiquette de l'arête empruntée pour chaque sommet
+                                           atteint (None pour le départ), None si l'arrivée n'est pas atteinte
+    """
+    ey, ex = divmod(e, width)
+    h = 1 if heuristic else 0
+
+    dist = {s: 0}
+    parent = {s: None}
+    i = 0
+    y, x = divmod(s, width)
+    heap = [(h * (abs(x - ex) + abs(y - ey)), 0, s)]
+
+    while heap:
+        if running is not None and not running():
+            stats.cancelled = True
+            stats.heap_pushes = i + 1
+            return None
+
+        if len(heap) > stats.peak_open:
+            stats.peak_open = len(heap)
+
+        weight, _, current = heapq.heappop(heap)
+        y, x = divmod(current, width)
+
+        if observer is not None:
+            observer(VISITED, x, y)
+
+        if current == e:
+            stats.heap_pushes = i + 1
+            return parent
+
+        d = dist[current]
+        if weight - h * (abs(x - ex) + abs(y - ey)) != d:
+            stats.stale_pops += 1
+            continue    # Entrée périmée : le sommet a été ajouté depuis avec une meilleure distance
+
+        stats.nodes_expanded += 1
+
+        for neighbour, cost, label in edges(current):
+            nd = d + cost
+            if neighbour not in dist or dist[neighbour] > nd:
+                dist[neighbour] = nd
+                parent[neighbour] = (current, label)
+
+                ny, nx = divmod(neighbour, width)
+                i += 1
+                heapq.heappush(heap, (nd + h * (abs(nx - ex) + abs(ny - ey)), -i, neighbour))
+
+                if observer is not None:
+                    observer(FRONTIER, nx, ny)
+
+    stats.heap_pushes = i + 1
+    return None
+
+
+def indexed_astar(cells, width, height, start, end, stats, observer=None, running=None):
+    """
+    Recherche de plus court chemin par A*, avec une file de priorité indexée : lorsque la distance d'une case déjà
+    dans la file s'améliore, sa priorité est diminuée sur place. Chaque case est au plus une fois dans la file, qui
+    ne contient donc jamais d'entrée périmée
+    La priorité (distance + heuristique, -i) est codée dans un seul entier : les cases sortent dans le même ordre
+    qu'avec astar, et le chemin trouvé est identique
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    ex, ey = end
+    s = start[1] * width + start[0]
+    e = ey * width + ex
+
+    dist = array("i", [-1]) * (width * height)
+    parent = array("i", [-1]) * (width * height)
+    dist[s] = 0
+
+    i = 0
+    heap = IndexedHeap(width * height)
+    heap.push(s, (abs(start[0] - ex) + abs(start[1] - ey)) << 32)
+    push, pop = heap.push, heap.pop
+
+    while heap:
+        if running is not None and not running():
+            stats.cancelled = True
+            stats.heap_pushes = i + 1
+            return []
+
+        if len(heap) > stats.peak_open:
+            stats.peak_open = len(heap)
+
+        current = pop()
+        y, x = divmod(current, width)
+
+        if observer is not None:
+            observer(VISITED, x, y)
+
+        if current == e:
+            stats.heap_pushes = i + 1
+            return build_path(parent, e, width)
+
+        stats.nodes_expanded += 1
+        d = dist[current] + 1
+
+        for dx, dy in (EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES):
+            nx = x + dx
+            ny = y + dy
+
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbour = ny * width + nx
+
+                if cells[neighbour] == FLOOR and (dist[neighbour] == -1 or dist[neighbour] > d):
+                    dist[neighbour] = d
+                    parent[neighbour] = current
+
+                    # i < 2 ** 32 : l'ordre des priorités entières est celui des couples (distance + heuristique, -i)
+                    i += 1
+                    push(neighbour, ((d + abs(nx - ex) + abs(ny - ey)) << 32) - i)
+
+                    if observer is not None:
+                        observer(FRONTIER, nx, ny)
+
+    stats.heap_pushes = i + 1     # Ajouts à la file et diminutions de priorité
+    return []
+
+
+def bucket_astar(cells, width, height, start, end, stats, observer=None, running=None, laser_cost=0):
+    """
+    Recherche de plus court chemin par A* avec une file à seaux (algorithme de Dial) : les coûts étant de petits
+    entiers, les cases sont rangées dans une liste de seaux indexée par leur valeur distance + heuristique, et la
+    valeur minimale ne fait qu'augmenter (l'heuristique est cohérente). Ajout et retrait se font en temps constant
+    Dans un seau, la dernière case ajoutée sort la première : c'est l'ordre de astar (priorité -i), le chemin trouvé
+    avec des coûts unitaires est donc identique
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+        int laser_cost: Coût de l'entrée sur une case laser (0 si les lasers sont infranchissables)
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    ex, ey = end
+    s = start[1] * width + start[0]
+    e = ey * width + ex
+
+    # Coût de l'entrée sur chaque type de case (0 : infranchissable)
+    costs = [0] * 256
+    costs[FLOOR] = 1
+    costs[LASER] = laser_cost
+
+    dist = array("i", [-1]) * (width * height)
+    parent = array("i", [-1]) * (width * height)
+    dist[s] = 0
+
+    f = abs(start[0] - ex) + abs(start[1] - ey)
+    buckets = [[] for _ in range(f)] + [[s]]
+    i = 0
+    size = 1    # Nombre d'entrées dans la file
+
+    while f < len(buckets):
+        bucket = buckets[f]
+        if not bucket:
+            f += 1
+            continue
+
+        if running is not None and not running():
+            stats.cancelled = True
+            stats.heap_pushes = i + 1
+            return []
+
+        if size > stats.peak_open:
+            stats.peak_open = size
+
+        current = bucket.pop()
+        size -= 1
+        y, x = divmod(current, width)
+
+        if observer is not None:
+            observer(VISITED, x, y)
+
+        if current == e:
+            stats.heap_pushes = i + 1
+            return build_path(parent, e, width)
+
+        d = dist[current]
+        if f - abs(x - ex) - abs(y - ey) != d:
+            stats.stale_pops += 1
+            continue
+
+        stats.nodes_expanded += 1
+
+        for dx, dy in (EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES):
+            nx = x + dx
+            ny = y + dy
+
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbour = ny * width + nx
+                cost = costs[cells[neighbour]]
+
+                if cost and (dist[neighbour] == -1 or dist[neighbour] > d + cost):
+                    nd = d + cost
+                    dist[neighbour] = nd
+                    parent[neighbour] = current
+
+                    nf = nd + abs(nx - ex) + abs(ny - ey)
+                    while len(buckets) <= nf:
+                        buckets.append([])
+                    buckets[nf].append(neighbour)
+                    i += 1
+                    size += 1
+
+                    if observer is not None:
+                        observer(FRONTIER, nx, ny)
+
+    stats.heap_pushes = i + 1
+    return []
+
+
+def risky_astar(cells, width, height, start, end, stats, observer=None, running=None):
+    """
+    Recherche en mode risqué : les lasers sont franchissables, au prix de LASER_COST pas chacun (voir bucket_astar)
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin de moindre coût du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    return bucket_astar(cells, width, height, start, end, stats, observer=observer, running=running,
+                        laser_cost=LASER_COST)
+
+
+def anytime_astar(cells, width, height, start, end, stats, observer=None, running=None):
+    """
+    Recherche anytime par l'algorithme ARA* (Anytime Repairing A*) : un premier chemin est trouvé rapidement par un
+    A* pondéré (heuristique multipliée par un facteur d'inflation), puis le facteur est diminué pas à pas jusqu'à 1.
+    Chaque nouvelle passe ne redéveloppe que les cases dont la distance s'est améliorée lors de la précédente
+    Chaque amélioration du chemin est transmise à l'observateur (événements PATH et FORMER_PATH). Une fois le budget
+    de temps écoulé, la recherche s'arrête avec le meilleur chemin trouvé
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée, et
+                           pour chaque case des chemins successifs
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Meilleur chemin trouvé du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    ex, ey = end
+    s = start[1] * width + start[0]
+    e = ey * width + ex
+    deadline = perf_counter() + ANYTIME_BUDGET
+
+    dist = array("i", [-1]) * (width * height)
+    parent = array("i", [-1]) * (width * height)
+    closed = bytearray(width * height)  # Cases développées lors de la passe en cours
+    dist[s] = 0
+
+    opened = {s}        # Cases à développer lors de la passe en cours
+    inconsistent = []   # Cases déjà développées dont la distance s'est améliorée : elles le seront à la passe suivante
+    path = []
+    i = 0
+
+    for inflation in ANYTIME_INFLATIONS:
+        # Les priorités sont entières : 10 * (distance + facteur * heuristique)
+        weight = round(inflation * 10)
+
+        heap = []
+        for u in opened.union(inconsistent):
+            y, x = divmod(u, width)
+            i += 1
+            heap.append((10 * dist[u] + weight * (abs(x - ex) + abs(y - ey)), -i, u))
+        heapq.heapify(heap)
+        opened.update(inconsistent)
+        inconsistent = []
+        closed = bytearray(width * height)
+        complete = True     # Devient False si la passe est interrompue par le budget de temps
+
+        # Le chemin actuel est conservé tant qu'aucune case n'a une priorité inférieure à celle de l'arrivée
+        while heap and (dist[e] == -1 or heap[0][0] < 10 * dist[e]):
+            if running is not None and not running():
+                stats.cancelled = True
+                stats.heap_pushes = i
+                return []
+
+            if path and stats.nodes_expanded % ANYTIME_CHECK_INTERVAL == 0 and perf_counter() > deadline:
+                complete = False
+                break
+
+            if len(heap) > stats.peak_open:
+                stats.peak_open = len(heap)
+
+            key, _, current = heapq.heappop(heap)
+            y, x = divmod(current, width)
+
+            d = dist[current]
+            if closed[current] or key != 10 * d + weight * (abs(x - ex) + abs(y - ey)):
+                stats.stale_pops += 1
+                continue
+
+            closed[current] = 1
+            opened.discard(current)
+            stats.nodes_expanded += 1
+            if observer is not None:
+                observer(VISITED, x, y)
+            d += 1
+
+            for dx, dy in (EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES):
+                nx = x + dx
+                ny = y + dy
+
+                if 0 <= nx < width and 0 <= ny < height:
+                    neighbour = ny * width + nx
+
+                    if cells[neighbour] == FLOOR and (dist[neighbour] == -1 or dist[neighbour] > d):
+                        dist[neighbour] = d
+                        parent[neighbour] = current
+
+                        if closed[neighbour]:
+                            inconsistent.append(neighbour)
+                        else:
+                            opened.add(neighbour)
+                            i += 1
+                            heapq.heappush(heap, (10 * d + weight * (abs(nx - ex) + abs(ny - ey)), -i, neighbour))
+
+                            if observer is not None:
+                                observer(FRONTIER, nx, ny)
+
+        if dist[e] == -1:
+            break
+
+        new_path = build_path(parent, e, width)
+        if new_path != path:
+            if observer is not None:
+                on_new_path = set(new_path)
+                for point in path:
+                    if point not in on_new_path:
+                        observer(FORMER_PATH, *point)
+                for point in new_path:
+                    observer(PATH, *point)
+            path = new_path
+
+        # Après une passe complète, le chemin est au plus inflation fois plus long que l'optimum
+        if complete:
+            stats.suboptimality = inflation
+        if not complete or perf_counter() > deadline:
+            break
+
+    stats.heap_pushes = i     # Le départ est compté lors de la construction de la première file
+    return path
+
+
+def bidirectional_astar(cells, width, height, start, end, stats, observer=None, running=None):
+    """
+    Recherche de plus court chemin par A* bidirectionnel : une recherche part du départ, une autre de l'arrivée,
+    et on s'arrête lorsque le meilleur point de rencontre trouvé ne peut plus être amélioré
+    Le chemin renvoyé est optimal : avec une heuristique cohérente, tout chemin plus court que le meilleur connu
+    aurait une case dans chaque file de valeur inférieure à sa longueur
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    sx, sy = start
+    ex, ey = end
+    s = sy * width + sx
+    e = ey * width + ex
+
+    if s == e:
+        return [start]
+
+    dist_forward = array("i", [-1]) * (width * height)
+    parent_forward = array("i", [-1]) * (width * height)
+    dist_backward = array("i", [-1]) * (width * height)
+    parent_backward = array("i", [-1]) * (width * height)
+    dist_forward[s] = 0
+    dist_backward[e] = 0
+
+    heap_forward = [(abs(sx - ex) + abs(sy - ey), 0, s)]
+    heap_backward = [(abs(sx - ex) + abs(sy - ey), 0, e)]
+
+    # (file, distances, parents, distances de l'autre recherche, cible de l'heuristique, événements)
+    sides = ((heap_forward, dist_forward, parent_forward, dist_backward, ex, ey, VISITED, FRONTIER),
+             (heap_backward, dist_backward, parent_backward, dist_forward, sx, sy, VISITED_BACKWARD, FRONTIER_BACKWARD))
+
+    best = -1       # Longueur du meilleur chemin connu passant par un point de rencontre (-1 s'il n'y en a pas)
+    meeting = -1    # Case de rencontre des deux recherches sur ce chemin
+
+    i = 0
+    while heap_forward and heap_backward:
+        if running is not None and not running():
+            stats.cancelled = True
+            stats.heap_pushes = i + 2
+            return []
+
+        if best != -1 and (heap_forward[0][0] >= best or heap_backward[0][0] >= best):
+            break
+
+        if len(heap_forward) + len(heap_backward) > stats.peak_open:
+            stats.peak_open = len(heap_forward) + len(heap_backward)
+
+        # On développe la recherche dont la file est la plus petite
+        heap, dist, parent, other_dist, tx, ty, visited, frontier = sides[len(heap_forward) > len(heap_backward)]
+
+        weight, _, current = heapq.heappop(heap)
+        y, x = divmod(current, width)
+
+        if observer is not None:
+            observer(visited, x, y)
+
+        d = dist[current]
+        if weight - abs(x - tx) - abs(y - ty) != d:
+            stats.stale_pops += 1
+            continue
+
+        stats.nodes_expanded += 1
+        d += 1
+
+        for dx, dy in (EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES):
+            nx = x + dx
+            ny = y + dy
+
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbour = ny * width + nx
+
+                if cells[neighbour] == FLOOR and (dist[neighbour] == -1 or dist[neighbour] > d):
+                    dist[neighbour] = d
+                    parent[neighbour] = current
+
+                    i += 1
+                    heapq.heappush(heap, (d + abs(nx - tx) + abs(ny - ty), -i, neighbour))
+
+                    if observer is not None:
+                        observer(frontier, nx, ny)
+
+                    if other_dist[neighbour] != -1 and (best == -1 or d + other_dist[neighbour] < best):
+                        best = d + other_dist[neighbour]
+                        meeting = neighbour
+
+    stats.heap_pushes = i + 2     # i compte les ajouts aux files en plus de ceux du départ et de l'arrivée
+    if meeting == -1:
+        return []
+
+    path = build_path(parent_forward, meeting, width)
+
+    current = parent_backward[meeting]
+    while current != -1:
+        path.append((current % width, current // width))
+        current = parent_backward[current]
+
+    return path
+
+
+def jump_point_search(cells, width, height, start, end, stats, observer=None, running=None):
+    """
+    Recherche de plus court chemin par Jump Point Search, adapté aux grilles 4-connexes de coût uniforme
+    Plutôt que d'ajouter chaque case voisine à la file, on avance en ligne droite tant qu'aucune case n'oblige à
+    changer de direction : seules ces cases (points de saut) sont développées, ce qui évite de parcourir une à une
+    les zones ouvertes
+
+    Paramètres :
+        bytes cells: Types de case à plat, indexés par y * width + x
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        SearchStats stats: Statistiques à compléter
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque point de saut visité ou ajouté
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+    """
+    # Grille entourée d'une bordure de murs pour ne pas avoir à tester les bords
+    w = width + 2
+    padded = bytearray([WALL]) * (w * (height + 2))
+    for y in range(height):
+        padded[(y + 1) * w + 1:(y + 1) * w + 1 + width] = cells[y * width:(y + 1) * width]
+
+    ex, ey = end
+    s = (start[1] + 1) * w + start[0] + 1
+    e = (ey + 1) * w + ex + 1
+
+    # Mémorise pour chaque case et chaque sens horizontal s'il y a un point de saut avant le prochain mur
+    # (0 : inconnu, 1 : oui, 2 : non)
+    has_jump_point = {1: bytearray(len(padded)), -1: bytearray(len(padded))}
+
+    def jump_horizontal(p, d):
+        """
+        Avance horizontalement depuis p dans le sens d et renvoie l'indice du prochain point de saut (-1 si mur)
+        """
+        while True:
+            p += d
+            if padded[p] != FLOOR:
+                return -1
+            if p == e:
+                return p
+            # Voisin forcé : une case au-dessus ou en dessous s'ouvre alors qu'elle était bloquée juste avant
+            if padded[p - w] == FLOOR and padded[p - d - w] != FLOOR or padded[p + w] == FLOOR and padded[p - d + w] != FLOOR:
+                return p
+
+    def horizontal_jump_point_exists(p, d):
+        """
+        Indique s'il existe un point de saut en avançant horizontalement depuis p dans le sens d
+        Le résultat est partagé par toutes les cases parcourues, chaque case n'est donc parcourue qu'une fois
+        """
+        memo = has_jump_point[d]
+        scanned = []
+        q = p
+        result = 0
+        while result == 0:
+            result = memo[q]
+            if result != 0:
+                break
+
+            scanned.append(q)
+            q += d
+            if padded[q] != FLOOR:
+                result = 2
+            elif q == e or padded[q - w] == FLOOR and padded[q - d - w] != FLOOR or \
+                    padded[q + w] == FLOOR and padded[q - d + w] != FLOOR:
+                result = 1
+
+        for q in scanned:
+            memo[q] = result
+
+        return result == 1
+
+    def jump_vertical(p, d):
+        """
+        Avance verticalement depuis p dans le sens d (±w) et renvoie l'indice du prochain point de saut (-1 si mur)
+        """
+        while True:
+            p += d
+            if padded[p] != FLOOR:
+                return -1
+            if p == e:
+                return p
+            if padded[p - 1] == FLOOR and padded[p - 1 - d] != FLOOR or padded[p + 1] == FLOOR and padded[p + 1 - d] != FLOOR:
+                return p
+            # En se déplaçant verticalement, une case menant horizontalement à un point de saut en est un aussi
+            if horizontal_jump_point_exists(p, 1) or horizontal_jump_point_exists(p, -1):
+                return p
+
+    dist = array("i", [-1]) * len(padded)
+    parent = array("i", [-1]) * len(padded)
+    dist[s] = 0
+
+    i = 0
+    heap = [(abs(start[0] - ex) + abs(start[1] - ey), 0, s)]
+
+    while heap:
+        if running is not None and not running():
+            stats.cancelled = True
+            stats.heap_pushes = i + 1
+            return []
+
+        if len(heap) > stats.peak_open:
+            stats.peak_open = len(heap)
+
+        weight, _, current = heapq.heappop(heap)
+        y, x = divmod(current, w)
+
+        if observer is not None:
+            observer(VISITED, x - 1, y - 1)
+
+        if current == e:
+            break
+
+        d = dist[current]
+        if weight - abs(x - 1 - ex) - abs(y - 1 - ey) != d:
+            stats.stale_pops += 1
+            continue
+
+        stats.nodes_expanded += 1
+
+        # Directions à explorer : toutes pour le départ, sinon la direction d'arrivée et les deux perpendiculaires
+        if parent[current] == -1:
+            directions = EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES
+        else:
+            py, px = divmod(parent[current], w)
+            if px != x:
+                directions = ((0, -1), (0, 1), (1 if x > px else -1, 0))
+            else:
+                directions = ((-1, 0), (1, 0), (0, 1 if y > py else -1))
+
+        for dx, dy in directions:
+            if dx != 0:
+                jump_point = jump_horizontal(current, dx)
+            else:
+                jump_point = jump_vertical(current, dy * w)
+
+            if jump_point != -1:
+                ny, nx = divmod(jump_point, w)
+                nd = d + abs(nx - x) + abs(ny - y)
+
+                if dist[jump_point] == -1 or dist[jump_point] > nd:
+                    dist[jump_point] = nd
+                    parent[jump_point] = current
+
+                    i += 1
+                    heapq.heappush(heap, (nd + abs(nx - 1 - ex) + abs(ny - 1 - ey), -i, jump_point))
+
+                    if observer is not None:
+                        observer(FRONTIER, nx - 1, ny - 1)
+    else:
+        stats.heap_pushes = i + 1
+        return []
+
+    stats.heap_pushes = i + 1
+    # Les points de saut sont alignés deux à deux : on complète le chemin par des segments droits
+    jump_points = build_path(parent, e, w)
+    path = [(jump_points[0][0] - 1, jump_points[0][1] - 1)]
+    for x1, y1 in jump_points[1:]:
+        x1, y1 = x1 - 1, y1 - 1
+        x0, y0 = path[-1]
+        dx = (x1 > x0) - (x1 < x0)
+        dy = (y1 > y0) - (y1 < y0)
+        for k in range(1, abs(x1 - x0) + abs(y1 - y0) + 1):
+            path.append((x0 + k * dx, y0 + k * dy))
+
+    return path
+
+
+class DistanceField:
+    """
+    Champ des distances (en nombre de pas) de chaque case à une case source
+    En descendant le champ, on obtient un plus court chemin vers la source depuis n'importe quelle case en un temps
+    proportionnel à la longueur du chemin
+
+    Attributs principaux :
+        int width: Longueur de la grille
+        int height: Hauteur de la grille
+        tuple(int, int) source: Coordonnées de la case source
+        memoryview distances: Distances à plat, indexées par y * width + x (-1 si la case ne peut pas atteindre la source)
+    """
+
+    def __init__(self, grid, source):
+        """
+        Calcule le champ des distances par propagation vectorisée d'un front d'onde depuis la source
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) source: Coordonnées de la case source (en général l'arrivée du niveau)
+        """
+        self.height, self.width = grid.shape
+        self.source = tuple(source)
+
+        self.distances = memoryview(wavefront.distance_field(grid, self.source).ravel())
+
+    def distance(self, x, y):
+        """
+        Renvoie la distance d'une case à la source
+
+        Paramètres :
+            int x: Abscisse de la case
+            int y: Ordonnée de la case
+
+        Renvoi :
+            int: Nombre de pas jusqu'à la source, -1 si la source n'est pas accessible
+        """
+        return self.distances[y * self.width + x]
+
+    def next_move(self, x, y):
+        """
+        Renvoie la case suivante sur un plus court chemin vers la source
+
+        Paramètres :
+            int x: Abscisse de la case
+            int y: Ordonnée de la case
+
+        Renvoi :
+            tuple(int, int): Coordonnées de la case suivante, None si l'on est sur la source ou qu'elle est inaccessible
+        """
+        d = self.distance(x, y)
+        if d <= 0:
+            return None
+
+        for dx, dy in (EVEN_MOVES if (x + y) % 2 == 0 else ODD_MOVES):
+            nx = x + dx
+            ny = y + dy
+
+            if 0 <= nx < self.width and 0 <= ny < self.height and self.distances[ny * self.width + nx] == d - 1:
+                return nx, ny
+
+    def path_from(self, x, y):
+        """
+        Renvoie un plus court chemin d'une case vers la source en descendant le champ des distances
+
+        Paramètres :
+            int x: Abscisse de la case de départ
+            int y: Ordonnée de la case de départ
+
+        Renvoi :
+            list(tuple(int, int)) path: Chemin de la case vers la source, liste vide si la source est inaccessible
+        """
+        if self.distance(x, y) == -1:
+            return []
+
+        path = [(x, y)]
+        move = self.next_move(x, y)
+        while move is not None:
+            path.append(move)
+            move = self.next_move(*move)
+
+        return path
+
+
+# Stratégies de recherche disponibles
+STRATEGIES = {
+    "astar": astar,
+    "astar_indexed": indexed_astar,
+    "anytime": anytime_astar,
+    "bucket": bucket_astar,
+    "risky": risky_astar,
+    "bidirectional": bidirectional_astar,
+    "jps": jump_point_search,
+}
+
+
+def solve(grid, start, end, strategy="astar", observer=None, running=None, trace_memory=False, prune=False):
+    """
+    Recherche un plus court chemin entre le départ et l'arrivée sur une grille de types de case
+    Ne dépend pas de l'interface graphique
+    Les culs-de-sac peuvent d'abord être comblés : la recherche porte alors sur la grille élaguée
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        str strategy: Nom de la stratégie de recherche (clé de STRATEGIES)
+        callable observer: (Optionnel) Fonction appelée avec (événement, x, y) pour chaque case visitée ou ajoutée
+        callable running: (Optionnel) Fonction renvoyant False lorsque la recherche doit être interrompue
+        bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+        bool prune: Booléen définissant si l'on comble les culs-de-sac avant la recherche
+
+    Renvoi :
+        list(tuple(int, int)) path: Chemin du départ à l'arrivée, liste vide si aucun chemin n'existe
+        SearchStats stats: Statistiques de la recherche
+    """
+    height, width = grid.shape
+    start = tuple(start)
+    end = tuple(end)
+
+    stats = SearchStats(strategy)
+
+    # Le comblement ne considère que les cases de sol : en mode risqué, il pourrait couper un passage par un laser
+    if prune and strategy != "risky":
+        t0 = perf_counter()
+        pruned = wavefront.fill_dead_ends(grid, keep=(start, end))
+        grid = grid.copy()
+        grid[pruned] = WALL
+        stats.prune_time = perf_counter() - t0
+        stats.pruned_cells = int(np.count_nonzero(pruned))
+
+        if observer is not None:
+            for y, x in zip(*np.nonzero(pruned)):
+                observer(PRUNED, int(x), int(y))
+
+    return timed_search(stats, lambda: STRATEGIES[strategy](grid.tobytes(), width, height, start, end, stats,
+                                                            observer=observer, running=running), trace_memory)
@@ -0,0 +1,200 @@
+import multiprocessing as mp
+import queue
+from time import perf_counter
+from multiprocessing import shared_memory
+import numpy as np
+from solver import solve, SearchStats
+
+
+STOP_TIMEOUT = 0.5      # Délai (en s) laissé à un processus de recherche pour s'arrêter avant d'être arrêté de force
+
+
+def solve_in_process(shm_name, shape, start, end, strategy, trace_memory, prune, results):
+    """
+    Fonction exécutée par le processus de recherche : lit la grille en mémoire partagée et renvoie le résultat par
+    la file. L'octet qui suit la grille dans la mémoire partagée sert de drapeau d'annulation
+
+    Paramètres :
+        str shm_name: Nom du segment de mémoire partagée contenant la grille suivie du drapeau d'annulation
+        tuple(int, int) shape: Dimensions (hauteur, longueur) de la grille
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+        str strategy: Nom de la stratégie de recherche (clé de solver.STRATEGIES)
+        bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+        bool prune: Booléen définissant si l'on comble les culs-de-sac avant la recherche
+        multiprocessing.Queue results: File dans laquelle est placé le couple (chemin, statistiques)
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    size = shape[0] * shape[1]
+
+    grid = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    path, stats = solve(grid, start, end, strategy=strategy, running=lambda: shm.buf[size] == 0,
+                        trace_memory=trace_memory, prune=prune)
+    del grid    # La vue sur la mémoire partagée doit être libérée avant de la fermer
+
+    shm.close()
+    results.put((path, stats))
+
+
+class ProcessSolver:
+    """
+    Lance une recherche de plus court chemin dans un processus séparé, pour qu'elle ne partage pas le GIL avec
+    l'interface graphique
+    La grille est transmise par mémoire partagée et le résultat est récupéré sans bloquer avec poll
+
+    Attributs principaux :
+        str strategy: Nom de la stratégie de la recherche en cours
+        multiprocessing.Process process: Processus de la recherche en cours (None s'il n'y en a pas)
+        SharedMemory shm: Mémoire partagée contenant la grille suivie du drapeau d'annulation
+        int flag: Position du drapeau d'annulation dans la mémoire partagée
+        multiprocessing.Queue results: File par laquelle le processus renvoie le chemin et les statistiques
+        list(tuple) stopping: Recherches annulées ou terminées dont le processus n'a pas encore été libéré : (processus,
+                              mémoire partagée, file, instant au-delà duquel le processus est arrêté de force)
+    """
+
+    def __init__(self):
+        """
+        Initialise l'objet sans recherche en cours
+        """
+        # spawn plutôt que fork : on ne duplique pas un processus dans lequel tourne tkinter
+        self.context = mp.get_context("spawn")
+
+        self.strategy = None
+        self.process = None
+        self.shm = None
+        self.flag = 0
+        self.results = None
+        self.stopping = []
+
+    def start(self, grid, start, end, strategy="astar", trace_memory=False, prune=False):
+        """
+        Lance la recherche dans un nouveau processus (la recherche précédente est annulée si elle tourne encore)
+
+        Paramètres :
+            np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+            tuple(int, int) start: Coordonnées du départ
+            tuple(int, int) end: Coordonnées de l'arrivée
+            str strategy: Nom de la stratégie de recherche (clé de solver.STRATEGIES)
+            bool trace_memory: Booléen définissant si l'on mesure le pic de mémoire allouée pendant la recherche
+            bool prune: Booléen définissant si l'on comble les culs-de-sac avant la recherche
+        """
+        self.cancel()
+
+        # La taille du segment peut être arrondie par le système : on retient la position du drapeau
+        self.flag = grid.size
+        self.shm = shared_memory.SharedMemory(create=True, size=grid.size + 1)
+        self.shm.buf[:grid.size] = grid.tobytes()
+        self.shm.buf[self.flag] = 0
+
+        self.strategy = strategy
+        self.results = self.context.Queue()
+        self.process = self.context.Process(target=solve_in_process, daemon=True,
+                                            args=(self.shm.name, grid.shape, tuple(start), tuple(end), strategy,
+                                                  trace_memory, prune, self.results))
+        self.process.start()
+
+    def is_running(self):
+        """
+        Indique si une recherche est en cours
+
+        Renvoi :
+            bool: True si un processus de recherche a été lancé et que son résultat n'a pas encore été récupéré
+        """
+        return self.process is not None
+
+    def poll(self):
+        """
+        Récupère le résultat de la recherche s'il est disponible, sans jamais bloquer (appelée depuis la boucle de
+        tkinter). Un processus arrêté sans avoir renvoyé de résultat donne une recherche annulée
+
+        Renvoi :
+            tuple(list(tuple(int, int)), SearchStats): Chemin et statistiques, None si la recherche n'est pas terminée
+        """
+        if self.process is None:
+            return None
+
+        alive = self.process.is_alive()
+        try:
+            # Un processus terminé a vidé sa file avant de s'arrêter : son résultat est déjà lisible
+            result = self.results.get_nowait()
+        except queue.Empty:
+            if alive:
+                return None
+
+            # Le processus s'est arrêté sans renvoyer de résultat
+            stats = SearchStats(self.strategy)
+            stats.cancelled = True
+            result = [], stats
+
+        # Le processus peut encore être en train de s'arrêter : il est libéré par reap, sans l'attendre ici
+        self.stopping.append((self.process, self.shm, self.results, perf_counter() + STOP_TIMEOUT))
+        self.process = None
+        self.shm = None
+        self.results = None
+        self.reap()
+
+        return result
+
+    def cancel(self, timeout=STOP_TIMEOUT):
+        """
+        Annule la recherche en cours sans attendre le processus : il est prévenu par le drapeau d'annulation, puis
+        arrêté de force par reap s'il ne s'est pas terminé au bout du délai
+
+        Paramètres :
+            float timeout: Délai (en s) laissé au processus pour s'arrêter de lui-même
+        """
+        if self.process is not None:
+            self.shm.buf[self.flag] = 1
+            self.stopping.append((self.process, self.shm, self.results, perf_counter() + timeout))
+
+            self.process = None
+            self.shm = None
+            self.results = None
+
+        self.reap()
+
+    def reap(self):
+        """
+        Libère les recherches annulées ou terminées dont le processus s'est arrêté, et arrête de force celles qui ont dépassé leur
+        délai. Appelée à chaque lancement, vérification ou annulation de recherche, sans jamais attendre un processus
+        """
+        remaining = []
+        for process, shm, results, deadline in self.stopping:
+            if process.is_alive():
+                if perf_counter() < deadline:
+                    remaining.append((process, shm, results, deadline))
+                    continue
+                process.terminate()
+
+            process.join()
+            self.release(shm, results)
+
+        self.stopping = remaining
+
+    def shutdown(self):
+        """
+        Arrête de force la recherche en cours et les recherches annulées qui ne sont pas encore terminées, et libère
+        leur mémoire partagée (en quittant, les segments ne seraient sinon jamais supprimés)
+        """
+        self.cancel(timeout=0)
+
+        for process, shm, results, _ in self.stopping:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            self.release(shm, results)
+
+        self.stopping = []
+
+    @staticmethod
+    def release(shm, results):
+        """
+        Libère la mémoire partagée et la file d'une recherche dont le processus est terminé
+
+        Paramètres :
+            SharedMemory shm: Mémoire partagée contenant la grille suivie du drapeau d'annulation
+            multiprocessing.Queue results: File par laquelle le processus renvoie son résultat
+        """
+        shm.close()
+        shm.unlink()
+        results.close()
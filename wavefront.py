@@ -0,0 +1,193 @@
+import json
+import numpy as np
+from PIL import Image
+from grid import FLOOR, image_to_grid
+
+
+SMALL_FRONT = 64    # Taille de front en dessous de laquelle le comblement des culs-de-sac se termine case par case
+
+
+def padded_passable(grid):
+    """
+    Construit le masque à plat des cases praticables, entouré d'une bordure de cases bloquées
+    Les voisins d'une case d'indice i sont alors i ± 1 et i ± (longueur + 2), sans test de bord
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+
+    Renvoi :
+        np.ndarray passable: Tableau de bool à plat de taille (hauteur + 2) * (longueur + 2)
+        int padded_width: Longueur de la grille avec sa bordure
+    """
+    height, width = grid.shape
+    passable = np.zeros((height + 2, width + 2), dtype=bool)
+    passable[1:-1, 1:-1] = grid == FLOOR
+
+    return passable.ravel(), width + 2
+
+
+def wavefront(grid, source, running=None):
+    """
+    Propage un front d'onde depuis la source sur les cases de sol : à chaque étape, le front entier est décalé dans
+    les 4 directions et masqué par les cases praticables et non encore atteintes, sans boucle Python par case
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) source: Coordonnées de la case de départ de la propagation
+        callable running: (Optionnel) Fonction renvoyant False lorsque la propagation doit être interrompue
+
+    Renvoi :
+        np.ndarray distances: Tableau int32 de dimensions (hauteur, longueur) des distances à la source (-1 si inaccessible),
+                              None si la propagation a été interrompue
+    """
+    height, width = grid.shape
+    passable, padded_width = padded_passable(grid)
+
+    distances = np.full(passable.size, -1, dtype=np.int32)
+    offsets = np.array([-1, 1, -padded_width, padded_width])
+
+    s = (source[1] + 1) * padded_width + source[0] + 1
+    unreached = passable.copy()
+    unreached[s] = False
+    distances[s] = 0
+
+    front = np.array([s])
+    d = 0
+    while front.size:
+        if running is not None and not running():
+            return None
+
+        d += 1
+        neighbours = (front[:, np.newaxis] + offsets).ravel()
+        front = np.unique(neighbours[unreached[neighbours]])     # Une case peut être atteinte par plusieurs côtés
+
+        unreached[front] = False
+        distances[front] = d
+
+    return distances.reshape(height + 2, padded_width)[1:-1, 1:-1].copy()
+
+
+def distance_field(grid, source, running=None):
+    """
+    Calcule les distances (en nombre de pas) de chaque case à la source
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) source: Coordonnées de la case source
+        callable running: (Optionnel) Fonction renvoyant False lorsque le calcul doit être interrompu
+
+    Renvoi :
+        np.ndarray distances: Tableau int32 de dimensions (hauteur, longueur) des distances à la source (-1 si inaccessible),
+                              None si le calcul a été interrompu
+    """
+    return wavefront(grid, source, running)
+
+
+def reachable(grid, source):
+    """
+    Calcule le masque des cases accessibles depuis la source
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) source: Coordonnées de la case source
+
+    Renvoi :
+        np.ndarray mask: Tableau de bool de dimensions (hauteur, longueur), True pour les cases accessibles
+    """
+    return wavefront(grid, source) != -1
+
+
+def is_solvable(grid, start, end):
+    """
+    Indique si l'arrivée est accessible depuis le départ
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        tuple(int, int) start: Coordonnées du départ
+        tuple(int, int) end: Coordonnées de l'arrivée
+
+    Renvoi :
+        bool: True si un chemin existe
+    """
+    return bool(reachable(grid, start)[end[1], end[0]])
+
+
+def fill_dead_ends(grid, keep=()):
+    """
+    Comble les culs-de-sac : les cases de sol ayant au plus un voisin de sol sont retirées, ce qui peut créer de
+    nouveaux culs-de-sac, jusqu'à ce que plus rien ne change. Aucune case retirée ne peut se trouver sur un chemin
+    entre deux cases conservées
+    Seuls les voisins des cases retirées à une étape sont réexaminés à l'étape suivante. Lorsqu'il ne reste que
+    quelques longues branches à remonter, les étapes vectorisées ne traitent plus que quelques cases chacune : on
+    termine alors par une pile de cases
+
+    Paramètres :
+        np.ndarray grid: Tableau uint8 de dimensions (hauteur, longueur) des types de case
+        iterable(tuple(int, int)) keep: Coordonnées des cases à ne jamais retirer (en général le départ et l'arrivée)
+
+    Renvoi :
+        np.ndarray pruned: Tableau de bool de dimensions (hauteur, longueur), True pour les cases retirées
+    """
+    height, width = grid.shape
+    passable, padded_width = padded_passable(grid)
+    offsets = np.array([-1, 1, -padded_width, padded_width])
+
+    kept = np.zeros(passable.size, dtype=bool)
+    for x, y in keep:
+        kept[(y + 1) * padded_width + x + 1] = True
+
+    pruned = np.zeros(passable.size, dtype=bool)
+    candidates = np.flatnonzero(passable & ~kept)
+    while candidates.size >= SMALL_FRONT:
+        degree = passable[candidates[:, np.newaxis] + offsets].sum(axis=1)
+        removed = candidates[degree <= 1]
+        if removed.size == 0:
+            break
+
+        passable[removed] = False
+        pruned[removed] = True
+
+        neighbours = (removed[:, np.newaxis] + offsets).ravel()
+        candidates = np.unique(neighbours[passable[neighbours] & ~kept[neighbours]])
+
+    cells = bytearray(passable.tobytes())
+    protected = kept.tobytes()
+    stack = candidates.tolist()
+    removed = []
+    while stack:
+        u = stack.pop()
+        if cells[u] and not protected[u] and \
+                cells[u - 1] + cells[u + 1] + cells[u - padded_width] + cells[u + padded_width] <= 1:
+            cells[u] = 0
+            removed.append(u)
+            stack.extend((u - 1, u + 1, u - padded_width, u + padded_width))
+    pruned[removed] = True
+
+    return pruned.reshape(height + 2, padded_width)[1:-1, 1:-1].copy()
+
+
+def validate_levels(levels_path="data/levels.json"):
+    """
+    Vérifie que tous les niveaux enregistrés sont solvables
+
+    Paramètres :
+        str levels_path: Chemin du fichier json des niveaux
+
+    Renvoi :
+        dict(str: int) lengths: Nombre de pas du plus court chemin de chaque niveau (-1 si le niveau n'est pas solvable)
+    """
+    with open(levels_path, "r") as file:
+        dico_niveaux = json.load(file)
+
+    lengths = {}
+    for name, params in dico_niveaux.items():
+        grid = image_to_grid(Image.open(params["image_path"]))
+        end_x, end_y = params["end"]
+        lengths[name] = int(distance_field(grid, params["start"])[end_y, end_x])
+
+    return lengths
+
+
+if __name__ == "__main__":
+    for name, length in validate_levels().items():
+        print(f"{name}: {'non solvable' if length == -1 else f'{length} pas'}")